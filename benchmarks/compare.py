@@ -0,0 +1,84 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare two benchmark results written by benchmarks.run, e.g. of two
+commits, and fail when a measure regressed by more than the threshold.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import sys
+
+
+def get_measures(results):
+    for scenario, summary in sorted(results["scenarios"].items()):
+        yield (scenario, "wall_time"), summary["wall_time"]
+        yield (scenario, "peak_rss_kb"), summary["peak_rss_kb"]
+        for phase, measure in sorted(summary["phases"].items()):
+            yield (scenario, phase), measure["time"]
+
+
+def compare(baseline, current, threshold):
+    """Print the relative change of each measure, return the regressions."""
+    baseline_measures = dict(get_measures(baseline))
+    regressions = []
+    for key, value in get_measures(current):
+        if key not in baseline_measures:
+            continue
+        reference = baseline_measures[key]
+        change = (value - reference) / float(reference) if reference else 0.0
+        regressed = change > threshold
+        print(
+            "{0:<12} {1:<24} {2:>12.4f} {3:>12.4f} {4:>+8.1%}{5}".format(
+                key[0],
+                key[1],
+                reference,
+                value,
+                change,
+                " REGRESSION" if regressed else "",
+            )
+        )
+        if regressed:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline", help="results of the reference commit")
+    parser.add_argument("current", help="results to compare")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative increase considered as a regression. Defaults to 0.1",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    if baseline["parameters"] != current["parameters"]:
+        print("Warning: the results were generated with different parameters")
+    regressions = compare(baseline, current, args.threshold)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
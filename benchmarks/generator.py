@@ -0,0 +1,189 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import random
+
+SETTINGS_MODULE = "bench_settings"
+
+DEFAULT_MIX = "AddField=4,RemoveField=1,RenameField=1,AlterField=2,RunSQL=1"
+OPERATIONS = ("AddField", "RemoveField", "RenameField", "AlterField", "RunSQL")
+
+SETTINGS_TEMPLATE = """SECRET_KEY = "benchmark"
+INSTALLED_APPS = [{installed_apps}]
+DATABASES = {{
+    "default": {{"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+}}
+"""
+
+MIGRATION_TEMPLATE = """from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [{dependencies}]
+
+    operations = [
+{operations}
+    ]
+"""
+
+
+def parse_mix(value):
+    """Parse an operation mix given as OPERATION=WEIGHT,..."""
+    mix = {}
+    for item in value.split(","):
+        operation, _, weight = item.partition("=")
+        if operation not in OPERATIONS:
+            raise ValueError(
+                "Unknown operation {0}, expected one of {1}".format(
+                    operation, ", ".join(OPERATIONS)
+                )
+            )
+        mix[operation] = int(weight or 1)
+    return mix
+
+
+class ProjectGenerator(object):
+    """
+    Write a synthetic Django project of nb_apps apps having nb_migrations
+    migrations each. Apart from the initial one, every migration holds
+    one operation drawn from the weighted mix of operations.
+    """
+
+    def __init__(self, nb_apps, nb_migrations, mix=None, seed=0):
+        self.nb_apps = nb_apps
+        self.nb_migrations = nb_migrations
+        self.mix = mix or parse_mix(DEFAULT_MIX)
+        self.seed = seed
+
+    @staticmethod
+    def get_app_label(app_index):
+        return "bench_app_{0}".format(app_index)
+
+    @staticmethod
+    def get_migration_name(index):
+        return "0001_initial" if index == 1 else "{0:04d}_step".format(index)
+
+    def generate(self, project_dir, nb_migrations=None):
+        """
+        Write the project, or only its nb_migrations first migrations per app.
+        The generation is deterministic, so that a project can be extended.
+        """
+        nb_migrations = self.nb_migrations if nb_migrations is None else nb_migrations
+        app_labels = [self.get_app_label(i) for i in range(self.nb_apps)]
+        self._write(
+            os.path.join(project_dir, SETTINGS_MODULE + ".py"),
+            SETTINGS_TEMPLATE.format(
+                installed_apps=", ".join('"{0}"'.format(a) for a in app_labels)
+            ),
+        )
+        for app_label in app_labels:
+            migrations_dir = os.path.join(project_dir, app_label, "migrations")
+            self._write(os.path.join(project_dir, app_label, "__init__.py"), "")
+            self._write(os.path.join(migrations_dir, "__init__.py"), "")
+            for name, content in self.generate_migrations(app_label, nb_migrations):
+                self._write(os.path.join(migrations_dir, name + ".py"), content)
+
+    def generate_migrations(self, app_label, nb_migrations):
+        # Seeded per app, the first migrations don't depend on nb_migrations
+        rng = random.Random("{0}-{1}".format(self.seed, app_label))
+        model_name = "Model"
+        table = "{0}_model".format(app_label)
+        fields = ["field_{0}".format(i) for i in range(5)]
+        counter = len(fields)
+
+        yield self.get_migration_name(1), MIGRATION_TEMPLATE.format(
+            dependencies="",
+            operations=self._create_model(model_name, fields),
+        )
+        operations, weights = zip(*sorted(self.mix.items()))
+        for index in range(2, nb_migrations + 1):
+            operation = self._choice(rng, operations, weights)
+            if operation in ("RemoveField", "RenameField") and len(fields) < 2:
+                operation = "AddField"
+
+            if operation == "AddField":
+                field = "field_{0}".format(counter)
+                counter += 1
+                fields.append(field)
+                code = (
+                    "migrations.AddField(model_name={0!r}, name={1!r}, "
+                    "field=models.IntegerField(null=True))"
+                ).format(model_name.lower(), field)
+            elif operation == "RemoveField":
+                field = fields.pop(rng.randrange(len(fields)))
+                code = "migrations.RemoveField(model_name={0!r}, name={1!r})".format(
+                    model_name.lower(), field
+                )
+            elif operation == "RenameField":
+                position = rng.randrange(len(fields))
+                old_name, fields[position] = (
+                    fields[position],
+                    "field_{0}".format(counter),
+                )
+                counter += 1
+                code = (
+                    "migrations.RenameField(model_name={0!r}, "
+                    "old_name={1!r}, new_name={2!r})"
+                ).format(model_name.lower(), old_name, fields[position])
+            elif operation == "AlterField":
+                code = (
+                    "migrations.AlterField(model_name={0!r}, name={1!r}, "
+                    "field=models.CharField(max_length={2}, null=True))"
+                ).format(model_name.lower(), rng.choice(fields), rng.randint(100, 500))
+            else:
+                code = "migrations.RunSQL({0!r}, migrations.RunSQL.noop)".format(
+                    "UPDATE {0} SET {1} = NULL;".format(table, rng.choice(fields))
+                )
+
+            yield self.get_migration_name(index), MIGRATION_TEMPLATE.format(
+                dependencies="({0!r}, {1!r})".format(
+                    app_label, self.get_migration_name(index - 1)
+                ),
+                operations="        {0},".format(code),
+            )
+
+    @staticmethod
+    def _create_model(model_name, fields):
+        lines = [
+            "        migrations.CreateModel(",
+            "            name={0!r},".format(model_name),
+            "            fields=[",
+            "                ('id', models.AutoField(primary_key=True)),",
+        ]
+        for field in fields:
+            lines.append(
+                "                ({0!r}, models.CharField(max_length=100, "
+                "null=True)),".format(field)
+            )
+        lines += ["            ],", "        ),"]
+        return "\n".join(lines)
+
+    @staticmethod
+    def _choice(rng, operations, weights):
+        value = rng.uniform(0, sum(weights))
+        for operation, weight in zip(operations, weights):
+            value -= weight
+            if value <= 0:
+                return operation
+        return operations[-1]
+
+    @staticmethod
+    def _write(path, content):
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(path, "w") as f:
+            f.write(content)
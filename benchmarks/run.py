@@ -0,0 +1,174 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark the linter on a synthetic project, with a cold cache, a warm
+cache and in git diff mode, and write the measures as JSON.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from .generator import DEFAULT_MIX, ProjectGenerator, parse_mix
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_scenario(project_dir, cache_path, git_commit_id=None):
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.scenario",
+        project_dir,
+        "--cache-path",
+        cache_path,
+    ]
+    if git_commit_id:
+        command += ["--git-commit-id", git_commit_id]
+    output = subprocess.check_output(command, cwd=PROJECT_ROOT)
+    return json.loads(output.decode("utf-8"))
+
+
+def git(project_dir, *args):
+    command = [
+        "git",
+        "-c",
+        "user.name=benchmark",
+        "-c",
+        "user.email=benchmark@localhost",
+    ]
+    output = subprocess.check_output(command + list(args), cwd=project_dir)
+    return output.decode("utf-8").strip()
+
+
+def get_linter_commit():
+    try:
+        return git(PROJECT_ROOT, "rev-parse", "HEAD")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def summarize(runs):
+    """Keep the median of each measure over the repeated runs."""
+    summary = {
+        "wall_time": median([r["wall_time"] for r in runs]),
+        "peak_rss_kb": median([r["peak_rss_kb"] for r in runs]),
+        "nb_total": runs[0]["nb_total"],
+        "nb_erroneous": runs[0]["nb_erroneous"],
+        "phases": {},
+    }
+    for phase in runs[0]["phases"]:
+        summary["phases"][phase] = {
+            "time": median([r["phases"][phase]["time"] for r in runs]),
+            "calls": runs[0]["phases"][phase]["calls"],
+        }
+    return summary
+
+
+def benchmark(generator, repeat=1):
+    project_dir = tempfile.mkdtemp(prefix="migration-linter-benchmark-")
+    try:
+        # The first half of the migrations is committed, the git diff mode
+        # lints the other half.
+        generator.generate(project_dir, nb_migrations=generator.nb_migrations // 2)
+        git(project_dir, "init", "-q")
+        git(project_dir, "add", ".")
+        git(project_dir, "commit", "-q", "-m", "Base")
+        base_commit = git(project_dir, "rev-parse", "HEAD")
+        generator.generate(project_dir)
+        git(project_dir, "add", ".")
+        git(project_dir, "commit", "-q", "-m", "Changes")
+
+        runs = {"cold_cache": [], "warm_cache": [], "git_diff": []}
+        for _ in range(repeat):
+            cache_path = tempfile.mkdtemp(dir=project_dir)
+            runs["cold_cache"].append(run_scenario(project_dir, cache_path))
+            runs["warm_cache"].append(run_scenario(project_dir, cache_path))
+            runs["git_diff"].append(
+                run_scenario(
+                    project_dir, tempfile.mkdtemp(dir=project_dir), base_commit
+                )
+            )
+        return dict((name, summarize(r)) for name, r in runs.items())
+    finally:
+        shutil.rmtree(project_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apps", type=int, default=10, help="number of apps")
+    parser.add_argument(
+        "--migrations", type=int, default=20, help="number of migrations per app"
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="weights of the generated operations. Defaults to {0}".format(DEFAULT_MIX),
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="number of runs of each scenario, the median is kept",
+    )
+    parser.add_argument(
+        "--output", type=str, help="file to write the results to. Defaults to stdout"
+    )
+    args = parser.parse_args(argv)
+
+    import django
+
+    generator = ProjectGenerator(args.apps, args.migrations, args.mix, args.seed)
+    results = {
+        "commit": get_linter_commit(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "parameters": {
+            "apps": args.apps,
+            "migrations": args.migrations,
+            "mix": generator.mix,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "scenarios": benchmark(generator, args.repeat),
+    }
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Run one benchmark scenario on a generated project and print its measures
+as JSON. Every scenario runs in a fresh process, so that the imports and
+the peak memory of a scenario don't leak into the next one.
+"""
+
+from __future__ import print_function
+
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from timeit import default_timer
+
+from .generator import SETTINGS_MODULE
+
+
+class PhaseTimer(object):
+    """Accumulate the time spent in the wrapped functions, from any thread."""
+
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def wrap(self, name, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = default_timer()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = default_timer() - start
+                with self.lock:
+                    self.durations[name] += duration
+                    self.calls[name] += 1
+
+        return wrapper
+
+    def as_dict(self):
+        return dict(
+            (name, {"time": self.durations[name], "calls": self.calls[name]})
+            for name in self.durations
+        )
+
+
+def get_peak_rss_kb():
+    import resource
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, kilobytes elsewhere
+    return peak_rss // 1024 if sys.platform == "darwin" else peak_rss
+
+
+def run(project_dir, cache_path, git_commit_id=None):
+    sys.path.insert(0, project_dir)
+    os.environ["DJANGO_SETTINGS_MODULE"] = SETTINGS_MODULE
+
+    import django
+
+    django.setup()
+
+    from django_migration_linter import migration_linter
+    from django_migration_linter.migration_linter import MigrationLinter
+
+    timer = PhaseTimer()
+    MigrationLinter.get_sql = timer.wrap("get_sql", MigrationLinter.get_sql)
+    MigrationLinter.get_migration_hash = staticmethod(
+        timer.wrap("get_migration_hash", MigrationLinter.get_migration_hash)
+    )
+    migration_linter.analyse_sql_statements = timer.wrap(
+        "analyse_sql_statements", migration_linter.analyse_sql_statements
+    )
+
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    start = default_timer()
+    try:
+        linter = MigrationLinter(project_dir, cache_path=cache_path)
+        linter.lint_all_migrations(git_commit_id=git_commit_id)
+    finally:
+        wall_time = default_timer() - start
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    return {
+        "wall_time": wall_time,
+        "peak_rss_kb": get_peak_rss_kb(),
+        "phases": timer.as_dict(),
+        "nb_total": linter.nb_total,
+        "nb_erroneous": linter.nb_erroneous,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("project_dir")
+    parser.add_argument("--cache-path", required=True)
+    parser.add_argument("--git-commit-id")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.project_dir, args.cache_path, args.git_commit_id)))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,5 +12,41 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .migration_linter import *  # noqa
-from .operations import *  # noqa
+import sys
+
+# Public API, mapped to the module that defines it
+_public_attributes = {
+    "MigrationLinter": "migration_linter",
+    "DJANGO_APPS_WITH_MIGRATIONS": "migration_linter",
+    "IgnoreMigration": "operations",
+    "IGNORE_MIGRATION_SQL": "constants",
+    "DEFAULT_CACHE_PATH": "constants",
+    "Cache": "cache",
+    "analyse_sql_statements": "sql_analyser",
+    "clean_bytes_to_str": "utils",
+    "get_migration_abspath": "utils",
+    "split_migration_path": "utils",
+}
+
+__all__ = sorted(_public_attributes)
+
+if sys.version_info >= (3, 7):
+    from importlib import import_module
+
+    # Import the public API lazily, so that importing the package
+    # (e.g. from a migration file or the CLI) doesn't import Django.
+    def __getattr__(name):
+        if name not in _public_attributes:
+            raise AttributeError(
+                "module {0!r} has no attribute {1!r}".format(__name__, name)
+            )
+        module = import_module(
+            ".{0}".format(_public_attributes[name]), package=__name__
+        )
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+
+else:
+    from .migration_linter import *  # noqa
+    from .operations import *  # noqa
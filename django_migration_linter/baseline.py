@@ -0,0 +1,58 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+BASELINE_HEADER = (
+    "# django-migration-linter baseline: app_label migration_name fingerprint result"
+)
+
+
+class Baseline(dict):
+    """
+    Index of the accepted state of the migrations, committed with the
+    project: (app_label, migration_name) -> (fingerprint, result).
+
+    The file has one line per migration, sorted, so that it diffs well.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        super(Baseline, self).__init__()
+
+    def load(self):
+        try:
+            with open(self.filename, "r") as f:
+                lines = f.read().splitlines()
+        except IOError:
+            return
+        for line in lines:
+            if not line or line.startswith("#"):
+                continue
+            app_label, migration_name, fingerprint, result = line.split()
+            self[(app_label, migration_name)] = (fingerprint, result)
+
+    def save(self):
+        lines = [BASELINE_HEADER]
+        for (app_label, migration_name), (fingerprint, result) in sorted(self.items()):
+            lines.append(" ".join((app_label, migration_name, fingerprint, result)))
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.filename, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def matches(self, app_label, migration_name, fingerprint):
+        entry = self.get((app_label, migration_name))
+        return entry is not None and entry[0] == fingerprint
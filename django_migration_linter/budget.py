@@ -0,0 +1,138 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from collections import namedtuple
+
+from .locks import is_blocking_lock
+
+# What the budget limits, summed over the migrations of a release
+BUDGET_METRICS = ("rewrites", "blocking_locks", "seconds")
+
+# The key of the limits applying to each table without limits of its own
+DEFAULT_TABLE = "*"
+
+
+class BudgetOverrun(
+    namedtuple("BudgetOverrun", ("table", "metric", "total", "limit", "migrations"))
+):
+    """
+    A total above its limit, on a table or on the whole release (table
+    None), with the (app_label, migration_name) of the contributing migrations.
+    """
+
+    __slots__ = ()
+
+    def as_dict(self):
+        overrun = dict(zip(self._fields, self))
+        overrun["migrations"] = [list(key) for key in self.migrations]
+        return overrun
+
+
+class Budget(object):
+    """
+    Sum the table rewrites, the blocking locks and the estimated lock
+    duration of each table over the linted migrations, and check the totals
+    against the limits of each table and of the whole release.
+    """
+
+    def __init__(self, release_limits=None, table_limits=None, vendor=None):
+        self.release_limits = dict(release_limits or {})
+        self.table_limits = dict(table_limits or {})
+        self.vendor = vendor
+        # table -> metric -> [total, contributing migrations]
+        self.usage = {}
+
+    @classmethod
+    def load(cls, path, vendor=None):
+        """
+        Read the limits from a JSON file:
+        {"release": {metric: limit}, "tables": {table or "*": {metric: limit}}}
+        """
+        with open(path, "r") as f:
+            limits = json.load(f)
+        for scope_limits in [limits.get("release", {})] + list(
+            limits.get("tables", {}).values()
+        ):
+            unknown_metrics = set(scope_limits) - set(BUDGET_METRICS)
+            if unknown_metrics:
+                raise ValueError(
+                    "Unknown budget metrics in {0}: {1}, expected {2}".format(
+                        path,
+                        ", ".join(sorted(unknown_metrics)),
+                        ", ".join(BUDGET_METRICS),
+                    )
+                )
+        return cls(limits.get("release"), limits.get("tables"), vendor)
+
+    def add(self, app_label, migration_name, lint_result, estimate=None):
+        """Add the operations of a linted migration to the totals."""
+        key = (app_label, migration_name)
+        for err in lint_result.errors:
+            if err.code == "TABLE_REWRITE" and err.table:
+                self._add(err.table, "rewrites", 1, key)
+        for lock in lint_result.locks:
+            if lock.table and is_blocking_lock(lock.mode, self.vendor):
+                self._add(lock.table, "blocking_locks", 1, key)
+        if estimate is not None:
+            for cost in estimate.tables:
+                if cost.seconds:
+                    self._add(cost.table, "seconds", cost.seconds, key)
+
+    def _add(self, table, metric, value, key):
+        entry = self.usage.setdefault(table, {}).setdefault(metric, [0, []])
+        entry[0] += value
+        if key not in entry[1]:
+            entry[1].append(key)
+
+    def get_table_limits(self, table):
+        return self.table_limits.get(table, self.table_limits.get(DEFAULT_TABLE, {}))
+
+    def get_overruns(self):
+        """Return the BudgetOverrun of the tables, then of the release."""
+        overruns = []
+        release_usage = {}
+        for table in sorted(self.usage):
+            limits = self.get_table_limits(table)
+            for metric in BUDGET_METRICS:
+                if metric not in self.usage[table]:
+                    continue
+                total, migrations = self.usage[table][metric]
+                release_entry = release_usage.setdefault(metric, [0, []])
+                release_entry[0] += total
+                release_entry[1].extend(
+                    key for key in migrations if key not in release_entry[1]
+                )
+                if metric in limits and total > limits[metric]:
+                    overruns.append(
+                        BudgetOverrun(
+                            table, metric, total, limits[metric], tuple(migrations)
+                        )
+                    )
+
+        for metric in BUDGET_METRICS:
+            if metric not in release_usage or metric not in self.release_limits:
+                continue
+            total, migrations = release_usage[metric]
+            if total > self.release_limits[metric]:
+                overruns.append(
+                    BudgetOverrun(
+                        None,
+                        metric,
+                        total,
+                        self.release_limits[metric],
+                        tuple(sorted(migrations)),
+                    )
+                )
+        return overruns
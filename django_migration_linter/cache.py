@@ -17,11 +17,12 @@ import pickle
 
 
 class Cache(dict):
-    def __init__(self, django_folder, database, cache_path):
-        self.filename = os.path.join(
-            cache_path,
-            "{0}_{1}.pickle".format(django_folder.replace(os.sep, "_"), database),
-        )
+    def __init__(self, django_folder, database, cache_path, context_hash=None):
+        name = "{0}_{1}".format(django_folder.replace(os.sep, "_"), database)
+        # The results of the optional checks are cached apart
+        if context_hash:
+            name = "{0}_{1}".format(name, context_hash)
+        self.filename = os.path.join(cache_path, "{0}.pickle".format(name))
 
         if not os.path.exists(os.path.dirname(self.filename)):
             os.makedirs(os.path.dirname(self.filename))
@@ -0,0 +1,172 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from collections import OrderedDict
+
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.operations import RunPython
+from django.db.migrations.recorder import MigrationRecorder
+
+from .constants import IGNORE_MIGRATION_SQL
+from .migration_linter import DJANGO_APPS_WITH_MIGRATIONS, MigrationLinter
+from .utils import get_default_django_path
+
+logger = logging.getLogger(__name__)
+
+# Statements executed by the schema editors to inspect the database
+INTROSPECTION_PREFIXES = ("SELECT", "PRAGMA", "SHOW", "SAVEPOINT", "RELEASE")
+# The transaction of an atomic migration is added back when it is linted
+TRANSACTION_PREFIXES = ("BEGIN", "START TRANSACTION", "COMMIT", "ROLLBACK")
+
+
+class MigrationSqlCapture(object):
+    """
+    Context manager capturing the SQL executed by the schema editor for
+    each applied migration, for instance while the test databases are
+    created. The queries of the RunPython operations are not captured:
+    like the SQL generated by the linter, the captured SQL leaves them out.
+
+    The captured SQL is filled with its parameters and linted afterwards,
+    like the SQL generated by the linter, and the results are stored
+    in the cache of the linter, so that linting the same migrations
+    later on doesn't need to generate their SQL again.
+    """
+
+    def __init__(self):
+        self.sql_statements = OrderedDict()
+        # The migration being applied on each database, and whether
+        # its RunPython code is running
+        self._migrations = {}
+        self._in_python_code = set()
+        self._patched = []
+
+    def __enter__(self):
+        capture = self
+
+        def apply_migration(original, executor, state, migration, *args, **kwargs):
+            alias = executor.connection.alias
+            key = (alias, migration.app_label, migration.name)
+            capture.sql_statements[key] = []
+            capture._migrations[alias] = key
+            try:
+                return original(executor, state, migration, *args, **kwargs)
+            finally:
+                capture._migrations.pop(alias, None)
+
+        def run_python(original, operation, app_label, schema_editor, *args):
+            alias = schema_editor.connection.alias
+            capture._in_python_code.add(alias)
+            try:
+                return original(operation, app_label, schema_editor, *args)
+            finally:
+                capture._in_python_code.discard(alias)
+
+        def execute(original, schema_editor, sql, params=()):
+            capture.capture(schema_editor, sql, params)
+            return original(schema_editor, sql, params)
+
+        self._patch(MigrationExecutor, "apply_migration", apply_migration)
+        self._patch(RunPython, "database_forwards", run_python)
+        self._patch(BaseDatabaseSchemaEditor, "execute", execute)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        while self._patched:
+            cls, name, original = self._patched.pop()
+            setattr(cls, name, original)
+
+    def _patch(self, cls, name, wrapper):
+        """Replace a method of the class by the wrapper, until the exit."""
+        original = getattr(cls, name)
+        self._patched.append((cls, name, cls.__dict__[name]))
+
+        def patched(*args, **kwargs):
+            return wrapper(original, *args, **kwargs)
+
+        setattr(cls, name, patched)
+
+    def capture(self, schema_editor, sql, params):
+        alias = schema_editor.connection.alias
+        key = self._migrations.get(alias)
+        if key is None or alias in self._in_python_code:
+            return
+        sql = str(sql)
+        if self.is_migration_sql(sql):
+            self.sql_statements[key].append(
+                self.format_statement(schema_editor, sql, params)
+            )
+
+    @staticmethod
+    def format_statement(schema_editor, sql, params):
+        """
+        Fill in the parameters of an executed statement, like the
+        schema editor does when it only collects the SQL.
+        """
+        ending = "" if sql.rstrip().endswith(";") else ";"
+        if params is not None:
+            sql = sql % tuple(map(schema_editor.quote_value, params))
+        return sql + ending
+
+    @staticmethod
+    def is_migration_sql(sql):
+        if IGNORE_MIGRATION_SQL in sql:
+            return True
+        if MigrationRecorder.Migration._meta.db_table in sql:
+            return False
+        return (
+            not sql.lstrip()
+            .upper()
+            .startswith(INTROSPECTION_PREFIXES + TRANSACTION_PREFIXES)
+        )
+
+    def store_lint_results(self, path=None, cache_path=None):
+        """
+        Lint the captured SQL and store the results in the cache
+        of the database on which each migration was applied.
+        """
+        path = path or get_default_django_path()
+        linters = {}
+
+        for key, sql_statements in self.sql_statements.items():
+            database, app_label, migration_name = key
+            if app_label in DJANGO_APPS_WITH_MIGRATIONS:
+                continue
+            # Nothing was executed, e.g. the migration was faked
+            if not sql_statements:
+                continue
+
+            if database not in linters:
+                linters[database] = MigrationLinter(
+                    path, database=database, cache_path=cache_path
+                )
+            linter = linters[database]
+
+            logger.info(
+                "Caching the executed SQL of {0} {1}".format(app_label, migration_name)
+            )
+            fingerprint = linter.get_migration_fingerprint(app_label, migration_name)
+            migration = linter.get_migration_loader().get_migration_by_prefix(
+                app_label, migration_name
+            )
+            linter.old_cache[fingerprint] = linter.get_lint_result(
+                linter.format_sql(migration, sql_statements),
+                atomic=migration.atomic,
+                migration=migration,
+                column_types=linter.get_column_types(migration),
+            ).to_cache()
+
+        for linter in linters.values():
+            linter.old_cache.save()
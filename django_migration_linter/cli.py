@@ -0,0 +1,518 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import logging
+import os
+import sys
+
+from .constants import __version__
+
+
+def shard_type(value):
+    from .sharding import parse_shard
+
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def reporter_type(value):
+    from .reporters import REPORTERS
+
+    output_format, _, path = value.partition(":")
+    if output_format not in REPORTERS:
+        raise argparse.ArgumentTypeError(
+            "unknown format {0}, expected one of {1}".format(
+                output_format, ", ".join(sorted(REPORTERS))
+            )
+        )
+    return output_format, path or None
+
+
+def version_type(value):
+    from .utils import parse_version
+
+    try:
+        return parse_version(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid version {0}".format(value))
+
+
+def add_cache_arguments(parser):
+    cache_group = parser.add_mutually_exclusive_group(required=False)
+    cache_group.add_argument(
+        "--cache-path",
+        type=str,
+        help="specify a directory that should be used to store cache-files in.",
+    )
+    cache_group.add_argument(
+        "--no-cache", action="store_true", help="don't use a cache"
+    )
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "commit_id",
+        metavar="GIT_COMMIT_ID",
+        type=str,
+        nargs="?",
+        help=(
+            "if specified, only migrations since this commit "
+            "will be taken into account. If not specified, "
+            "the initial repo commit will be used"
+        ),
+    )
+    parser.add_argument(
+        "--migration-paths",
+        type=str,
+        nargs="*",
+        help=(
+            "only lint the migrations at these file paths, "
+            "other files are skipped (e.g. for pre-commit hooks)"
+        ),
+    )
+    parser.add_argument(
+        "--model-changes",
+        action="store_true",
+        help=(
+            "lint the migrations that makemigrations would generate "
+            "for the current models, without writing them"
+        ),
+    )
+    parser.add_argument(
+        "--applied-migrations",
+        type=str,
+        metavar="FILE",
+        help=(
+            "only lint the migrations that are not applied according to this "
+            "snapshot of the database, in plan order: a SQLite copy of the "
+            "database or a JSON export of its django_migrations table"
+        ),
+    )
+    parser.add_argument(
+        "--lint-replaced",
+        action="store_true",
+        help=(
+            "lint the migrations replaced by squashed migrations instead of "
+            "the squashed migrations. With --applied-migrations, the migrations "
+            "that migrate would apply are linted instead"
+        ),
+    )
+    parser.add_argument(
+        "--ignore-name-contains",
+        type=str,
+        nargs="?",
+        help="ignore migrations containing this name",
+    )
+    parser.add_argument(
+        "--ignore-name",
+        type=str,
+        nargs="*",
+        help="ignore migrations with exactly one of these names",
+    )
+    parser.add_argument(
+        "--database",
+        type=str,
+        nargs="?",
+        help="specify the database for which to generate the SQL. Defaults to default",
+    )
+    parser.add_argument(
+        "--database-version",
+        type=version_type,
+        metavar="VERSION",
+        help=(
+            "version of the database server, e.g. 11.5, for the tests depending "
+            "on it. Defaults to the version read from the server, if reachable"
+        ),
+    )
+    parser.add_argument(
+        "--blocking-checks",
+        action="store_true",
+        default=None,
+        help=(
+            "check the migrations blocking the accesses to a table: table "
+            "rewrites, index builds and constraint validations, whatever the "
+            "MIGRATION_LINTER_BLOCKING_CHECKS setting"
+        ),
+    )
+    parser.add_argument(
+        "--require-lock-timeout",
+        action="store_true",
+        default=None,
+        help=(
+            "require a lock timeout before the statements locking a table, "
+            "whatever the MIGRATION_LINTER_REQUIRE_LOCK_TIMEOUT setting"
+        ),
+    )
+    parser.add_argument(
+        "--table-stats",
+        type=str,
+        metavar="FILE",
+        help=(
+            "estimate the duration and I/O of each migration from this snapshot "
+            "of the rows and sizes of the tables, in JSON or CSV"
+        ),
+    )
+    parser.add_argument(
+        "--max-lock-duration",
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "only fail on the table rewrites, index builds and validations "
+            "whose estimated duration is above this threshold"
+        ),
+    )
+    parser.add_argument(
+        "--budget",
+        type=str,
+        metavar="FILE",
+        help=(
+            "check the table rewrites, blocking locks and estimated lock duration "
+            "of all the linted migrations together against the limits per table "
+            "and per release of this JSON file"
+        ),
+    )
+    parser.add_argument(
+        "--shard",
+        type=shard_type,
+        metavar="INDEX/COUNT",
+        help=(
+            "only lint the INDEX-th of COUNT deterministic partitions "
+            "of the migrations, e.g. 1/4"
+        ),
+    )
+    parser.add_argument(
+        "--shard-output",
+        type=str,
+        metavar="DIRECTORY",
+        help=(
+            "directory where the shard writes its result and cache delta, "
+            "to be combined by the lintmigrations_merge command"
+        ),
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="stop linting at the first erroneous migration",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the slowest phases and migrations after the summary",
+    )
+    parser.add_argument(
+        "--cprofile",
+        type=str,
+        metavar="FILE",
+        help=(
+            "dump the cProfile stats of the linting to this file, "
+            "profiling the thread generating the SQL"
+        ),
+    )
+    parser.add_argument(
+        "--tracemalloc",
+        type=str,
+        metavar="FILE",
+        help="write the top memory allocations to this file (Python 3.4+)",
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        metavar="FILE",
+        help=(
+            "write the timed phases of the run to this file in the "
+            "Chrome Trace Event format, e.g. for Perfetto"
+        ),
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        metavar="FILE",
+        help=(
+            "write the durations and counters of the run to this file in the "
+            "OpenMetrics text format, e.g. for the node exporter"
+        ),
+    )
+    parser.add_argument(
+        "--report",
+        type=reporter_type,
+        action="append",
+        metavar="FORMAT[:FILE]",
+        help=(
+            "write the results in this format (text, jsonl, junit or sarif) "
+            "to the file, or to the standard output. Can be repeated. "
+            "Defaults to text"
+        ),
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        metavar="FILE",
+        help=(
+            "skip the migrations whose fingerprint matches this baseline file, "
+            "only the new and modified migrations are linted"
+        ),
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help=(
+            "write the fingerprints and results of the linted migrations "
+            "to the baseline file"
+        ),
+    )
+    parser.add_argument(
+        "--lock-report",
+        action="store_true",
+        help=(
+            "report the strongest lock taken on each table by each migration, "
+            "in the text and jsonl formats"
+        ),
+    )
+    add_cache_arguments(parser)
+
+    incl_excl_group = parser.add_mutually_exclusive_group(required=False)
+    incl_excl_group.add_argument(
+        "--include-apps",
+        type=str,
+        nargs="*",
+        help="check only migrations that are in the specified django apps",
+    )
+    incl_excl_group.add_argument(
+        "--exclude-apps",
+        type=str,
+        nargs="*",
+        help="ignore migrations that are in the specified django apps",
+    )
+
+
+def check_options(options):
+    """Return an error message if the given options can't be used together."""
+    modes = [
+        name
+        for name, enabled in (
+            ("GIT_COMMIT_ID", options["commit_id"]),
+            ("--migration-paths", options["migration_paths"] is not None),
+            ("--model-changes", options["model_changes"]),
+            ("--applied-migrations", options["applied_migrations"]),
+        )
+        if enabled
+    ]
+    if len(modes) > 1:
+        return "{0} can't be used together".format(" and ".join(modes))
+    if options["shard_output"] and not options["shard"]:
+        return "--shard-output requires --shard"
+    if options["shard"] and options["model_changes"]:
+        return "--shard and --model-changes can't be used together"
+    if options["update_baseline"] and not options["baseline"]:
+        return "--update-baseline requires --baseline"
+    if options["baseline"] and options["model_changes"]:
+        return "--baseline and --model-changes can't be used together"
+    if options["max_lock_duration"] is not None and not options["table_stats"]:
+        return "--max-lock-duration requires --table-stats"
+    if options["budget"] and not (
+        options["commit_id"] or options["applied_migrations"]
+    ):
+        return "--budget requires GIT_COMMIT_ID or --applied-migrations"
+    if options["budget"] and options["shard"]:
+        return "--budget and --shard can't be used together"
+    if options["tracemalloc"] and sys.version_info < (3, 4):
+        return "--tracemalloc requires Python 3.4+"
+    return None
+
+
+def lint_migrations(options):
+    """
+    Lint the migrations with the parsed command line options
+    and return the linter. Django must be set up beforehand.
+    """
+    from .migration_linter import MigrationLinter
+    from .utils import get_default_django_path
+
+    settings_path = get_default_django_path()
+
+    if options["verbosity"] > 1:
+        logging.basicConfig(format="%(message)s", level=logging.DEBUG)
+    else:
+        logging.basicConfig(format="%(message)s")
+
+    instrumentation = []
+    profiler = None
+    if options["profile"]:
+        from .instrumentation import Profiler
+
+        profiler = Profiler()
+        instrumentation.append(profiler)
+    if options["trace"]:
+        from .instrumentation import ChromeTraceExporter
+
+        instrumentation.append(ChromeTraceExporter(options["trace"]))
+    if options["metrics_file"]:
+        from .instrumentation import OpenMetricsExporter
+
+        instrumentation.append(OpenMetricsExporter(options["metrics_file"]))
+
+    from .reporters import REPORTERS
+
+    reporters = []
+    report_files = []
+    # The report files are closed even if the linting fails
+    try:
+        for output_format, path in options["report"] or [("text", None)]:
+            stream = None
+            if path:
+                stream = open(path, "w")
+                report_files.append(stream)
+            reporters.append(
+                REPORTERS[output_format](stream, lock_report=options["lock_report"])
+            )
+
+        linter = MigrationLinter(
+            settings_path,
+            ignore_name_contains=options["ignore_name_contains"],
+            ignore_name=options["ignore_name"],
+            include_apps=options["include_apps"],
+            exclude_apps=options["exclude_apps"],
+            database=options["database"],
+            cache_path=options["cache_path"],
+            no_cache=options["no_cache"],
+            shard=options["shard"],
+            fail_fast=options["fail_fast"],
+            instrumentation=instrumentation,
+            reporters=reporters,
+            baseline=options["baseline"],
+            update_baseline=options["update_baseline"],
+            lint_replaced=options["lint_replaced"],
+            database_version=options["database_version"],
+            require_lock_timeout=options["require_lock_timeout"],
+            blocking_checks=options["blocking_checks"],
+            table_stats=options["table_stats"],
+            max_lock_duration=options["max_lock_duration"],
+            budget=options["budget"],
+        )
+
+        cprofile = None
+        if options["cprofile"]:
+            import cProfile
+
+            cprofile = cProfile.Profile()
+            cprofile.enable()
+        if options["tracemalloc"]:
+            from .instrumentation import start_tracemalloc
+
+            start_tracemalloc()
+        try:
+            if options["model_changes"]:
+                linter.lint_model_changes()
+            else:
+                applied_migrations = None
+                if options["applied_migrations"]:
+                    from .snapshot import load_applied_migrations
+
+                    applied_migrations = load_applied_migrations(
+                        options["applied_migrations"]
+                    )
+                linter.lint_all_migrations(
+                    git_commit_id=options["commit_id"],
+                    migration_paths=options["migration_paths"],
+                    applied_migrations=applied_migrations,
+                )
+        finally:
+            if cprofile is not None:
+                cprofile.disable()
+                cprofile.dump_stats(options["cprofile"])
+            if options["tracemalloc"]:
+                from .instrumentation import dump_tracemalloc
+
+                dump_tracemalloc(options["tracemalloc"])
+
+        if options["shard_output"]:
+            from .sharding import write_shard_result
+
+            write_shard_result(linter, options["shard_output"])
+        linter.report_summary()
+    finally:
+        for report_file in report_files:
+            report_file.close()
+    if profiler is not None:
+        profiler.print_report()
+    return linter
+
+
+def main(argv=None):
+    """
+    Entry point of the django-migration-linter command.
+
+    Unlike the lintmigrations management command, it doesn't need the
+    linter in the INSTALLED_APPS, nor the discovery of all management
+    commands and the system checks: only Django itself is set up.
+    """
+    parser = argparse.ArgumentParser(
+        prog="django-migration-linter", description="Lint your migrations"
+    )
+    parser.add_argument(
+        "--version", action="version", version="%(prog)s {0}".format(__version__)
+    )
+    parser.add_argument(
+        "-v",
+        "--verbosity",
+        type=int,
+        choices=[0, 1, 2, 3],
+        default=1,
+        help="verbosity level; 0=minimal output, 1=normal output, 2=verbose output",
+    )
+    parser.add_argument(
+        "--settings",
+        type=str,
+        help=(
+            "the Python path to a settings module, e.g. 'myproject.settings'. "
+            "If not provided, the DJANGO_SETTINGS_MODULE environment variable "
+            "will be used"
+        ),
+    )
+    parser.add_argument(
+        "--pythonpath",
+        type=str,
+        help=(
+            "a directory to add to the Python path, e.g. '/home/myproject'. "
+            "Defaults to the current directory"
+        ),
+    )
+    add_arguments(parser)
+    options = vars(parser.parse_args(argv))
+
+    error = check_options(options)
+    if error:
+        parser.error(error)
+    if options["settings"]:
+        os.environ["DJANGO_SETTINGS_MODULE"] = options["settings"]
+    if not os.getenv("DJANGO_SETTINGS_MODULE"):
+        parser.error(
+            "the settings module must be given with --settings "
+            "or the DJANGO_SETTINGS_MODULE environment variable"
+        )
+    sys.path.insert(0, options["pythonpath"] or os.getcwd())
+
+    import django
+
+    django.setup(set_prefix=False)
+
+    linter = lint_migrations(options)
+    sys.exit(1 if linter.has_errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,3 +17,5 @@ from appdirs import user_cache_dir
 __version__ = "1.0.0"
 
 DEFAULT_CACHE_PATH = user_cache_dir("django-migration-linter", version=__version__)
+
+IGNORE_MIGRATION_SQL = "select 1; -- dml ignores this migration"
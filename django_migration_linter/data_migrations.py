@@ -0,0 +1,127 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ast
+import inspect
+import logging
+import textwrap
+
+from .results import LintError
+
+logger = logging.getLogger(__name__)
+
+# The attributes giving the manager of a model, where a queryset starts
+MANAGER_ATTRIBUTES = ("objects", "_default_manager", "_base_manager")
+# The queryset methods keeping all the rows of the table
+UNRESTRICTED_QUERYSET_METHODS = (
+    "all",
+    "order_by",
+    "select_related",
+    "prefetch_related",
+    "only",
+    "defer",
+    "using",
+    "annotate",
+)
+
+FULL_TABLE_ITERATION = LintError(
+    "FULL_TABLE_ITERATION",
+    "ITERATING over a whole table in RunPython "
+    "(Use .iterator() or iterate in batches)",
+)
+SAVE_IN_LOOP = LintError(
+    "SAVE_IN_LOOP",
+    "SAVING the rows one by one in a loop in RunPython "
+    "(Use bulk_update() or update() in batches)",
+)
+
+
+def get_queryset_chain(node):
+    """
+    Return the methods called on a model manager by the expression, e.g.
+    ["all", "order_by"] for Model.objects.all().order_by("id"), a slice
+    being "[]". Return None if the expression isn't such a queryset.
+    """
+    methods = []
+    while True:
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            methods.append(node.func.attr)
+            node = node.func.value
+        elif isinstance(node, ast.Subscript):
+            methods.append("[]")
+            node = node.value
+        elif isinstance(node, ast.Attribute) and node.attr in MANAGER_ATTRIBUTES:
+            return list(reversed(methods))
+        else:
+            return None
+
+
+def iterates_whole_table(loop):
+    """
+    Whether the loop goes through a queryset of all the rows of a table,
+    loaded at once: not filtered, sliced into batches, or streamed with
+    iterator().
+    """
+    methods = get_queryset_chain(loop.iter)
+    return methods is not None and all(
+        method in UNRESTRICTED_QUERYSET_METHODS for method in methods
+    )
+
+
+def get_save_calls(loop):
+    """Return the calls to save() in the body of the loop."""
+    return [
+        node
+        for statement in loop.body
+        for node in ast.walk(statement)
+        if isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == "save"
+    ]
+
+
+def analyse_python_function(function):
+    """Return the LintError of the unbatched data operations of a function."""
+    try:
+        source = textwrap.dedent(inspect.getsource(function))
+        tree = ast.parse(source)
+    except (IOError, OSError, TypeError, SyntaxError) as e:
+        # e.g. a lambda in the middle of an expression, or a builtin
+        logger.debug("Can't analyse the source of {0!r}: {1}".format(function, e))
+        return []
+
+    errors = []
+    save_calls = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.For) and iterates_whole_table(node):
+            errors.append(FULL_TABLE_ITERATION)
+            # Saved one by one, the rows of a batch or of a stream are fine
+            save_calls.update(get_save_calls(node))
+    errors.extend(SAVE_IN_LOOP for _ in save_calls)
+    return errors
+
+
+def analyse_data_migration(migration):
+    """
+    Analyse the Python code run by the RunPython operations of a migration,
+    which generate no SQL: the data migrations iterating over whole tables
+    or saving the rows one by one hold their locks for long.
+    """
+    from django.db.migrations.operations import RunPython
+
+    errors = []
+    for operation in migration.operations:
+        if isinstance(operation, RunPython) and operation.code is not RunPython.noop:
+            errors.extend(analyse_python_function(operation.code))
+    return errors
@@ -0,0 +1,366 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from timeit import default_timer
+
+# Number of allocation sites written by dump_tracemalloc
+TRACEMALLOC_LIMIT = 50
+
+METRICS_PREFIX = "django_migration_linter"
+
+# Upper bounds in seconds of the duration histograms
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+
+
+class Span(object):
+    """A timed phase of a lint run, e.g. the SQL generation of a migration."""
+
+    __slots__ = ("name", "args", "start", "end", "process_id", "thread_id")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.start = None
+        self.end = None
+        self.process_id = None
+        self.thread_id = None
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+class SpanContext(object):
+    """Time the enclosed block and hand the span over to the listeners."""
+
+    __slots__ = ("span", "listeners")
+
+    def __init__(self, listeners, name, args):
+        self.span = Span(name, args)
+        self.listeners = listeners
+
+    def __enter__(self):
+        self.span.process_id = os.getpid()
+        self.span.thread_id = threading.current_thread().ident
+        self.span.start = default_timer()
+        return self.span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.span.end = default_timer()
+        for listener in self.listeners:
+            listener.span_finished(self.span)
+        return False
+
+
+class NullSpanContext(object):
+    """Used when nothing listens, so that disabled instrumentation is free."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_SPAN = NullSpanContext()
+
+
+class Instrumentation(object):
+    """
+    Listener of the timed phases and counters of a lint run.
+
+    Instances are given to the linter with its instrumentation parameter.
+    The span and counter hooks may be called from the threads of the
+    linting pipeline, and in the thread where the span took place.
+    """
+
+    def span_finished(self, span):
+        pass
+
+    def count(self, name, value):
+        pass
+
+    def run_finished(self, linter):
+        """Called once the migrations are linted, e.g. to export the data."""
+        pass
+
+
+class Profiler(Instrumentation):
+    """Aggregate the spans per phase and per migration, for --profile."""
+
+    def __init__(self):
+        self.phases = defaultdict(lambda: [0.0, 0])
+        self.migrations = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def span_finished(self, span):
+        with self.lock:
+            phase = self.phases[span.name]
+            phase[0] += span.duration
+            phase[1] += 1
+            if "migration" in span.args:
+                self.migrations[span.args["migration"]] += span.duration
+
+    def count(self, name, value):
+        with self.lock:
+            self.counters[name] += value
+
+    def print_report(self, limit=10):
+        print("*** Profile:")
+        if "run" in self.phases:
+            print("Total time: {0:.3f}s".format(self.phases["run"][0]))
+
+        print("Slowest phases:")
+        phases = sorted(
+            (item for item in self.phases.items() if item[0] != "run"),
+            key=lambda item: item[1][0],
+            reverse=True,
+        )
+        for name, (duration, calls) in phases:
+            print("\t{0:>9.3f}s {1:>8} calls {2}".format(duration, calls, name))
+
+        print("Slowest migrations:")
+        migrations = sorted(
+            self.migrations.items(), key=lambda item: item[1], reverse=True
+        )
+        for name, duration in migrations[:limit]:
+            print("\t{0:>9.3f}s {1}".format(duration, name))
+
+        print("Counters:")
+        for name, value in sorted(self.counters.items()):
+            print("\t{0:>10} {1}".format(value, name))
+
+
+class ChromeTraceExporter(Instrumentation):
+    """
+    Write the spans to a file in the Chrome Trace Event format,
+    to be opened in Perfetto or chrome://tracing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.origin = default_timer()
+        self.events = []
+        self.thread_names = {}
+        self.lock = threading.Lock()
+
+    def span_finished(self, span):
+        event = {
+            "name": span.name,
+            "cat": "migration_linter",
+            "ph": "X",
+            "ts": (span.start - self.origin) * 1e6,
+            "dur": span.duration * 1e6,
+            "pid": span.process_id,
+            "tid": span.thread_id,
+            "args": span.args,
+        }
+        with self.lock:
+            self.events.append(event)
+            key = (span.process_id, span.thread_id)
+            if key not in self.thread_names:
+                self.thread_names[key] = threading.current_thread().name
+
+    def run_finished(self, linter):
+        with self.lock:
+            events = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": process_id,
+                    "tid": thread_id,
+                    "args": {"name": name},
+                }
+                for (process_id, thread_id), name in self.thread_names.items()
+            ]
+            events.extend(self.events)
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+class Histogram(object):
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bucket in enumerate(self.buckets):
+            if value <= bucket:
+                self.counts[i] += 1
+                break
+
+    def get_samples(self):
+        """Return the cumulated (upper bound, count) pairs, ending with +Inf."""
+        samples = []
+        cumulated = 0
+        for bucket, count in zip(self.buckets, self.counts):
+            cumulated += count
+            samples.append(("{0:g}".format(bucket), cumulated))
+        samples.append(("+Inf", self.count))
+        return samples
+
+
+class OpenMetricsExporter(Instrumentation):
+    """
+    Write the durations and counters of the run to a file in the
+    OpenMetrics text format, e.g. for the textfile collector
+    of the Prometheus node exporter.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.phases = defaultdict(Histogram)
+        self.counters = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def span_finished(self, span):
+        with self.lock:
+            self.phases[span.name].observe(span.duration)
+
+    def count(self, name, value):
+        with self.lock:
+            self.counters[name] += value
+
+    def run_finished(self, linter):
+        # Written next to the final file and renamed, so that
+        # a collector never reads a partial file
+        tmp_path = "{0}.{1}.tmp".format(self.path, os.getpid())
+        with open(tmp_path, "w") as f:
+            f.write(self.render(linter))
+        os.rename(tmp_path, self.path)
+
+    def render(self, linter):
+        lines = []
+
+        def add_metric(name, metric_type, help_text, samples):
+            name = "{0}_{1}".format(METRICS_PREFIX, name)
+            lines.append("# TYPE {0} {1}".format(name, metric_type))
+            lines.append("# HELP {0} {1}".format(name, help_text))
+            for suffix, labels, value in samples:
+                labels = ",".join('{0}="{1}"'.format(k, v) for k, v in labels)
+                lines.append(
+                    "{0}{1}{2} {3}".format(
+                        name, suffix, "{" + labels + "}" if labels else "", value
+                    )
+                )
+
+        def get_histogram_samples(histogram, labels=()):
+            samples = [
+                ("_bucket", labels + (("le", bound),), count)
+                for bound, count in histogram.get_samples()
+            ]
+            samples.append(("_count", labels, histogram.count))
+            samples.append(("_sum", labels, histogram.sum))
+            return samples
+
+        with self.lock:
+            phases = dict(self.phases)
+            counters = dict(self.counters)
+
+        if "run" in phases:
+            add_metric(
+                "run_duration_seconds",
+                "histogram",
+                "Duration of the lint run.",
+                get_histogram_samples(phases["run"]),
+            )
+        add_metric(
+            "phase_duration_seconds",
+            "histogram",
+            "Duration of the phases of the lint run.",
+            [
+                sample
+                for name, histogram in sorted(phases.items())
+                if name != "run"
+                for sample in get_histogram_samples(histogram, (("phase", name),))
+            ],
+        )
+
+        for name, value, help_text in (
+            ("migrations_linted", linter.nb_total, "Migrations linted."),
+            ("migrations_valid", linter.nb_valid, "Valid migrations."),
+            ("migrations_erroneous", linter.nb_erroneous, "Erroneous migrations."),
+            ("migrations_ignored", linter.nb_ignored, "Ignored migrations."),
+            (
+                "migrations_cached",
+                counters.get("cache_hits", 0),
+                "Migrations whose lint result was cached.",
+            ),
+            (
+                "sql_statements_analysed",
+                counters.get("sql_statements", 0),
+                "SQL statements analysed.",
+            ),
+        ):
+            add_metric(name, "gauge", help_text, [("", (), value)])
+
+        cache_lookups = counters.get("cache_hits", 0) + counters.get("cache_misses", 0)
+        if cache_lookups:
+            add_metric(
+                "cache_hit_ratio",
+                "gauge",
+                "Ratio of the migrations whose lint result was cached.",
+                [("", (), float(counters.get("cache_hits", 0)) / cache_lookups)],
+            )
+        if linter.should_use_cache() and os.path.exists(linter.new_cache.filename):
+            add_metric(
+                "cache_size_bytes",
+                "gauge",
+                "Size of the cache file.",
+                [("", (), os.path.getsize(linter.new_cache.filename))],
+            )
+
+        add_metric(
+            "last_run_timestamp_seconds",
+            "gauge",
+            "Time at which the lint run finished.",
+            [("", (), time.time())],
+        )
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def start_tracemalloc():
+    try:
+        import tracemalloc
+    except ImportError:
+        raise RuntimeError("Tracing the memory allocations requires Python 3.4+")
+    tracemalloc.start()
+
+
+def dump_tracemalloc(path, limit=TRACEMALLOC_LIMIT):
+    """Write the top allocation sites since start_tracemalloc to a file."""
+    import tracemalloc
+
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    with open(path, "w") as f:
+        for statistic in snapshot.statistics("lineno")[:limit]:
+            f.write("{0}\n".format(statistic))
@@ -0,0 +1,128 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from django.db.migrations.loader import MigrationLoader
+
+logger = logging.getLogger(__name__)
+
+
+class SquashAwareMigrationLoader(MigrationLoader):
+    """
+    Migration loader choosing between each squashed migration and the
+    migrations it replaces, so that only one of them is in the graph.
+
+    Given the applied migrations, the choice is the one migrate would
+    make: the replaced migrations are kept when only part of them are
+    applied. Otherwise, the squashed migrations are kept unless
+    use_replaced is set, when the replaced migrations are all on disk.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.use_replaced = kwargs.pop("use_replaced", False)
+        self.applied_snapshot = kwargs.pop("applied_migrations", None)
+        super(SquashAwareMigrationLoader, self).__init__(*args, **kwargs)
+
+    def load_disk(self):
+        self.removed_squashed_migrations = {}
+        super(SquashAwareMigrationLoader, self).load_disk()
+        for key, migration in list(self.disk_migrations.items()):
+            if migration.replaces and self._should_use_replaced(migration):
+                self._remove_squashed_migration(key, migration)
+
+    def _should_use_replaced(self, migration):
+        replaced_keys = [tuple(replaced) for replaced in migration.replaces]
+        if not all(replaced in self.disk_migrations for replaced in replaced_keys):
+            return False
+        if self.applied_snapshot is not None:
+            applied = [replaced in self.applied_snapshot for replaced in replaced_keys]
+            return any(applied) and not all(applied)
+        return self.use_replaced
+
+    def _remove_squashed_migration(self, key, migration):
+        """
+        Remove the squashed migration before the graph is built, pointing
+        its dependents to the last migration it replaces, like
+        MigrationGraph.remove_replacement_node does.
+        """
+        logger.debug("Using the migrations replaced by {0}.{1}".format(*key))
+        del self.disk_migrations[key]
+        self.removed_squashed_migrations[key] = migration
+        last_replaced = tuple(migration.replaces[-1])
+        for other in self.disk_migrations.values():
+            other.dependencies = [
+                last_replaced if tuple(dependency) == key else dependency
+                for dependency in other.dependencies
+            ]
+            other.run_before = [
+                last_replaced if tuple(dependency) == key else dependency
+                for dependency in other.run_before
+            ]
+
+    def get_redundant_migration_keys(self):
+        """Return the migrations on disk that were left out of the graph."""
+        return (set(self.disk_migrations) - set(self.graph.nodes)) | set(
+            self.removed_squashed_migrations
+        )
+
+
+class PartialMigrationLoader(SquashAwareMigrationLoader):
+    """
+    Migration loader that only reads the migrations of the given apps
+    and of the apps they depend on.
+
+    Migration modules of the other installed apps are never imported,
+    which keeps the loading time proportional to the linted apps instead
+    of the whole project.
+    """
+
+    def __init__(self, app_labels, *args, **kwargs):
+        self.app_labels = set(app_labels)
+        self.skipped_app_labels = set()
+        super(PartialMigrationLoader, self).__init__(*args, **kwargs)
+
+    def migrations_module(self, app_label):
+        if app_label not in self.app_labels:
+            self.skipped_app_labels.add(app_label)
+            return None, False
+        return super(PartialMigrationLoader, self).migrations_module(app_label)
+
+    def load_disk(self):
+        # Extend the loaded apps until all dependencies are satisfied
+        while True:
+            self.skipped_app_labels = set()
+            super(PartialMigrationLoader, self).load_disk()
+            required_app_labels = self._get_required_app_labels()
+            if required_app_labels <= self.app_labels:
+                break
+            logger.debug(
+                "Loading migrations of the dependent apps {0}".format(
+                    ", ".join(sorted(required_app_labels - self.app_labels))
+                )
+            )
+            self.app_labels |= required_app_labels
+
+        # Skipped apps are not part of the project state at all,
+        # they must not be rendered as unmigrated apps.
+        self.unmigrated_apps -= self.skipped_app_labels
+
+    def _get_required_app_labels(self):
+        required_app_labels = set()
+        for migration in self.disk_migrations.values():
+            for app_label, _ in migration.dependencies:
+                required_app_labels.add(app_label)
+            for app_label, _ in migration.run_before:
+                required_app_labels.add(app_label)
+        return required_app_labels
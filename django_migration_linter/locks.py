@@ -0,0 +1,201 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+
+from .results import TableLock
+
+# Table lock modes, from the weakest to the strongest
+POSTGRESQL_LOCK_MODES = (
+    "ACCESS SHARE",
+    "ROW SHARE",
+    "ROW EXCLUSIVE",
+    "SHARE UPDATE EXCLUSIVE",
+    "SHARE",
+    "SHARE ROW EXCLUSIVE",
+    "EXCLUSIVE",
+    "ACCESS EXCLUSIVE",
+)
+# The LOCK clause of the online DDL: whether reads and writes are allowed
+MYSQL_LOCK_MODES = ("NONE", "SHARED", "EXCLUSIVE")
+
+LOCK_MODES = {"postgresql": POSTGRESQL_LOCK_MODES, "mysql": MYSQL_LOCK_MODES}
+
+# The weakest lock mode blocking the writes to the table
+WRITE_BLOCKING_LOCK_MODES = {"postgresql": "SHARE", "mysql": "SHARED"}
+
+# The vendors running the DDL of an atomic migration in a transaction
+TRANSACTIONAL_DDL_VENDORS = ("postgresql",)
+
+QUOTED_NAME = r'[`"]([^`"]*)[`"]'
+DML_TABLE = r'\s*(?:UPDATE|DELETE FROM)\s+[`"]?([^`"\s;]+)'
+
+
+def get_table_name(sql):
+    """
+    Return the name of the table of the statement, if it is quoted,
+    or if it is updated or deleted from (as written in a RunSQL).
+    """
+    for pattern in ("TABLE " + QUOTED_NAME, " ON " + QUOTED_NAME):
+        table_search = re.search(pattern, sql, re.IGNORECASE)
+        if table_search:
+            return table_search.group(1)
+    dml = re.match(DML_TABLE, sql, re.IGNORECASE)
+    if dml:
+        return dml.group(1)
+    return None
+
+
+def _search(pattern, sql):
+    return re.search(pattern, sql, re.IGNORECASE)
+
+
+def _match(pattern, sql):
+    return re.match(r"\s*" + pattern, sql, re.IGNORECASE)
+
+
+def get_referenced_tables(sql):
+    return re.findall(r"REFERENCES " + QUOTED_NAME, sql, re.IGNORECASE)
+
+
+def get_postgresql_locks(sql):
+    lock = _match(r"LOCK (?:TABLE )?" + QUOTED_NAME + r"(?: IN ([A-Z ]+) MODE)?", sql)
+    if lock:
+        return [(lock.group(1), (lock.group(2) or "ACCESS EXCLUSIVE").upper())]
+
+    create_table = _match(r"CREATE TABLE " + QUOTED_NAME, sql)
+    if create_table:
+        return [(create_table.group(1), "ACCESS EXCLUSIVE")] + [
+            (table, "SHARE ROW EXCLUSIVE") for table in get_referenced_tables(sql)
+        ]
+
+    create_index = _match(
+        r"CREATE (?:UNIQUE )?INDEX (CONCURRENTLY )?.*? ON " + QUOTED_NAME, sql
+    )
+    if create_index:
+        mode = "SHARE UPDATE EXCLUSIVE" if create_index.group(1) else "SHARE"
+        return [(create_index.group(2), mode)]
+
+    drop_index = _match(r"DROP INDEX (CONCURRENTLY )?", sql)
+    if drop_index:
+        # The table of the index isn't in the statement
+        mode = "SHARE UPDATE EXCLUSIVE" if drop_index.group(1) else "ACCESS EXCLUSIVE"
+        return [(None, mode)]
+
+    drop_table = _match(r"(?:DROP TABLE|TRUNCATE)(?: TABLE)? " + QUOTED_NAME, sql)
+    if drop_table:
+        return [(drop_table.group(1), "ACCESS EXCLUSIVE")]
+
+    alter_table = _match(r"ALTER TABLE (?:ONLY )?" + QUOTED_NAME, sql)
+    if alter_table:
+        table = alter_table.group(1)
+        if _search(r"ADD CONSTRAINT \S+ FOREIGN KEY", sql):
+            return [(table, "SHARE ROW EXCLUSIVE")] + [
+                (referenced, "SHARE ROW EXCLUSIVE")
+                for referenced in get_referenced_tables(sql)
+            ]
+        if _search(r"VALIDATE CONSTRAINT|SET STATISTICS", sql):
+            return [(table, "SHARE UPDATE EXCLUSIVE")]
+        return [(table, "ACCESS EXCLUSIVE")]
+
+    dml = _match(r"(?:INSERT INTO|UPDATE|DELETE FROM) " + QUOTED_NAME, sql)
+    if dml:
+        return [(dml.group(1), "ROW EXCLUSIVE")]
+    return []
+
+
+def get_mysql_locks(sql):
+    if _match(r"(?:ALTER TABLE|CREATE (?:UNIQUE )?INDEX)", sql):
+        table = get_table_name(sql)
+        explicit_lock = _search(r"LOCK\s*=\s*(NONE|SHARED|EXCLUSIVE)", sql)
+        if explicit_lock:
+            return [(table, explicit_lock.group(1).upper())]
+        if _search(r"RENAME TO", sql):
+            return [(table, "EXCLUSIVE")]
+        # Copying the table allows the reads, but not the writes
+        if _search(r"ALGORITHM\s*=\s*COPY|\bMODIFY\b|FOREIGN KEY", sql):
+            return [(table, "SHARED")]
+        if _search(r"FULLTEXT|SPATIAL", sql):
+            return [(table, "SHARED")]
+        return [(table, "NONE")]
+
+    rename_table = _match(r"RENAME TABLE " + QUOTED_NAME, sql)
+    if rename_table:
+        return [(rename_table.group(1), "EXCLUSIVE")]
+
+    exclusive = _match(
+        r"(?:CREATE TABLE|DROP TABLE|TRUNCATE)(?: TABLE)? " + QUOTED_NAME, sql
+    )
+    if exclusive:
+        return [(exclusive.group(1), "EXCLUSIVE")]
+
+    dml = _match(r"(?:INSERT INTO|UPDATE|DELETE FROM) " + QUOTED_NAME, sql)
+    if dml:
+        return [(dml.group(1), "NONE")]
+    return []
+
+
+def get_statement_locks(sql, vendor):
+    """
+    Return the (table, mode) of the table locks taken by the statement:
+    the lock modes of PostgreSQL, the LOCK clause of the MySQL online DDL.
+    The table is None when the statement doesn't name it.
+    """
+    if vendor == "postgresql":
+        return get_postgresql_locks(sql)
+    if vendor == "mysql":
+        return get_mysql_locks(sql)
+    return []
+
+
+def get_lock_strength(mode, vendor):
+    return LOCK_MODES[vendor].index(mode)
+
+
+def is_blocking_lock(mode, vendor):
+    """Return whether the lock mode blocks the writes to the table."""
+    if vendor not in WRITE_BLOCKING_LOCK_MODES:
+        return False
+    return get_lock_strength(mode, vendor) >= get_lock_strength(
+        WRITE_BLOCKING_LOCK_MODES[vendor], vendor
+    )
+
+
+def get_migration_locks(sql_statements, vendor, atomic=True):
+    """
+    Return the strongest lock taken on each table by the statements of a
+    migration, with the span of statements holding it (numbered from 1).
+    In a transaction, the locks are held until the end of the migration.
+    """
+    if vendor not in LOCK_MODES:
+        return []
+
+    held_until_end = atomic and vendor in TRANSACTIONAL_DDL_VENDORS
+    strongest = {}
+    for number, sql in enumerate(sql_statements, 1):
+        for table, mode in get_statement_locks(sql, vendor):
+            lock = strongest.get(table)
+            if lock is None or get_lock_strength(mode, vendor) > get_lock_strength(
+                lock[0], vendor
+            ):
+                strongest[table] = [mode, number, number]
+            elif mode == lock[0]:
+                lock[2] = number
+
+    return [
+        TableLock(table, mode, first, len(sql_statements) if held_until_end else last)
+        for table, (mode, first, last) in sorted(
+            strongest.items(), key=lambda item: (item[0] is None, item[0] or "")
+        )
+    ]
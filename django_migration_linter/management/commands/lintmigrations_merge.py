@@ -0,0 +1,51 @@
+import logging
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...cli import add_cache_arguments
+from ...constants import __version__
+from ...migration_linter import MigrationLinter
+from ...utils import get_default_django_path
+
+
+class Command(BaseCommand):
+    help = "Combine the results of the shards of a lintmigrations run"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "shard_output",
+            metavar="DIRECTORY",
+            type=str,
+            help="directory containing the results written by all the shards",
+        )
+        parser.add_argument(
+            "--database",
+            type=str,
+            nargs="?",
+            help="specify the database the shards were linted for. Defaults to default",
+        )
+        add_cache_arguments(parser)
+
+    def handle(self, *args, **options):
+        if options["verbosity"] > 1:
+            logging.basicConfig(format="%(message)s", level=logging.DEBUG)
+        else:
+            logging.basicConfig(format="%(message)s")
+
+        linter = MigrationLinter(
+            get_default_django_path(),
+            database=options["database"],
+            cache_path=options["cache_path"],
+            no_cache=options["no_cache"],
+        )
+        try:
+            linter.merge_shard_results(options["shard_output"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        linter.report_summary()
+        if linter.has_errors:
+            sys.exit(1)
+
+    def get_version(self):
+        return __version__
@@ -12,28 +12,95 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from __future__ import print_function
-
 import hashlib
 import logging
 import os
-import re
-from subprocess import Popen, PIPE
+import warnings
 
-from django.core.management import call_command
-from django.db import DEFAULT_DB_ALIAS
-from django.db.migrations import Migration
+from django.db import DEFAULT_DB_ALIAS, connections
 
+from .baseline import Baseline
+from .data_migrations import analyse_data_migration
+from .budget import Budget
 from .cache import Cache
 from .constants import DEFAULT_CACHE_PATH
-from .utils import clean_bytes_to_str, get_migration_abspath, split_migration_path
+from .instrumentation import NULL_SPAN, SpanContext
+from .pipeline import Pipeline
+from .reporters import TextReporter, format_error
+from .rewrites import RewriteTracker
+from .results import (
+    ERR,
+    IGNORE,
+    IGNORE_RESULT,
+    OK,
+    OK_RESULT,
+    LintError,
+    LintResult,
+    MigrationLintResult,
+)
+from .sharding import is_in_shard, read_shard_results
+from .utils import (
+    clean_bytes_to_str,
+    get_migration_abspath,
+    get_server_version,
+    has_lock_timeout_option,
+    is_migration_file,
+    split_migration_path,
+)
 from .sql_analyser import analyse_sql_statements
+from .table_stats import apply_threshold, estimate_impact, load_table_stats
 
 logger = logging.getLogger(__name__)
 
 DJANGO_APPS_WITH_MIGRATIONS = ("admin", "auth", "contenttypes", "sessions")
 
 
+class LintTask(object):
+    """A migration going through the stages of the linting pipeline."""
+
+    __slots__ = (
+        "migration",
+        "fingerprint",
+        "lint_result",
+        "cached",
+        "ignored",
+        "in_baseline",
+        "estimate",
+    )
+
+    def __init__(self, migration):
+        self.migration = migration
+        self.fingerprint = None
+        self.lint_result = None
+        self.cached = False
+        self.ignored = False
+        self.in_baseline = False
+        self.estimate = None
+
+    @property
+    def app_label(self):
+        return self.migration.app_label
+
+    @property
+    def migration_name(self):
+        return self.migration.name
+
+    @property
+    def label(self):
+        return "{0}.{1}".format(self.migration.app_label, self.migration.name)
+
+
+def unbind_operation_fields(operation):
+    """
+    Replace the fields of an operation generated from the live models
+    by unbound copies, so that the operation can be applied to a state.
+    """
+    if getattr(operation, "field", None) is not None:
+        operation.field = operation.field.clone()
+    if getattr(operation, "fields", None) is not None:
+        operation.fields = [(name, field.clone()) for name, field in operation.fields]
+
+
 class MigrationLinter(object):
     def __init__(
         self,
@@ -45,6 +112,19 @@ class MigrationLinter(object):
         database=DEFAULT_DB_ALIAS,
         cache_path=DEFAULT_CACHE_PATH,
         no_cache=False,
+        shard=None,
+        fail_fast=False,
+        instrumentation=None,
+        reporters=None,
+        baseline=None,
+        update_baseline=False,
+        lint_replaced=False,
+        database_version=None,
+        require_lock_timeout=None,
+        blocking_checks=None,
+        table_stats=None,
+        max_lock_duration=None,
+        budget=None,
     ):
         # Store parameters and options
         self.django_path = path
@@ -55,79 +135,491 @@ class MigrationLinter(object):
         self.database = database or DEFAULT_DB_ALIAS
         self.cache_path = cache_path or DEFAULT_CACHE_PATH
         self.no_cache = no_cache
+        self.shard = shard
+        self.fail_fast = fail_fast
+        self.instrumentation = list(instrumentation or [])
+        self.reporters = [TextReporter()] if reporters is None else list(reporters)
+        self.update_baseline = update_baseline
+        self.lint_replaced = lint_replaced
+        self.database_version = database_version
+        self.require_lock_timeout = require_lock_timeout
+        self.blocking_checks = blocking_checks
+        self.max_lock_duration = max_lock_duration
+        self._analysis_context = None
+        self.migration_loader = None
+        self._fingerprints = {}
+        self._pipeline = None
 
         # Initialise counters
         self.nb_valid = 0
         self.nb_ignored = 0
         self.nb_erroneous = 0
         self.nb_total = 0
+        self.nb_baseline = 0
+        self.nb_redundant = 0
+        self.erroneous_migrations = []
+        self.impact_estimates = []
+        self.budget_overruns = []
+        self.rewrite_tracker = RewriteTracker()
+        self.repeated_rewrites = []
+
+        # Migrations whose fingerprint matches the baseline are not linted
+        self.baseline = None
+        self.new_baseline = {}
+        if baseline:
+            self.baseline = Baseline(baseline)
+            with self._span("baseline_load"):
+                self.baseline.load()
+
+        # Offline statistics of the tables, to estimate the impact of the SQL
+        self.table_stats = None
+        if table_stats:
+            with self._span("table_stats_load"):
+                self.table_stats = load_table_stats(table_stats)
+
+        # Limits of the operations of all the linted migrations together
+        self.budget = None
+        if budget:
+            self.budget = Budget.load(budget, vendor=connections[self.database].vendor)
 
         # Initialise cache. Read from old, write to new to prune old entries.
         if self.should_use_cache():
-            self.old_cache = Cache(self.django_path, self.database, self.cache_path)
-            self.new_cache = Cache(self.django_path, self.database, self.cache_path)
-            self.old_cache.load()
+            context_hash = self.get_context_hash()
+            self.old_cache = Cache(
+                self.django_path, self.database, self.cache_path, context_hash
+            )
+            self.new_cache = Cache(
+                self.django_path, self.database, self.cache_path, context_hash
+            )
+            with self._span("cache_load"):
+                self.old_cache.load()
 
     def should_use_cache(self):
         return self.django_path and not self.no_cache
 
-    def lint_all_migrations(self, git_commit_id=None):
-        # Collect migrations
-        if git_commit_id:
+    def get_context_hash(self):
+        """
+        Return a hash of the analysis context when the optional checks
+        are enabled, as they change the results, so that they are cached
+        apart. The server is only queried for its version in that case.
+        """
+        connection = connections[self.database]
+        if not (
+            self.should_run_blocking_checks()
+            or self.should_require_lock_timeout(connection)
+        ):
+            return None
+        context = sorted(self.get_analysis_context().items())
+        return hashlib.md5(repr(context).encode("ascii")).hexdigest()
+
+    def lint_all_migrations(
+        self,
+        git_commit_id=None,
+        migration_paths=None,
+        lazy=False,
+        applied_migrations=None,
+    ):
+        """
+        Lint the migrations. With lazy, return an iterable of the
+        MigrationLintResult instead, the migrations being linted
+        while it is iterated.
+        Given the (app_label, migration_name) of the applied migrations,
+        only the other ones are linted, in the order they would be applied.
+        """
+        results = self.iter_lint_results(
+            git_commit_id, migration_paths, applied_migrations
+        )
+        if lazy:
+            return results
+        for _ in results:
+            pass
+
+    def iter_lint_results(
+        self, git_commit_id=None, migration_paths=None, applied_migrations=None
+    ):
+        with self._span("run"):
+            with self._span("discover"):
+                sorted_migrations = self._discover_migrations(
+                    git_commit_id, migration_paths, applied_migrations
+                )
+
+            # Lint those migrations
+            self._pipeline = Pipeline(
+                [self._prepare_lint_task, self._lint_task, self._report_lint_task],
+                main_stage=1,
+            )
+            try:
+                for task in self._pipeline.iter_run(sorted_migrations):
+                    if task.in_baseline:
+                        continue
+                    yield MigrationLintResult(
+                        task.app_label,
+                        task.migration_name,
+                        task.lint_result,
+                        task.cached,
+                    )
+            finally:
+                self._flush_reporters()
+
+            self.repeated_rewrites = self.rewrite_tracker.finish()
+            if self.budget is not None:
+                self.budget_overruns = self.budget.get_overruns()
+            if self.should_use_cache():
+                if self._pipeline.stopped:
+                    # Keep the entries of the migrations that were not reached
+                    for fingerprint, entry in self.old_cache.items():
+                        self.new_cache.setdefault(fingerprint, entry)
+                with self._span("cache_save"):
+                    self.new_cache.save()
+            if self.baseline is not None and self.update_baseline:
+                with self._span("baseline_save"):
+                    self.save_baseline()
+        self._run_finished()
+
+    def _discover_migrations(
+        self, git_commit_id=None, migration_paths=None, applied_migrations=None
+    ):
+        in_plan_order = False
+        if migration_paths is not None:
+            migrations = self._gather_migrations_from_paths(migration_paths)
+        elif git_commit_id:
             migrations = self._gather_migrations_git(git_commit_id)
+        elif applied_migrations is not None:
+            migrations = self._gather_unapplied_migrations(applied_migrations)
+            in_plan_order = True
         else:
             migrations = self._gather_all_migrations()
+        # Built here, the fingerprints are computed from the migration graph
+        # in another thread of the pipeline
+        self.get_migration_loader()
 
-        # Lint those migrations
-        sorted_migrations = sorted(
-            migrations, key=lambda migration: (migration.app_label, migration.name)
-        )
-        for m in sorted_migrations:
-            self.lint_migration(m)
-
-        if self.should_use_cache():
-            self.new_cache.save()
+        if in_plan_order:
+            sorted_migrations = list(migrations)
+        else:
+            sorted_migrations = sorted(
+                migrations,
+                key=lambda migration: (migration.app_label, migration.name),
+            )
+        if self.shard:
+            sorted_migrations = [
+                m
+                for m in sorted_migrations
+                if is_in_shard(m.app_label, m.name, *self.shard)
+            ]
+
+        # Skip the squashed migrations or the ones they replace, whichever
+        # the loader left out of the graph
+        redundant_keys = self.get_migration_loader().get_redundant_migration_keys()
+        migrations = [
+            m for m in sorted_migrations if (m.app_label, m.name) not in redundant_keys
+        ]
+        self.nb_redundant += len(sorted_migrations) - len(migrations)
+        return migrations
 
     def lint_migration(self, migration):
-        app_label = migration.app_label
-        migration_name = migration.name
-        print("({0}, {1})... ".format(app_label, migration_name), end="")
-        self.nb_total += 1
-
-        md5hash = self.get_migration_hash(app_label, migration_name)
+        task = self._prepare_lint_task(migration)
+        self._report_lint_task(self._lint_task(task))
+
+    def _prepare_lint_task(self, migration):
+        """Fingerprint the migration and look up its cached lint result."""
+        task = LintTask(migration)
+        with self._span("hash", migration=task.label):
+            task.fingerprint = self.get_migration_fingerprint(
+                task.app_label, task.migration_name
+            )
 
-        if self.should_ignore_migration(app_label, migration_name):
-            print("IGNORE")
-            self.nb_ignored += 1
+        if self.should_ignore_migration(task.app_label, task.migration_name):
+            task.lint_result = IGNORE_RESULT
+            task.ignored = True
+        elif self.baseline is not None and self.baseline.matches(
+            task.app_label, task.migration_name, task.fingerprint
+        ):
+            task.lint_result = LintResult(
+                self.baseline[(task.app_label, task.migration_name)][1]
+            )
+            task.in_baseline = True
+            self._count("baseline_hits")
+        elif self.should_use_cache():
+            if task.fingerprint in self.old_cache:
+                task.lint_result = LintResult.from_cache(
+                    self.old_cache[task.fingerprint]
+                )
+                task.cached = True
+                self._count("cache_hits")
+            else:
+                self._count("cache_misses")
+        return task
+
+    def _lint_task(self, task):
+        """Generate and analyse the SQL of the migration, if not cached."""
+        if task.lint_result is None:
+            with self._span("sql", migration=task.label):
+                sql_statements = self.get_sql(task.app_label, task.migration_name)
+            with self._span("analyse", migration=task.label):
+                migration = self.get_migration_loader().get_migration_by_prefix(
+                    task.app_label, task.migration_name
+                )
+                task.lint_result = self.get_lint_result(
+                    sql_statements,
+                    atomic=migration.atomic,
+                    migration=migration,
+                    column_types=self.get_column_types(migration),
+                )
+            self._count("sql_statements", len(sql_statements))
+        return task
+
+    def _report_lint_task(self, task):
+        if task.in_baseline:
+            # Only the deviations from the baseline are reported
+            self.nb_baseline += 1
             return
 
-        if self.should_use_cache() and md5hash in self.old_cache:
-            self.lint_cached_migration(md5hash)
+        self.rewrite_tracker.add(task.app_label, task.migration_name, task.lint_result)
+        if not task.ignored:
+            analysed_result = task.lint_result
+            if self.should_use_cache():
+                if task.cached:
+                    # Keep the entry loaded from the cache, it is already compact
+                    self.new_cache[task.fingerprint] = self.old_cache[task.fingerprint]
+                else:
+                    # Cached before the estimation, which depends on the statistics
+                    self.new_cache[task.fingerprint] = analysed_result.to_cache()
+            if self.table_stats is not None:
+                task.lint_result, task.estimate = self.estimate_impact(
+                    task.app_label, task.migration_name, analysed_result
+                )
+            if self.budget is not None:
+                # Even the operations under the threshold count in the budget
+                self.budget.add(
+                    task.app_label, task.migration_name, analysed_result, task.estimate
+                )
+
+        with self._span("report", migration=task.label):
+            self.report_lint_result(
+                task.app_label,
+                task.migration_name,
+                task.lint_result,
+                cached=task.cached,
+                estimate=task.estimate,
+            )
+        if task.ignored:
             return
 
-        sql_statements = self.get_sql(app_label, migration_name)
-        analysis_result = analyse_sql_statements(sql_statements)
+        self.new_baseline[(task.app_label, task.migration_name)] = (
+            task.fingerprint,
+            task.lint_result.result,
+        )
+        if task.lint_result.is_erroneous:
+            self.erroneous_migrations.append(
+                (task.app_label, task.migration_name, task.lint_result.errors)
+            )
+            if self.fail_fast and self._pipeline is not None:
+                self._pipeline.stop()
+
+    def lint_model_changes(self):
+        """
+        Lint the migrations that makemigrations would generate for the
+        current models, without writing them to disk.
+        """
+        with self._span("run"):
+            with self._span("discover"):
+                state = self.get_migration_loader().project_state()
+                migrations = self._gather_model_changes()
+
+            try:
+                for migration in migrations:
+                    label = "{0}.{1}".format(migration.app_label, migration.name)
+                    # The state must go through all migrations, even the ignored ones
+                    with self._span("sql", migration=label):
+                        column_types = self.get_column_types(migration, state)
+                        sql_statements = self._collect_sql(migration, state)
+
+                    estimate = None
+                    if self.should_ignore_migration(
+                        migration.app_label, migration.name
+                    ):
+                        lint_result = IGNORE_RESULT
+                    else:
+                        with self._span("analyse", migration=label):
+                            lint_result = self.get_lint_result(
+                                sql_statements,
+                                atomic=migration.atomic,
+                                migration=migration,
+                                column_types=column_types,
+                            )
+                        self._count("sql_statements", len(sql_statements))
+                        self.rewrite_tracker.add(
+                            migration.app_label, migration.name, lint_result
+                        )
+                        if self.table_stats is not None:
+                            lint_result, estimate = self.estimate_impact(
+                                migration.app_label, migration.name, lint_result
+                            )
+
+                    with self._span("report", migration=label):
+                        self.report_lint_result(
+                            migration.app_label,
+                            migration.name,
+                            lint_result,
+                            estimate=estimate,
+                        )
+            finally:
+                self._flush_reporters()
+            self.repeated_rewrites = self.rewrite_tracker.finish()
+        self._run_finished()
+
+    def save_baseline(self):
+        """
+        Write the fingerprints and results of the linted migrations to the
+        baseline. The entries of the migrations not linted by this run,
+        e.g. in git or sharded mode, are kept.
+        """
+        self.baseline.update(self.new_baseline)
+        self.baseline.save()
+
+    def _span(self, name, **args):
+        if not self.instrumentation:
+            return NULL_SPAN
+        return SpanContext(self.instrumentation, name, args)
+
+    def _count(self, name, value=1):
+        for listener in self.instrumentation:
+            listener.count(name, value)
+
+    def _flush_reporters(self):
+        for reporter in self.reporters:
+            reporter.flush()
+
+    def _run_finished(self):
+        for listener in self.instrumentation:
+            listener.run_finished(self)
+
+    def get_analysis_context(self):
+        """
+        Return the vendor and the version of the database server, for the
+        tests depending on them. The version is read from the server unless
+        it is given.
+        """
+        if self._analysis_context is None:
+            connection = connections[self.database]
+            self._analysis_context = {
+                "vendor": connection.vendor,
+                "server_version": self.database_version
+                or get_server_version(connection),
+                "require_lock_timeout": self.should_require_lock_timeout(connection),
+                "blocking_checks": self.should_run_blocking_checks(),
+            }
+        return self._analysis_context
+
+    def should_run_blocking_checks(self):
+        """
+        The checks of the migrations blocking the accesses to a table are run
+        for the databases listed in the MIGRATION_LINTER_BLOCKING_CHECKS
+        setting, unless given, and when the impact of the migrations is
+        estimated or budgeted, as it is computed from them.
+        """
+        from django.conf import settings
+
+        if self.blocking_checks is not None:
+            return self.blocking_checks
+        return (
+            self.database in getattr(settings, "MIGRATION_LINTER_BLOCKING_CHECKS", ())
+            or self.table_stats is not None
+            or self.budget is not None
+        )
+
+    def should_require_lock_timeout(self, connection):
+        """
+        The lock timeout is required for the databases listed in the
+        MIGRATION_LINTER_REQUIRE_LOCK_TIMEOUT setting, unless given, and
+        isn't if the connection options already set it.
+        """
+        from django.conf import settings
+
+        require_lock_timeout = self.require_lock_timeout
+        if require_lock_timeout is None:
+            require_lock_timeout = self.database in getattr(
+                settings, "MIGRATION_LINTER_REQUIRE_LOCK_TIMEOUT", ()
+            )
+        return require_lock_timeout and not has_lock_timeout_option(connection)
+
+    def get_lint_result(
+        self, sql_statements, atomic=True, migration=None, column_types=None
+    ):
+        """
+        Analyse the SQL statements of a migration and return the LintResult.
+        Given the migration, the code of its RunPython operations, which
+        generate no SQL, is analysed too.
+        """
+        analysis_result = analyse_sql_statements(
+            sql_statements,
+            atomic=atomic,
+            column_types=column_types,
+            **self.get_analysis_context()
+        )
         errors = analysis_result["errors"]
+        if migration is not None:
+            errors.extend(analyse_data_migration(migration))
+        locks = analysis_result["locks"]
 
         if analysis_result["ignored"]:
-            print("IGNORE")
-            self.nb_ignored += 1
-            if self.should_use_cache():
-                self.new_cache[md5hash] = {"result": "IGNORE"}
-            return
-
+            return IGNORE_RESULT
         if not errors:
-            print("OK")
-            self.nb_valid += 1
-            if self.should_use_cache():
-                self.new_cache[md5hash] = {"result": "OK"}
-            return
+            return LintResult(OK, locks=locks) if locks else OK_RESULT
+        return LintResult(ERR, errors, locks)
+
+    def estimate_impact(self, app_label, migration_name, lint_result):
+        """
+        Estimate the impact of a migration from the statistics of the tables,
+        and return its LintResult under the threshold with the estimate.
+        """
+        estimate = estimate_impact(lint_result, self.table_stats)
+        self.impact_estimates.append((app_label, migration_name, estimate))
+        return apply_threshold(lint_result, estimate, self.max_lock_duration), estimate
+
+    def get_impact_ranking(self):
+        """Return the estimated migrations, from the highest impact down."""
+        return sorted(
+            (entry for entry in self.impact_estimates if entry[2].seconds),
+            key=lambda entry: (-entry[2].seconds, -entry[2].io_bytes, entry[:2]),
+        )
 
-        print("ERR")
-        self.nb_erroneous += 1
-        self.print_errors(errors)
-        if self.should_use_cache():
-            self.new_cache[md5hash] = {"result": "ERR", "errors": errors}
+    def get_migration_fingerprint(self, app_label, migration_name):
+        """
+        Combine the hash of the migration file with the fingerprints of its
+        dependencies, like a Merkle tree: the fingerprint changes whenever
+        the migration or one of its ancestors changes, as its SQL may.
+        Each migration of the graph is hashed at most once per run.
+        """
+        graph = self.get_migration_loader().graph
+        stack = [(app_label, migration_name)]
+        while stack:
+            key = stack[-1]
+            if key in self._fingerprints:
+                stack.pop()
+                continue
+            # Replaced migrations are not part of the graph
+            node = graph.node_map.get(key)
+            parents = sorted(parent.key for parent in node.parents) if node else []
+            missing_parents = [p for p in parents if p not in self._fingerprints]
+            if missing_parents:
+                stack.extend(missing_parents)
+                continue
+
+            stack.pop()
+            fingerprint = self.get_migration_hash(*key)
+            if self.instrumentation:
+                self._count(
+                    "bytes_hashed", os.path.getsize(get_migration_abspath(*key))
+                )
+            if parents:
+                # The fingerprint of a root migration is the hash of its file
+                hash_md5 = hashlib.md5(fingerprint.encode("ascii"))
+                for parent in parents:
+                    hash_md5.update(self._fingerprints[parent].encode("ascii"))
+                fingerprint = hash_md5.hexdigest()
+            self._fingerprints[key] = fingerprint
+        return self._fingerprints[(app_label, migration_name)]
 
     @staticmethod
     def get_migration_hash(app_label, migration_name):
@@ -137,63 +629,222 @@ class MigrationLinter(object):
                 hash_md5.update(chunk)
         return hash_md5.hexdigest()
 
-    def lint_cached_migration(self, md5hash):
-        cached_value = self.old_cache[md5hash]
-        if cached_value["result"] == "IGNORE":
-            print("IGNORE (cached)")
+    def report_lint_result(
+        self, app_label, migration_name, lint_result, cached=False, estimate=None
+    ):
+        self.nb_total += 1
+        if lint_result.result == IGNORE:
             self.nb_ignored += 1
-        elif cached_value["result"] == "OK":
-            print("OK (cached)")
+        elif lint_result.result == OK:
             self.nb_valid += 1
         else:
-            print("ERR (cached)")
             self.nb_erroneous += 1
-            if "errors" in cached_value:
-                self.print_errors(cached_value["errors"])
+        for reporter in self.reporters:
+            reporter.report_migration(
+                app_label, migration_name, lint_result, cached, estimate
+            )
+
+    def merge_shard_results(self, shard_output):
+        """
+        Combine the results written by the shards of a run into the
+        counters of this linter, and their cache deltas into the cache of
+        the optional checks they were linted with.
+        """
+        merged_shards = set()
+        shard_count = None
+        context_hashes = set()
+        cache_deltas = []
+        for shard_result, cache_delta in read_shard_results(shard_output):
+            index, shard_count = shard_result["shard"]
+            merged_shards.add(index)
+            if shard_result["database"] != self.database:
+                raise ValueError(
+                    "The shard {0} was linted on the database {1}, not {2}".format(
+                        "/".join(map(str, shard_result["shard"])),
+                        shard_result["database"],
+                        self.database,
+                    )
+                )
+            context_hashes.add(shard_result.get("context_hash"))
+            if len(context_hashes) > 1:
+                raise ValueError(
+                    "The shards of {0} were linted with different "
+                    "optional checks".format(shard_output)
+                )
+            self.nb_total += shard_result["nb_total"]
+            self.nb_valid += shard_result["nb_valid"]
+            self.nb_erroneous += shard_result["nb_erroneous"]
+            self.nb_ignored += shard_result["nb_ignored"]
+            self.nb_redundant += shard_result.get("nb_redundant", 0)
+            for app_label, migration_name, errors in shard_result["erroneous"]:
+                self.erroneous_migrations.append(
+                    (
+                        app_label,
+                        migration_name,
+                        tuple(LintError(*err) for err in errors),
+                    )
+                )
+            cache_deltas.append(cache_delta)
+
+        missing_shards = set(range(1, (shard_count or 0) + 1)) - merged_shards
+        if shard_count is None or missing_shards:
+            raise ValueError(
+                "Missing shard results in {0}: {1}".format(
+                    shard_output,
+                    ", ".join(map(str, sorted(missing_shards))) or "all",
+                )
+            )
 
-        self.new_cache[md5hash] = cached_value
+        if self.should_use_cache():
+            self.new_cache = Cache(
+                self.django_path, self.database, self.cache_path, context_hashes.pop()
+            )
+            for cache_delta in cache_deltas:
+                self.new_cache.update(cache_delta)
+
+        for app_label, migration_name, errors in sorted(
+            self.erroneous_migrations, key=lambda m: (m[0], m[1])
+        ):
+            for reporter in self.reporters:
+                reporter.report_migration(
+                    app_label, migration_name, LintResult(ERR, errors)
+                )
+
+        if self.should_use_cache():
+            self.new_cache.save()
+
+    def report_summary(self):
+        for reporter in self.reporters:
+            reporter.report_summary(self)
+        self._flush_reporters()
 
     @staticmethod
     def print_errors(errors):
+        """Deprecated: the errors are written by the reporters."""
+        warnings.warn(
+            "print_errors is deprecated, the reporters write the errors",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         for err in errors:
-            error_str = "\t{0}".format(err["err_msg"])
-            if err["table"]:
-                error_str += " (table: {0}".format(err["table"])
-                if err["column"]:
-                    error_str += ", column: {0}".format(err["column"])
-                error_str += ")"
-            print(error_str)
+            if isinstance(err, dict):
+                err = LintError(**err)
+            print("\t{0}".format(format_error(err)))
 
     def print_summary(self):
-        print("*** Summary:")
-        print(
-            (
-                "Valid migrations: {1}/{0} - "
-                "erroneous migrations: {2}/{0} - "
-                "ignored migrations: {3}/{0}"
-            ).format(self.nb_total, self.nb_valid, self.nb_erroneous, self.nb_ignored)
+        """Deprecated: use report_summary."""
+        warnings.warn(
+            "print_summary is deprecated, use report_summary",
+            DeprecationWarning,
+            stacklevel=2,
         )
+        self.report_summary()
 
     @property
     def has_errors(self):
-        return self.nb_erroneous > 0
+        return self.nb_erroneous > 0 or bool(self.budget_overruns)
+
+    def get_migration_loader(self):
+        """
+        Return the migration loader shared by all the migrations of this run,
+        so that the migration graph is only built once.
+        """
+        if self.migration_loader is None:
+            from .loader import SquashAwareMigrationLoader
+
+            self.migration_loader = SquashAwareMigrationLoader(
+                connection=None,
+                ignore_no_migrations=True,
+                use_replaced=self.lint_replaced,
+            )
+        return self.migration_loader
 
     def get_sql(self, app_label, migration_name):
-        logger.info(
-            "Calling sqlmigrate command {} {}".format(app_label, migration_name)
+        """
+        Generate the SQL of a migration, like the sqlmigrate command does,
+        but on the loaded migration graph of the linter.
+        """
+        logger.info("Generating SQL for {} {}".format(app_label, migration_name))
+        loader = self.get_migration_loader()
+
+        migration = loader.get_migration_by_prefix(app_label, migration_name)
+        migration = loader.graph.nodes[(app_label, migration.name)]
+        return self._collect_sql(migration, self.get_migration_state(migration))
+
+    def get_migration_state(self, migration):
+        """Return the project state before the migration."""
+        return self.get_migration_loader().project_state(
+            (migration.app_label, migration.name), at_end=False
         )
-        dev_null = open(os.devnull, "w")
-        sql_statement = call_command(
-            "sqlmigrate",
-            app_label,
-            migration_name,
-            database=self.database,
-            stdout=dev_null,
-        )
-        return sql_statement.splitlines()
+
+    def get_column_types(self, migration, state=None):
+        """
+        Return the types of the columns altered by the migration in the
+        project state before it, if not given: {(table, column): type}.
+        The type changes rewriting the table are told apart from them,
+        on PostgreSQL. The state is only rendered when the checks need it.
+        """
+        from django.core.exceptions import FieldDoesNotExist
+        from django.db.migrations.operations import AlterField
+
+        context = self.get_analysis_context()
+        altered_fields = [
+            operation
+            for operation in migration.operations
+            if isinstance(operation, AlterField)
+        ]
+        if (
+            not altered_fields
+            or not context["blocking_checks"]
+            or context["vendor"] != "postgresql"
+        ):
+            return {}
+
+        if state is None:
+            state = self.get_migration_state(migration)
+        connection = connections[self.database]
+        column_types = {}
+        for operation in altered_fields:
+            try:
+                model = state.apps.get_model(migration.app_label, operation.model_name)
+                field = model._meta.get_field(operation.name)
+            except (LookupError, FieldDoesNotExist):
+                continue
+            db_type = field.db_parameters(connection=connection)["type"]
+            if db_type:
+                column_types[(model._meta.db_table, field.column)] = db_type
+        return column_types
+
+    def _collect_sql(self, migration, state):
+        """
+        Apply the migration on the project state, which is modified in place,
+        and return the SQL statements generated along the way.
+        """
+        connection = connections[self.database]
+        with connection.schema_editor(
+            collect_sql=True, atomic=migration.atomic
+        ) as schema_editor:
+            migration.apply(state, schema_editor, collect_sql=True)
+        return self.format_sql(migration, schema_editor.collected_sql)
+
+    def format_sql(self, migration, sql_statements):
+        """
+        Return the lines of the SQL statements of the migration,
+        as sqlmigrate shows them.
+        """
+        connection = connections[self.database]
+        # Show begin/end around the output only for atomic migrations
+        if migration.atomic and connection.features.can_rollback_ddl:
+            sql_statements = (
+                [connection.ops.start_transaction_sql()]
+                + list(sql_statements)
+                + [connection.ops.end_transaction_sql()]
+            )
+        return "\n".join(sql_statements).splitlines()
 
     def _gather_migrations_git(self, git_commit_id):
-        from django.db.migrations.loader import MIGRATIONS_MODULE_NAME
+        from subprocess import Popen, PIPE
+        from django.db.migrations import Migration
 
         migrations = []
         # Get changes since specified commit
@@ -204,10 +855,7 @@ class MigrationLinter(object):
         diff_process = Popen(git_diff_command, shell=True, stdout=PIPE, stderr=PIPE)
         for line in map(clean_bytes_to_str, diff_process.stdout.readlines()):
             # Only gather lines that include added migrations
-            if (
-                re.search(r"/{0}/.*\.py".format(MIGRATIONS_MODULE_NAME), line)
-                and "__init__" not in line
-            ):
+            if is_migration_file(line):
                 app_label, name = split_migration_path(line)
                 migrations.append(Migration(name, app_label))
         diff_process.wait()
@@ -220,17 +868,111 @@ class MigrationLinter(object):
             raise Exception("Error while executing git diff command")
         return migrations
 
-    @staticmethod
-    def _gather_all_migrations():
-        from django.db.migrations.loader import MigrationLoader
+    def _gather_migrations_from_paths(self, migration_paths):
+        from django.db.migrations import Migration
+        from .loader import PartialMigrationLoader
+
+        migrations = []
+        for path in migration_paths:
+            # Silently skip the files that are not migrations
+            if is_migration_file(path):
+                app_label, name = split_migration_path(path)
+                migrations.append(Migration(name, app_label))
+
+        # Only load the migration graph of the apps that are linted
+        self.migration_loader = PartialMigrationLoader(
+            set(migration.app_label for migration in migrations),
+            connection=None,
+            ignore_no_migrations=True,
+            use_replaced=self.lint_replaced,
+        )
+        return migrations
 
-        migration_loader = MigrationLoader(connection=None, load=False)
-        migration_loader.load_disk()
+    def _gather_model_changes(self):
+        """
+        Run the autodetector of makemigrations against the loaded migration
+        graph and return the migrations it would write, in dependency order.
+        """
+        from django.apps import apps
+        from django.db.migrations.autodetector import MigrationAutodetector
+        from django.db.migrations.questioner import MigrationQuestioner
+        from django.db.migrations.state import ProjectState
+
+        loader = self.get_migration_loader()
+        autodetector = MigrationAutodetector(
+            loader.project_state(),
+            ProjectState.from_apps(apps),
+            MigrationQuestioner(dry_run=True),
+        )
+        changes = autodetector.changes(graph=loader.graph)
+
+        pending_migrations = {}
+        for app_migrations in changes.values():
+            for migration in app_migrations:
+                # Like the written migrations, hold no field bound to a model
+                for operation in migration.operations:
+                    unbind_operation_fields(operation)
+                pending_migrations[(migration.app_label, migration.name)] = migration
+        ordered_migrations = []
+
+        def visit(key):
+            migration = pending_migrations.pop(key, None)
+            if migration is None:
+                return
+            for dependency in migration.dependencies:
+                visit(tuple(dependency))
+            ordered_migrations.append(migration)
+
+        for key in sorted(pending_migrations):
+            visit(key)
+        return ordered_migrations
+
+    def _gather_all_migrations(self):
+        migration_loader = self.get_migration_loader()
+        disk_migrations = dict(migration_loader.disk_migrations)
+        # Still on disk, they are counted as redundant
+        disk_migrations.update(migration_loader.removed_squashed_migrations)
         # Prune Django apps
-        for (app_label, _), migration in migration_loader.disk_migrations.items():
+        for (app_label, _), migration in disk_migrations.items():
             if app_label not in DJANGO_APPS_WITH_MIGRATIONS:
                 yield migration
 
+    def _gather_unapplied_migrations(self, applied_migrations):
+        """
+        Return the migrations that migrate would apply on top of the applied
+        ones, in plan order, like MigrationExecutor.migration_plan does.
+        """
+        from .loader import SquashAwareMigrationLoader
+
+        applied_migrations = set(applied_migrations)
+        # The squashed migrations are used or not depending on the applied ones
+        self.migration_loader = SquashAwareMigrationLoader(
+            connection=None,
+            ignore_no_migrations=True,
+            use_replaced=self.lint_replaced,
+            applied_migrations=applied_migrations,
+        )
+        self._fingerprints = {}
+        graph = self.migration_loader.graph
+        migrations = []
+        planned = set()
+        for target in graph.leaf_nodes():
+            for key in graph.forwards_plan(target):
+                if key in planned or key in applied_migrations:
+                    continue
+                planned.add(key)
+                migration = graph.nodes[key]
+                # A squashed migration is applied once all it replaces is
+                if migration.replaces and all(
+                    tuple(replaced) in applied_migrations
+                    for replaced in migration.replaces
+                ):
+                    continue
+                if key[0] not in DJANGO_APPS_WITH_MIGRATIONS:
+                    migrations.append(migration)
+        logger.info("{0} migrations are not applied yet".format(len(migrations)))
+        return migrations
+
     def should_ignore_migration(self, app_label, migration_name):
         return (
             (self.include_apps and app_label not in self.include_apps)
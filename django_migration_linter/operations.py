@@ -14,7 +14,7 @@
 
 from django.db.migrations.operations.base import Operation
 
-IGNORE_MIGRATION_SQL = "select 1; -- dml ignores this migration"
+from .constants import IGNORE_MIGRATION_SQL
 
 
 class IgnoreMigration(Operation):
@@ -0,0 +1,158 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import threading
+
+if sys.version_info >= (3,):
+    import queue
+else:
+    import Queue as queue
+
+DEFAULT_QUEUE_SIZE = 16
+
+# Delay after which a blocked stage checks if the pipeline was stopped
+POLL_INTERVAL = 0.1
+
+_END = object()
+
+
+class Pipeline(object):
+    """
+    Run items through consecutive stages connected by bounded queues.
+
+    Every stage runs in its own thread, except the main stage which runs
+    in the calling thread (for code relying on the thread-local database
+    connections of Django). Items keep their order through the stages,
+    and the bounded queues keep the number of in-flight items constant.
+    The output of the last stage is discarded.
+    """
+
+    def __init__(self, stages, main_stage=None, queue_size=DEFAULT_QUEUE_SIZE):
+        self.stages = stages
+        self.main_stage = main_stage
+        self.queue_size = queue_size
+        self._stop_event = threading.Event()
+        self._exception = None
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def stop(self):
+        """Cancel the outstanding work, the items in flight are dropped."""
+        self._stop_event.set()
+
+    def run(self, items):
+        for _ in self.iter_run(items):
+            pass
+
+    def iter_run(self, items):
+        """
+        Like run, but yield the outputs of the main stage as they come in.
+        The main stage only progresses while the caller is iterating.
+        """
+        queues = [queue.Queue(self.queue_size) for _ in self.stages]
+        threads = [
+            threading.Thread(
+                target=self._feed, args=(items, queues[0]), name="pipeline-feed"
+            )
+        ]
+        for i, stage in enumerate(self.stages):
+            if i == self.main_stage:
+                continue
+            threads.append(
+                threading.Thread(
+                    target=self._run_stage,
+                    args=(stage, queues[i], self._get_output_queue(queues, i)),
+                    name="pipeline-{0}".format(getattr(stage, "__name__", i)),
+                )
+            )
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        try:
+            if self.main_stage is not None:
+                for result in self._iter_stage(
+                    self.stages[self.main_stage],
+                    queues[self.main_stage],
+                    self._get_output_queue(queues, self.main_stage),
+                ):
+                    yield result
+        except BaseException:
+            self.stop()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+
+        if self._exception is not None:
+            raise self._exception
+
+    @staticmethod
+    def _get_output_queue(queues, i):
+        return queues[i + 1] if i + 1 < len(queues) else None
+
+    def _feed(self, items, output_queue):
+        try:
+            for item in items:
+                if not self._put(output_queue, item):
+                    break
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._put(output_queue, _END)
+
+    def _run_stage(self, stage, input_queue, output_queue):
+        for _ in self._iter_stage(stage, input_queue, output_queue):
+            pass
+
+    def _iter_stage(self, stage, input_queue, output_queue):
+        try:
+            while True:
+                item = self._get(input_queue)
+                if item is _END:
+                    break
+                result = stage(item)
+                if output_queue is not None and not self._put(output_queue, result):
+                    break
+                yield result
+        except Exception as e:
+            self._fail(e)
+        finally:
+            if output_queue is not None:
+                self._put(output_queue, _END)
+
+    def _fail(self, exception):
+        if self._exception is None:
+            self._exception = exception
+        self.stop()
+
+    def _get(self, input_queue):
+        while not self.stopped:
+            try:
+                return input_queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                pass
+        return _END
+
+    def _put(self, output_queue, item):
+        while not self.stopped:
+            try:
+                output_queue.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
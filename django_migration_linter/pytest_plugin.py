@@ -0,0 +1,48 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+pytest-django plugin linting the migrations applied while creating the
+test databases and storing the results in the linter's cache.
+
+Enable it with ``-p django_migration_linter.pytest_plugin``.
+"""
+
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("django-migration-linter")
+    group.addoption(
+        "--migration-linter-cache-path",
+        action="store",
+        default=None,
+        help="directory of the cache of the migration linter",
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    if fixturedef.argname != "django_db_setup":
+        yield
+        return
+
+    # Imported once Django is set up, it loads the migration machinery
+    from .capture import MigrationSqlCapture
+
+    with MigrationSqlCapture() as capture:
+        yield
+    capture.store_lint_results(
+        cache_path=request.config.getoption("migration_linter_cache_path")
+    )
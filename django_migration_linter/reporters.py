@@ -0,0 +1,386 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import sys
+from timeit import default_timer
+from xml.sax.saxutils import escape, quoteattr
+
+from .constants import __version__
+from .results import ERR, IGNORE
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+# Seconds after which the buffered output is written anyway,
+# so that the results of a long run still come in incrementally.
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Number of migrations listed in the ranking of the estimated impacts
+IMPACT_RANKING_SIZE = 10
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+INFORMATION_URI = "https://github.com/3YOURMIND/django-migration-linter"
+
+
+def format_lock(lock):
+    return "LOCK {0} on {1} (statements {2}-{3})".format(
+        lock.mode,
+        lock.table if lock.table is not None else "an unknown table",
+        lock.first_statement,
+        lock.last_statement,
+    )
+
+
+def format_size(size):
+    if size < 1024:
+        return "{0} B".format(size)
+    size = float(size)
+    for unit in ("kB", "MB", "GB", "TB"):
+        size /= 1024
+        if size < 1024:
+            break
+    return "{0:.1f} {1}".format(size, unit)
+
+
+def format_estimate(estimate):
+    text = "ESTIMATE {0:.1f}s holding the locks, {1} read and written".format(
+        estimate.seconds, format_size(estimate.io_bytes)
+    )
+    if estimate.unknown_tables:
+        text += " (no statistics for {0})".format(", ".join(estimate.unknown_tables))
+    return text
+
+
+def format_repeated_rewrite(repeated):
+    return "{0}: rewritten {1} times by {2}".format(
+        repeated.table,
+        repeated.rewrites,
+        ", ".join("({0}, {1})".format(*key) for key in repeated.migrations),
+    )
+
+
+BUDGET_METRIC_NAMES = {
+    "rewrites": "table rewrites",
+    "blocking_locks": "blocking locks",
+    "seconds": "seconds of estimated locks",
+}
+
+
+def format_budget_overrun(overrun):
+    total, limit = overrun.total, overrun.limit
+    if overrun.metric == "seconds":
+        total, limit = "{0:.1f}".format(total), "{0:.1f}".format(limit)
+    return "{0}: {1} {2}, above the limit of {3}, by {4}".format(
+        overrun.table if overrun.table is not None else "release",
+        total,
+        BUDGET_METRIC_NAMES[overrun.metric],
+        limit,
+        ", ".join("({0}, {1})".format(*key) for key in overrun.migrations),
+    )
+
+
+def format_error(err):
+    error_str = err.err_msg
+    if err.table:
+        error_str += " (table: {0}".format(err.table)
+        if err.column:
+            error_str += ", column: {0}".format(err.column)
+        error_str += ")"
+    return error_str
+
+
+class BufferedWriter(object):
+    """
+    Gather the output in memory and write it in large chunks: when the
+    buffer is full, or when the previous write is older than the interval.
+    Without a stream, the output goes to the current sys.stdout.
+    """
+
+    def __init__(
+        self,
+        stream=None,
+        buffer_size=DEFAULT_BUFFER_SIZE,
+        flush_interval=DEFAULT_FLUSH_INTERVAL,
+    ):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._size = 0
+        self._last_flush = default_timer()
+
+    def write(self, text):
+        self._buffer.append(text)
+        self._size += len(text)
+        if (
+            self._size >= self.buffer_size
+            or default_timer() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        self._last_flush = default_timer()
+        if not self._buffer:
+            return
+        stream = self.stream or sys.stdout
+        stream.write("".join(self._buffer))
+        stream.flush()
+        self._buffer = []
+        self._size = 0
+
+
+class Reporter(object):
+    """
+    Write the lint results of a run in some format, as they come in.
+
+    report_migration is called for each linted migration, from a single
+    thread at a time, and report_summary once at the end of the run.
+    With lock_report, the reporters supporting it also write the table
+    locks taken by each migration. Given the statistics of the tables,
+    the estimated impact of each migration comes along with its result.
+    """
+
+    def __init__(self, stream=None, lock_report=False, **kwargs):
+        self.lock_report = lock_report
+        self.writer = BufferedWriter(stream, **kwargs)
+
+    def report_migration(
+        self, app_label, migration_name, lint_result, cached=False, estimate=None
+    ):
+        pass
+
+    def report_summary(self, linter):
+        pass
+
+    def flush(self):
+        self.writer.flush()
+
+
+class TextReporter(Reporter):
+    def report_migration(
+        self, app_label, migration_name, lint_result, cached=False, estimate=None
+    ):
+        lines = [
+            "({0}, {1})... {2}{3}".format(
+                app_label,
+                migration_name,
+                lint_result.result,
+                " (cached)" if cached else "",
+            )
+        ]
+        for err in lint_result.errors:
+            lines.append("\t" + format_error(err))
+        if self.lock_report:
+            for lock in lint_result.locks:
+                lines.append("\t" + format_lock(lock))
+        if estimate is not None and (estimate.seconds or estimate.unknown_tables):
+            lines.append("\t" + format_estimate(estimate))
+        self.writer.write("\n".join(lines) + "\n")
+
+    def report_summary(self, linter):
+        self.writer.write(
+            (
+                "*** Summary:\n"
+                "Valid migrations: {1}/{0} - "
+                "erroneous migrations: {2}/{0} - "
+                "ignored migrations: {3}/{0}\n"
+            ).format(
+                linter.nb_total, linter.nb_valid, linter.nb_erroneous, linter.nb_ignored
+            )
+        )
+        if linter.nb_redundant:
+            self.writer.write(
+                "Redundant squashed or replaced migrations skipped: {0}\n".format(
+                    linter.nb_redundant
+                )
+            )
+        if linter.nb_baseline:
+            self.writer.write(
+                "Migrations matching the baseline: {0}\n".format(linter.nb_baseline)
+            )
+        if linter.repeated_rewrites:
+            self.writer.write(
+                "*** Mergeable table rewrites, {0} rebuilds could be saved:\n".format(
+                    sum(
+                        repeated.rebuilds_saved for repeated in linter.repeated_rewrites
+                    )
+                )
+            )
+            for repeated in linter.repeated_rewrites:
+                self.writer.write(format_repeated_rewrite(repeated) + "\n")
+        if linter.budget_overruns:
+            self.writer.write("*** Budget exceeded:\n")
+            for overrun in linter.budget_overruns:
+                self.writer.write(format_budget_overrun(overrun) + "\n")
+        ranking = linter.get_impact_ranking()
+        if ranking:
+            self.writer.write("*** Highest estimated impact:\n")
+            for app_label, migration_name, estimate in ranking[:IMPACT_RANKING_SIZE]:
+                self.writer.write(
+                    "({0}, {1}) {2}\n".format(
+                        app_label, migration_name, format_estimate(estimate)
+                    )
+                )
+
+
+class JsonLinesReporter(Reporter):
+    """One JSON object per migration, followed by one for the summary."""
+
+    def report_migration(
+        self, app_label, migration_name, lint_result, cached=False, estimate=None
+    ):
+        obj = {
+            "app_label": app_label,
+            "migration_name": migration_name,
+            "result": lint_result.result,
+            "cached": cached,
+            "errors": [err.as_dict() for err in lint_result.errors],
+        }
+        if self.lock_report:
+            obj["locks"] = [lock.as_dict() for lock in lint_result.locks]
+        if estimate is not None:
+            obj["estimate"] = estimate.as_dict()
+        self._write(obj)
+
+    def report_summary(self, linter):
+        summary = {
+            "total": linter.nb_total,
+            "valid": linter.nb_valid,
+            "erroneous": linter.nb_erroneous,
+            "ignored": linter.nb_ignored,
+            "redundant": linter.nb_redundant,
+            "baseline": linter.nb_baseline,
+        }
+        if linter.repeated_rewrites:
+            summary["repeated_rewrites"] = [
+                repeated.as_dict() for repeated in linter.repeated_rewrites
+            ]
+        if linter.budget is not None:
+            summary["budget_overruns"] = [
+                overrun.as_dict() for overrun in linter.budget_overruns
+            ]
+        self._write({"summary": summary})
+
+    def _write(self, obj):
+        self.writer.write(json.dumps(obj, sort_keys=True) + "\n")
+
+
+class JUnitReporter(Reporter):
+    """
+    One test case per migration, failing for the erroneous ones.
+    The test suite is streamed, so its totals are not in its attributes.
+    """
+
+    def __init__(self, stream=None, **kwargs):
+        super(JUnitReporter, self).__init__(stream, **kwargs)
+        self.writer.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            "<testsuites>\n"
+            '<testsuite name="django-migration-linter">\n'
+        )
+
+    def report_migration(
+        self, app_label, migration_name, lint_result, cached=False, estimate=None
+    ):
+        testcase = "<testcase classname={0} name={1}>".format(
+            quoteattr(app_label), quoteattr(migration_name)
+        )
+        errors = lint_result.errors
+        if lint_result.result == ERR:
+            testcase += "<failure type={0} message={1}>{2}</failure>".format(
+                quoteattr(",".join(err.code for err in errors) or ERR),
+                quoteattr("; ".join(err.err_msg for err in errors)),
+                escape("\n".join(format_error(err) for err in errors)),
+            )
+        elif lint_result.result == IGNORE:
+            testcase += "<skipped/>"
+        self.writer.write(testcase + "</testcase>\n")
+
+    def report_summary(self, linter):
+        self.writer.write("</testsuite>\n</testsuites>\n")
+
+
+class SarifReporter(Reporter):
+    """
+    A SARIF 2.1.0 log with one result per error. The results are streamed,
+    the rules are written after them, once all the error codes are known.
+    """
+
+    def __init__(self, stream=None, **kwargs):
+        super(SarifReporter, self).__init__(stream, **kwargs)
+        self.rules = {}
+        self.nb_results = 0
+        self.writer.write(
+            '{{"version": "2.1.0", "$schema": {0}, "runs": [{{"results": ['.format(
+                json.dumps(SARIF_SCHEMA)
+            )
+        )
+
+    def report_migration(
+        self, app_label, migration_name, lint_result, cached=False, estimate=None
+    ):
+        if lint_result.result != ERR:
+            return
+        location = self._get_location(app_label, migration_name)
+        for err in lint_result.errors:
+            self.rules.setdefault(err.code, err.err_msg)
+            result = {
+                "ruleId": err.code,
+                "level": "error",
+                "message": {
+                    "text": "{0}.{1}: {2}".format(
+                        app_label, migration_name, format_error(err)
+                    )
+                },
+            }
+            if location:
+                result["locations"] = [location]
+            self.writer.write(("," if self.nb_results else "") + json.dumps(result))
+            self.nb_results += 1
+
+    def report_summary(self, linter):
+        tool = {
+            "driver": {
+                "name": "django-migration-linter",
+                "version": __version__,
+                "informationUri": INFORMATION_URI,
+                "rules": [
+                    {"id": code, "shortDescription": {"text": err_msg}}
+                    for code, err_msg in sorted(self.rules.items())
+                ],
+            }
+        }
+        self.writer.write('], "tool": {0}}}]}}\n'.format(json.dumps(tool)))
+
+    @staticmethod
+    def _get_location(app_label, migration_name):
+        from .utils import get_migration_abspath
+
+        try:
+            path = os.path.relpath(get_migration_abspath(app_label, migration_name))
+        except (ImportError, LookupError, ValueError):
+            # e.g. the migrations of --model-changes are not written
+            return None
+        return {
+            "physicalLocation": {"artifactLocation": {"uri": path.replace(os.sep, "/")}}
+        }
+
+
+REPORTERS = {
+    "text": TextReporter,
+    "jsonl": JsonLinesReporter,
+    "junit": JUnitReporter,
+    "sarif": SarifReporter,
+}
@@ -0,0 +1,131 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+from collections import namedtuple
+
+if sys.version_info >= (3,):
+    from sys import intern
+else:
+    from __builtin__ import intern
+
+OK = "OK"
+ERR = "ERR"
+IGNORE = "IGNORE"
+
+
+class LintError(namedtuple("LintError", ("code", "err_msg", "table", "column"))):
+    """
+    An error found in the SQL of a migration.
+    The codes and messages are interned, they are shared by all the errors.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, code, err_msg, table=None, column=None):
+        return super(LintError, cls).__new__(
+            cls, intern(str(code)), intern(str(err_msg)), table, column
+        )
+
+    def as_dict(self):
+        return dict(zip(self._fields, self))
+
+
+class TableLock(
+    namedtuple("TableLock", ("table", "mode", "first_statement", "last_statement"))
+):
+    """
+    The strongest lock taken on a table by a migration, held from the first
+    to the last statement given (numbered from 1).
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, table, mode, first_statement, last_statement):
+        return super(TableLock, cls).__new__(
+            cls, table, intern(str(mode)), first_statement, last_statement
+        )
+
+    def as_dict(self):
+        return dict(zip(self._fields, self))
+
+
+class LintResult(namedtuple("LintResult", ("result", "errors", "locks"))):
+    """
+    The verdict on the SQL of a migration: OK, ERR or IGNORE,
+    with the table locks it takes.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, result, errors=(), locks=()):
+        return super(LintResult, cls).__new__(
+            cls, intern(str(result)), tuple(errors), tuple(locks)
+        )
+
+    @property
+    def is_erroneous(self):
+        return self.result == ERR
+
+    def to_cache(self):
+        """Return the compact form stored in the cache, made of plain tuples."""
+        errors = tuple(tuple(err) for err in self.errors)
+        if not self.locks:
+            return self.result, errors
+        return self.result, errors, tuple(tuple(lock) for lock in self.locks)
+
+    @classmethod
+    def from_cache(cls, entry):
+        if isinstance(entry, dict):
+            # Written by the previous versions of the linter
+            return cls(
+                entry["result"],
+                [
+                    LintError(err["code"], err["err_msg"], err["table"], err["column"])
+                    for err in entry.get("errors", [])
+                ],
+            )
+        result, errors = entry[:2]
+        locks = entry[2] if len(entry) > 2 else ()
+        return cls(
+            result,
+            [LintError(*err) for err in errors],
+            [TableLock(*lock) for lock in locks],
+        )
+
+
+OK_RESULT = LintResult(OK)
+IGNORE_RESULT = LintResult(IGNORE)
+
+
+class MigrationLintResult(
+    namedtuple(
+        "MigrationLintResult", ("app_label", "migration_name", "lint_result", "cached")
+    )
+):
+    """The lint result of a migration, as yielded by the linter."""
+
+    __slots__ = ()
+
+    @property
+    def result(self):
+        return self.lint_result.result
+
+    @property
+    def errors(self):
+        return self.lint_result.errors
+
+    @property
+    def locks(self):
+        return self.lint_result.locks
@@ -0,0 +1,79 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import namedtuple
+
+
+class RepeatedRewrite(
+    namedtuple("RepeatedRewrite", ("table", "migrations", "rewrites"))
+):
+    """
+    A table rewritten several times by a migration, or by consecutive
+    migrations: merged into one statement, it would be rewritten once.
+    """
+
+    __slots__ = ()
+
+    @property
+    def rebuilds_saved(self):
+        return self.rewrites - 1
+
+    def as_dict(self):
+        return {
+            "table": self.table,
+            "migrations": [list(key) for key in self.migrations],
+            "rewrites": self.rewrites,
+            "rebuilds_saved": self.rebuilds_saved,
+        }
+
+
+class RewriteTracker(object):
+    """
+    Follow the tables rewritten by the linted migrations, in the order they
+    are linted, and gather those rewritten more than once in a row.
+    """
+
+    def __init__(self):
+        # table -> [migrations rewriting it in a row, number of rewrites]
+        self.streaks = {}
+        self.repeated_rewrites = []
+
+    def add(self, app_label, migration_name, lint_result):
+        rewrites = {}
+        for err in lint_result.errors:
+            if err.code == "TABLE_REWRITE" and err.table:
+                rewrites[err.table] = rewrites.get(err.table, 0) + 1
+
+        # A migration in between not rewriting the table ends its streak
+        for table in set(self.streaks) - set(rewrites):
+            self._end_streak(table)
+        for table, count in rewrites.items():
+            streak = self.streaks.setdefault(table, [[], 0])
+            streak[0].append((app_label, migration_name))
+            streak[1] += count
+
+    def _end_streak(self, table):
+        migrations, rewrites = self.streaks.pop(table)
+        if rewrites > 1:
+            self.repeated_rewrites.append(
+                RepeatedRewrite(table, tuple(migrations), rewrites)
+            )
+
+    def finish(self):
+        """End the streaks and return the RepeatedRewrite of the run."""
+        for table in list(self.streaks):
+            self._end_streak(table)
+        return sorted(
+            self.repeated_rewrites, key=lambda repeated: (-repeated.rewrites, repeated)
+        )
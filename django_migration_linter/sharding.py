@@ -0,0 +1,84 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import glob
+import hashlib
+import json
+import os
+import pickle
+
+SHARD_RESULT_FILENAME = "shard-{0}-of-{1}.json"
+SHARD_CACHE_FILENAME = "shard-{0}-of-{1}.cache.pickle"
+
+
+def parse_shard(value):
+    """Parse a shard given as INDEX/COUNT, INDEX starting at 1."""
+    try:
+        index, count = map(int, value.split("/"))
+    except ValueError:
+        raise ValueError("The shard must be given as INDEX/COUNT, e.g. 1/4")
+    if not 1 <= index <= count:
+        raise ValueError("The shard index must be between 1 and {0}".format(count))
+    return index, count
+
+
+def is_in_shard(app_label, migration_name, index, count):
+    """
+    Deterministically assign a migration to a shard, based on a hash
+    of its name that is stable across machines and Python versions.
+    """
+    key = "{0}.{1}".format(app_label, migration_name).encode("utf-8")
+    return int(hashlib.md5(key).hexdigest(), 16) % count == index - 1
+
+
+def write_shard_result(linter, shard_output):
+    """Write the result and the cache delta of a sharded linter run."""
+    index, count = linter.shard
+    if not os.path.exists(shard_output):
+        os.makedirs(shard_output)
+
+    cache_filename = SHARD_CACHE_FILENAME.format(index, count)
+    shard_result = {
+        "shard": [index, count],
+        "database": linter.database,
+        # The optional checks change the results, and the cache file
+        "context_hash": linter.get_context_hash(),
+        "nb_total": linter.nb_total,
+        "nb_valid": linter.nb_valid,
+        "nb_erroneous": linter.nb_erroneous,
+        "nb_ignored": linter.nb_ignored,
+        "nb_redundant": linter.nb_redundant,
+        "erroneous": linter.erroneous_migrations,
+        "cache": cache_filename,
+    }
+    with open(
+        os.path.join(shard_output, SHARD_RESULT_FILENAME.format(index, count)), "w"
+    ) as f:
+        json.dump(shard_result, f, separators=(",", ":"), sort_keys=True)
+
+    cache_delta = dict(linter.new_cache) if linter.should_use_cache() else {}
+    with open(os.path.join(shard_output, cache_filename), "wb") as f:
+        pickle.dump(cache_delta, f, protocol=2)
+
+
+def read_shard_results(shard_output):
+    """Yield the result and the cache delta of every shard of a run."""
+    for result_path in sorted(
+        glob.glob(os.path.join(shard_output, SHARD_RESULT_FILENAME.format("*", "*")))
+    ):
+        with open(result_path, "r") as f:
+            shard_result = json.load(f)
+        with open(os.path.join(shard_output, shard_result["cache"]), "rb") as f:
+            cache_delta = pickle.load(f)
+        yield shard_result, cache_delta
@@ -0,0 +1,77 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+def load_applied_migrations(path):
+    """
+    Return the (app_label, migration_name) of the migrations applied
+    according to a snapshot of a database: either a SQLite copy of it,
+    or a JSON export of its django_migrations table.
+    """
+    with open(path, "rb") as f:
+        header = f.read(len(SQLITE_HEADER))
+    if header == SQLITE_HEADER:
+        return _load_sqlite_snapshot(path)
+    return _load_json_snapshot(path)
+
+
+def _load_sqlite_snapshot(path):
+    from django.db import DEFAULT_DB_ALIAS
+    from django.db.migrations.recorder import MigrationRecorder
+    from django.db.utils import ConnectionHandler
+
+    # A connection of its own, the ones of the project are left untouched
+    handler = ConnectionHandler(
+        {DEFAULT_DB_ALIAS: {"ENGINE": "django.db.backends.sqlite3", "NAME": path}}
+    )
+    connection = handler[DEFAULT_DB_ALIAS]
+    recorder = MigrationRecorder(connection)
+    try:
+        if not recorder.has_table():
+            return set()
+        # The queryset of the recorder would go through the connections of
+        # the project, query the table directly instead
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT app, name FROM {0}".format(
+                    connection.ops.quote_name(recorder.Migration._meta.db_table)
+                )
+            )
+            return set(tuple(row) for row in cursor.fetchall())
+    finally:
+        connection.close()
+
+
+def _load_json_snapshot(path):
+    """
+    The export is a list of rows, either objects with the app and name
+    columns (as dumped by most database tools, or wrapped in "fields"
+    like the dumpdata command does) or [app, name] pairs.
+    """
+    with open(path, "r") as f:
+        rows = json.load(f)
+
+    applied_migrations = set()
+    for row in rows:
+        if isinstance(row, dict):
+            row = row.get("fields", row)
+            applied_migrations.add((row["app"], row["name"]))
+        else:
+            app_label, migration_name = row[:2]
+            applied_migrations.add((app_label, migration_name))
+    return applied_migrations
@@ -15,7 +15,9 @@
 import re
 import logging
 
-from .operations import IGNORE_MIGRATION_SQL
+from .constants import IGNORE_MIGRATION_SQL
+from .locks import get_migration_locks, get_statement_locks, get_table_name
+from .results import LintError
 
 IGNORED_MIGRATION = "IGNORED_MIGRATION"
 
@@ -24,7 +26,7 @@ logger = logging.getLogger(__name__)
 
 def has_default(sql, **kwargs):
     if re.search("SET DEFAULT", sql) and kwargs["errors"]:
-        err = next((err for err in kwargs["errors"] if err["code"] == "NOT_NULL"), None)
+        err = next((err for err in kwargs["errors"] if err.code == "NOT_NULL"), None)
         if err:
             logger.info(
                 (
@@ -37,6 +39,354 @@ def has_default(sql, **kwargs):
     return False  # Never fails
 
 
+# Types of which PostgreSQL widens the columns without rewriting the table,
+# e.g. a longer varchar, as long as the type parameters only grow
+POSTGRESQL_WIDENED_TYPES = ("varchar", "varbit", "numeric")
+POSTGRESQL_TYPE_ALIASES = {
+    "character varying": "varchar",
+    "bit varying": "varbit",
+    "decimal": "numeric",
+}
+
+
+# Server versions from which the operation no longer rewrites the table
+POSTGRESQL_ADD_COLUMN_DEFAULT_VERSION = (11,)
+MYSQL_INSTANT_ADD_COLUMN_VERSION = (8, 0, 12)
+MYSQL_INSTANT_DROP_COLUMN_VERSION = (8, 0, 29)
+
+
+def get_previous_statements(**kwargs):
+    """Return the statements of the migration before the tested one."""
+    return kwargs.get("sql_statements", ())[: kwargs.get("index", 0)]
+
+
+def is_at_least(server_version, version):
+    """An unknown server version is taken as an old one."""
+    return server_version is not None and tuple(server_version) >= version
+
+
+def is_before(server_version, version):
+    """An unknown server version is taken as a recent one."""
+    return server_version is not None and tuple(server_version) < version
+
+
+def parse_postgresql_type(db_type):
+    """Return the base type and the parameters of a PostgreSQL column type."""
+    type_match = re.match(r"\s*([a-z ]+?)\s*(?:\(([\d, ]+)\))?\s*$", db_type.lower())
+    if not type_match:
+        return db_type.strip().lower(), None
+    base_type = POSTGRESQL_TYPE_ALIASES.get(type_match.group(1), type_match.group(1))
+    parameters = type_match.group(2)
+    if parameters is not None:
+        parameters = tuple(int(parameter) for parameter in parameters.split(","))
+    return base_type, parameters
+
+
+def is_metadata_only_type_change(old_type, new_type):
+    """
+    Whether PostgreSQL changes the type of the column without rewriting
+    the table: to text from a varchar, or to a wider varchar, varbit or
+    numeric (with the same scale).
+    """
+    old_base, old_parameters = parse_postgresql_type(old_type)
+    new_base, new_parameters = parse_postgresql_type(new_type)
+    if old_base == "varchar" and new_base == "text":
+        return True
+    if old_base != new_base:
+        return False
+    if old_base == "text" or new_parameters == old_parameters:
+        return True
+    if old_base not in POSTGRESQL_WIDENED_TYPES:
+        return False
+    if new_parameters is None:
+        return True
+    if old_parameters is None:
+        return False
+    if old_base == "numeric":
+        old_scale = old_parameters[1] if len(old_parameters) > 1 else 0
+        new_scale = new_parameters[1] if len(new_parameters) > 1 else 0
+        return new_parameters[0] >= old_parameters[0] and new_scale == old_scale
+    return new_parameters[0] >= old_parameters[0]
+
+
+def rewrites_table(sql, **kwargs):
+    """
+    Whether the statement rewrites a whole existing table. The rewrites
+    depending on the server version are only reported when it is known.
+    A type change is only known not to rewrite the table given the
+    previous type of the column, from the column_types of the migration:
+    {(table, column): type}.
+    """
+    if not kwargs.get("blocking_checks"):
+        return False
+    vendor = kwargs.get("vendor")
+    server_version = kwargs.get("server_version")
+    if not re.match(r"\s*ALTER TABLE", sql, re.IGNORECASE):
+        return False
+    table = get_table_name(sql)
+    if table in kwargs.get("created_tables", ()):
+        return False
+
+    if vendor == "postgresql":
+        type_change = re.search(
+            r'ALTER COLUMN [`"]?([^`"\s]+)[`"]? (?:SET DATA )?TYPE '
+            r"(.+?)(?:\s+USING\b.*|\s+COLLATE\b.*)?\s*[,;]?$",
+            sql,
+            re.IGNORECASE,
+        )
+        if type_change:
+            old_type = (kwargs.get("column_types") or {}).get(
+                (table, type_change.group(1))
+            )
+            return old_type is None or not is_metadata_only_type_change(
+                old_type, type_change.group(2)
+            )
+        if re.search(r"ADD COLUMN .* (?:serial|bigserial|smallserial)\b", sql):
+            return True
+        if re.search(r"ADD COLUMN .* DEFAULT", sql, re.IGNORECASE):
+            return is_before(server_version, POSTGRESQL_ADD_COLUMN_DEFAULT_VERSION)
+        return False
+
+    if vendor == "mysql":
+        if re.search(r"ALGORITHM\s*=\s*(?:INSTANT|INPLACE)", sql, re.IGNORECASE):
+            return False
+        if re.search(r"\bMODIFY\b|\bCHANGE\b", sql):
+            return True
+        if re.search(r"\bADD COLUMN\b", sql):
+            return is_before(server_version, MYSQL_INSTANT_ADD_COLUMN_VERSION)
+        if re.search(r"\bDROP COLUMN\b", sql):
+            return is_before(server_version, MYSQL_INSTANT_DROP_COLUMN_VERSION)
+        return False
+
+    return False
+
+
+def repeats_table_rewrite(sql, **kwargs):
+    """
+    Each ALTER TABLE rewriting a table rewrites it again: the statements
+    rewriting the same table are better merged into one, which rewrites
+    it once (e.g. the columns added by several AddField on MySQL).
+    """
+    if not rewrites_table(sql, **kwargs):
+        return False
+    table = get_table_name(sql)
+    previous_statements = get_previous_statements(**kwargs)
+    return any(
+        get_table_name(statement) == table
+        and rewrites_table(statement, **dict(kwargs, index=index))
+        for index, statement in enumerate(previous_statements)
+    )
+
+
+def get_full_statement(sql, **kwargs):
+    """
+    Return the statement starting at the tested line, with its next lines
+    until the one ending it (e.g. the multi-line statements of a RunSQL).
+    """
+    lines = [sql]
+    next_index = kwargs.get("index", 0) + 1
+    for line in kwargs.get("sql_statements", ())[next_index:]:
+        if lines[-1].rstrip().endswith(";"):
+            break
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def updates_all_rows(sql, **kwargs):
+    """
+    An UPDATE or DELETE without WHERE or LIMIT goes through the whole table
+    in one transaction, locking all its rows and lagging the replicas.
+    """
+    if not re.match(r"\s*(?:UPDATE|DELETE FROM)\s", sql, re.IGNORECASE):
+        return False
+    if get_table_name(sql) in kwargs.get("created_tables", ()):
+        return False
+    # Only the clauses of the statement itself bound it, not of its subqueries
+    statement = re.sub(r"'(?:[^']|'')*'", "''", get_full_statement(sql, **kwargs))
+    nested = re.compile(r"\([^()]*\)")
+    while nested.search(statement):
+        statement = nested.sub("", statement)
+    return not re.search(r"\b(?:WHERE|LIMIT)\b", statement, re.IGNORECASE)
+
+
+def builds_blocking_index(sql, **kwargs):
+    """
+    Building an index blocks the writes to the table for the whole build,
+    unless it is built concurrently (PostgreSQL). InnoDB builds the indexes
+    online by default (MySQL), except when a copy or a lock is requested,
+    and for the full-text and spatial indexes.
+    The indexes of the tables created by the migration are fine.
+    """
+    if not kwargs.get("blocking_checks"):
+        return False
+    vendor = kwargs.get("vendor")
+    create_index = re.match(
+        r"\s*CREATE (?:UNIQUE |FULLTEXT |SPATIAL )?INDEX (CONCURRENTLY )?",
+        sql,
+        re.IGNORECASE,
+    )
+    add_constraint = re.match(
+        r"\s*ALTER TABLE .* ADD (?:CONSTRAINT \S+ )?"
+        r"(?:UNIQUE|PRIMARY KEY|INDEX|KEY|FULLTEXT|SPATIAL)",
+        sql,
+        re.IGNORECASE,
+    )
+    add_unique_column = re.match(
+        r"\s*ALTER TABLE .* ADD COLUMN .*\bUNIQUE\b", sql, re.IGNORECASE
+    )
+    if not (create_index or add_constraint or add_unique_column):
+        return False
+    if get_table_name(sql) in kwargs.get("created_tables", ()):
+        return False
+
+    if vendor == "postgresql":
+        if create_index:
+            return not create_index.group(1)
+        # The constraint may use an index built concurrently beforehand
+        return not re.search(r"USING INDEX", sql, re.IGNORECASE)
+    if vendor == "mysql":
+        return bool(
+            re.search(r"ALGORITHM\s*=\s*COPY", sql, re.IGNORECASE)
+            or re.search(r"LOCK\s*=\s*(?:SHARED|EXCLUSIVE)", sql, re.IGNORECASE)
+            or re.search(r"\b(?:FULLTEXT|SPATIAL)\b", sql, re.IGNORECASE)
+        )
+    return False
+
+
+def runs_concurrently_in_transaction(sql, **kwargs):
+    """PostgreSQL can't run concurrent operations in an atomic migration."""
+    return (
+        kwargs.get("vendor") == "postgresql"
+        and kwargs.get("atomic", True)
+        and re.search(r"\bCONCURRENTLY\b", sql, re.IGNORECASE)
+    )
+
+
+def is_added_null_column(column, sql, **kwargs):
+    """
+    Whether an earlier statement of the migration added the column, null
+    in all the rows: without default nor NOT NULL constraint.
+    """
+    table = get_table_name(sql)
+    for statement in get_previous_statements(**kwargs):
+        added_column = re.search(
+            r"ADD COLUMN {0}\s(.*)".format(re.escape(column.strip())),
+            statement,
+            re.IGNORECASE,
+        )
+        if added_column and get_table_name(statement) == table:
+            return not re.search(
+                r"\b(?:DEFAULT|NOT NULL)\b", added_column.group(1), re.IGNORECASE
+            )
+    return False
+
+
+def validates_constraint(sql, **kwargs):
+    """
+    Adding a foreign key, a check or a NOT NULL constraint to an existing
+    PostgreSQL table scans it while holding a lock blocking its accesses.
+    Added NOT VALID, the constraint is validated by a later VALIDATE
+    CONSTRAINT, without blocking them, as long as it runs in another
+    transaction: in another migration, or in a non-atomic one.
+    The foreign keys of the null columns added by the migration are fine:
+    Django adds them without NOT VALID, and no row has to be checked.
+    """
+    if not kwargs.get("blocking_checks") or kwargs.get("vendor") != "postgresql":
+        return False
+    if not re.match(r"\s*ALTER TABLE", sql, re.IGNORECASE):
+        return False
+    if get_table_name(sql) in kwargs.get("created_tables", ()):
+        return False
+
+    foreign_key = re.search(
+        r"ADD CONSTRAINT \S+ FOREIGN KEY \(([^)]+)\)", sql, re.IGNORECASE
+    )
+    if foreign_key and is_added_null_column(foreign_key.group(1), sql, **kwargs):
+        return False
+    if re.search(r"ADD CONSTRAINT \S+ (?:FOREIGN KEY|CHECK)", sql, re.IGNORECASE):
+        return not re.search(r"\bNOT VALID\b", sql, re.IGNORECASE)
+    if re.search(r"ALTER COLUMN \S+ SET NOT NULL", sql, re.IGNORECASE):
+        # Since PostgreSQL 12, a check validated beforehand that the column
+        # is not null spares the scan
+        return not (
+            is_at_least(kwargs.get("server_version"), (12,))
+            and any(
+                re.search(r"VALIDATE CONSTRAINT", statement, re.IGNORECASE)
+                and get_table_name(statement) == get_table_name(sql)
+                for statement in get_previous_statements(**kwargs)
+            )
+        )
+    validate = re.search(r"VALIDATE CONSTRAINT ([^\s;]+)", sql, re.IGNORECASE)
+    if validate and kwargs.get("atomic", True):
+        # Validated in the transaction adding it, under the same lock
+        return any(
+            re.search(
+                r"ADD CONSTRAINT {0} .*NOT VALID".format(re.escape(validate.group(1))),
+                statement,
+                re.IGNORECASE,
+            )
+            for statement in get_previous_statements(**kwargs)
+        )
+    return False
+
+
+def takes_exclusive_lock(sql, vendor):
+    """
+    Whether the statement takes a lock blocking all the accesses to an
+    existing table: ACCESS EXCLUSIVE on PostgreSQL, an exclusive metadata
+    lock on MySQL.
+    """
+    if re.match(r"\s*CREATE TABLE", sql, re.IGNORECASE):
+        return False
+    if vendor == "postgresql":
+        return any(
+            mode == "ACCESS EXCLUSIVE" for _, mode in get_statement_locks(sql, vendor)
+        )
+    if vendor == "mysql":
+        # Even the online DDL takes it, briefly
+        return bool(
+            re.match(
+                r"\s*(?:ALTER TABLE|RENAME TABLE|DROP TABLE|TRUNCATE|CREATE "
+                r"(?:UNIQUE )?INDEX|DROP INDEX)",
+                sql,
+                re.IGNORECASE,
+            )
+        )
+    return False
+
+
+LOCK_TIMEOUT_SETTINGS = {
+    "postgresql": r"SET (?:SESSION |LOCAL )?lock_timeout",
+    "mysql": r"SET (?:SESSION |@@SESSION\.)?lock_wait_timeout",
+}
+
+
+def lacks_lock_timeout(sql, **kwargs):
+    """
+    When required, a lock timeout must be set before the first statement
+    taking an exclusive lock on an existing table: it would otherwise wait
+    for the running transactions, all the queries on the table queuing
+    behind it.
+    """
+    vendor = kwargs.get("vendor")
+    if not kwargs.get("require_lock_timeout") or vendor not in LOCK_TIMEOUT_SETTINGS:
+        return False
+    if not takes_exclusive_lock(sql, vendor):
+        return False
+    if get_table_name(sql) in kwargs.get("created_tables", ()):
+        return False
+
+    for statement in get_previous_statements(**kwargs):
+        if re.search(LOCK_TIMEOUT_SETTINGS[vendor], statement, re.IGNORECASE):
+            return False
+        if takes_exclusive_lock(statement, vendor) and get_table_name(
+            statement
+        ) not in kwargs.get("created_tables", ()):
+            # Only reported for the first statement
+            return False
+    return True
+
+
 migration_tests = (
     {
         "code": "NOT_NULL",
@@ -70,6 +420,58 @@ migration_tests = (
             "You may ignore this migration.)"
         ),
     },
+    {
+        "code": "TABLE_REWRITE",
+        "fn": rewrites_table,
+        "err_msg": "REWRITING the whole table, which is locked meanwhile",
+    },
+    {
+        "code": "MERGEABLE_ALTER",
+        "fn": repeats_table_rewrite,
+        "err_msg": (
+            "REWRITING again a table rewritten by a previous statement "
+            "(Merge the ALTER TABLE statements into one)"
+        ),
+    },
+    {
+        "code": "BLOCKING_INDEX",
+        "fn": builds_blocking_index,
+        "err_msg": (
+            "BUILDING an index that blocks the writes to the table "
+            "(Build it concurrently in a non-atomic migration on PostgreSQL, "
+            "with ALGORITHM=INPLACE, LOCK=NONE on MySQL)"
+        ),
+    },
+    {
+        "code": "CONCURRENTLY_IN_ATOMIC",
+        "fn": runs_concurrently_in_transaction,
+        "err_msg": "CONCURRENT operation in an atomic migration, which fails",
+    },
+    {
+        "code": "VALIDATING_CONSTRAINT",
+        "fn": validates_constraint,
+        "err_msg": (
+            "VALIDATING a constraint on the whole table, which is locked "
+            "meanwhile (Add it NOT VALID, then VALIDATE CONSTRAINT "
+            "in another migration)"
+        ),
+    },
+    {
+        "code": "UNBOUNDED_UPDATE",
+        "fn": updates_all_rows,
+        "err_msg": (
+            "UPDATING or DELETING all the rows of a table in one statement "
+            "(Add a WHERE or LIMIT clause, and run it in batches)"
+        ),
+    },
+    {
+        "code": "LOCK_TIMEOUT",
+        "fn": lacks_lock_timeout,
+        "err_msg": (
+            "LOCKING a table without setting a lock timeout first "
+            "(lock_timeout on PostgreSQL, lock_wait_timeout on MySQL)"
+        ),
+    },
     {"code": "", "fn": has_default, "err_msg": ""},
     {
         "code": IGNORED_MIGRATION,
@@ -79,28 +481,66 @@ migration_tests = (
 )
 
 
-def analyse_sql_statements(sql_statements):
+def analyse_sql_statements(
+    sql_statements,
+    vendor=None,
+    server_version=None,
+    atomic=True,
+    require_lock_timeout=False,
+    blocking_checks=False,
+    column_types=None,
+):
+    """
+    Run the migration tests on each SQL statement of a migration.
+    The vendor and version of the database server let the tests tell
+    apart the operations that depend on them, the unknown version of a
+    server being taken as an old one, except for the rewrites depending
+    on it, which are not reported. The tests also know whether the
+    migration is atomic, its previous statements and the tables they created,
+    and the types of its altered columns before the migration, if given.
+    The optional tests are enabled by their keyword argument.
+    The table locks taken by the migration are returned with the errors.
+    """
     errors = []
     ignored = False
-    for statement in sql_statements:
+    created_tables = set()
+    sql_statements = list(sql_statements)
+    for index, statement in enumerate(sql_statements):
         for test in migration_tests:
-            if test["fn"](statement, errors=errors):
+            if test["fn"](
+                statement,
+                errors=errors,
+                vendor=vendor,
+                server_version=server_version,
+                atomic=atomic,
+                created_tables=created_tables,
+                sql_statements=sql_statements,
+                index=index,
+                require_lock_timeout=require_lock_timeout,
+                blocking_checks=blocking_checks,
+                column_types=column_types,
+            ):
                 if test["code"] == IGNORED_MIGRATION:
                     logger.debug("Testing {0} -- IGNORING MIGRATION".format(statement))
                     ignored = True
                 else:
                     logger.debug("Testing {0} -- ERROR".format(statement))
-                    table_search = re.search(
-                        "TABLE `([^`]*)`", statement, re.IGNORECASE
+                    col_search = re.search(
+                        'COLUMN [`"]([^`"]*)[`"]', statement, re.IGNORECASE
+                    )
+                    err = LintError(
+                        test["code"],
+                        test["err_msg"],
+                        get_table_name(statement),
+                        col_search.group(1) if col_search else None,
                     )
-                    col_search = re.search("COLUMN `([^`]*)`", statement, re.IGNORECASE)
-                    err = {
-                        "err_msg": test["err_msg"],
-                        "code": test["code"],
-                        "table": table_search.group(1) if table_search else None,
-                        "column": col_search.group(1) if col_search else None,
-                    }
                     errors.append(err)
             else:
                 logger.debug("Testing {0} -- PASSED".format(statement))
-    return {"errors": errors, "ignored": ignored}
+        if re.match(r"\s*CREATE TABLE", statement, re.IGNORECASE):
+            created_tables.add(get_table_name(statement))
+    return {
+        "errors": errors,
+        "ignored": ignored,
+        "locks": get_migration_locks(sql_statements, vendor, atomic),
+    }
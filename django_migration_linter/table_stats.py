@@ -0,0 +1,169 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import json
+from collections import namedtuple
+
+from .results import OK, LintResult
+
+# Rough throughputs of a database server, turning the sizes into durations
+IO_THROUGHPUT = 100 * 1024 * 1024  # bytes read or written per second
+ROW_THROUGHPUT = 200000  # rows sorted or indexed per second
+
+# The checks whose impact depends on the size of the table:
+# (passes over the data of the table, whether each row is indexed or sorted)
+OPERATION_COSTS = {
+    "TABLE_REWRITE": (2, True),
+    "BLOCKING_INDEX": (1, True),
+    "VALIDATING_CONSTRAINT": (1, False),
+}
+
+# The checks only failing above the threshold of the estimated duration
+SIZE_DEPENDENT_CHECKS = frozenset(OPERATION_COSTS) | frozenset(["MERGEABLE_ALTER"])
+
+
+class TableStats(namedtuple("TableStats", ("rows", "size"))):
+    """The number of rows and the size on disk (in bytes) of a table."""
+
+    __slots__ = ()
+
+
+class TableCost(namedtuple("TableCost", ("table", "seconds", "io_bytes"))):
+    """The estimated cost of the operations of a migration on a table."""
+
+    __slots__ = ()
+
+    def as_dict(self):
+        return dict(zip(self._fields, self))
+
+
+class ImpactEstimate(
+    namedtuple("ImpactEstimate", ("seconds", "io_bytes", "tables", "unknown_tables"))
+):
+    """
+    The estimated impact of a migration: the duration of the operations
+    holding their locks while they go through the tables, the bytes they
+    read and write, the cost per table, and the tables without statistics.
+    """
+
+    __slots__ = ()
+
+    def as_dict(self):
+        return {
+            "seconds": self.seconds,
+            "io_bytes": self.io_bytes,
+            "tables": [cost.as_dict() for cost in self.tables],
+            "unknown_tables": list(self.unknown_tables),
+        }
+
+
+def load_table_stats(path):
+    """
+    Return the TableStats of each table according to a snapshot of the
+    statistics of a database, exported ahead of time: either a JSON object
+    {table: {"rows": ..., "size": ...}}, a JSON list of such objects with
+    a "table" key, or a CSV file with the table, rows and size columns.
+    """
+    with open(path, "r") as f:
+        content = f.read()
+    if content.lstrip().startswith(("{", "[")):
+        rows = json.loads(content)
+        if isinstance(rows, dict):
+            rows = [dict(row, table=table) for table, row in rows.items()]
+    else:
+        lines = content.splitlines()
+        delimiter = "\t" if lines and "\t" in lines[0] else ","
+        rows = csv.DictReader(lines, delimiter=delimiter)
+
+    table_stats = {}
+    for row in rows:
+        row = dict((key.strip().lower(), value) for key, value in row.items())
+        try:
+            table_stats[row["table"].strip()] = TableStats(
+                _parse_count(row.get("rows")), _parse_count(row.get("size"))
+            )
+        except (KeyError, ValueError) as e:
+            raise ValueError(
+                "Invalid table statistics in {0}: {1!r} ({2})".format(path, row, e)
+            )
+    return table_stats
+
+
+def _parse_count(value):
+    # The estimates of the PostgreSQL planner are floats, -1 when unknown
+    if value is None or value == "":
+        return 0
+    return max(int(float(value)), 0)
+
+
+def estimate_operation(code, stats):
+    """Return the (seconds, io_bytes) of an operation on a table."""
+    passes, per_row = OPERATION_COSTS[code]
+    io_bytes = passes * stats.size
+    seconds = float(io_bytes) / IO_THROUGHPUT
+    if per_row:
+        seconds += float(stats.rows) / ROW_THROUGHPUT
+    return seconds, io_bytes
+
+
+def estimate_impact(lint_result, table_stats):
+    """
+    Estimate the impact of a migration from the operations detected in its
+    SQL and the statistics of the tables: no database access is needed.
+    """
+    costs = {}
+    unknown_tables = set()
+    for err in lint_result.errors:
+        if err.code not in OPERATION_COSTS:
+            continue
+        stats = table_stats.get(err.table)
+        if stats is None:
+            unknown_tables.add(err.table or "?")
+            continue
+        seconds, io_bytes = estimate_operation(err.code, stats)
+        total_seconds, total_io_bytes = costs.get(err.table, (0.0, 0))
+        costs[err.table] = (total_seconds + seconds, total_io_bytes + io_bytes)
+
+    tables = tuple(
+        TableCost(table, seconds, io_bytes)
+        for table, (seconds, io_bytes) in sorted(costs.items())
+    )
+    return ImpactEstimate(
+        sum(cost.seconds for cost in tables),
+        sum(cost.io_bytes for cost in tables),
+        tables,
+        tuple(sorted(unknown_tables)),
+    )
+
+
+def apply_threshold(lint_result, estimate, max_seconds):
+    """
+    Only keep the size-dependent errors of a migration whose estimated
+    duration is above the threshold. Those on the tables without statistics
+    are always kept, their impact being unknown.
+    """
+    if max_seconds is None or estimate.seconds > max_seconds:
+        return lint_result
+    known_tables = set(cost.table for cost in estimate.tables)
+    errors = [
+        err
+        for err in lint_result.errors
+        if err.code not in SIZE_DEPENDENT_CHECKS or err.table not in known_tables
+    ]
+    if len(errors) == len(lint_result.errors):
+        return lint_result
+    if errors:
+        return LintResult(lint_result.result, errors, lint_result.locks)
+    return LintResult(OK, locks=lint_result.locks)
@@ -0,0 +1,45 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from django.test.runner import DiscoverRunner
+
+from .capture import MigrationSqlCapture
+
+
+class MigrationLinterDiscoverRunner(DiscoverRunner):
+    """
+    Test runner that lints the migrations applied while creating
+    the test databases and stores the results in the linter's cache.
+    """
+
+    def __init__(self, migration_linter_cache_path=None, **kwargs):
+        self.migration_linter_cache_path = migration_linter_cache_path
+        super(MigrationLinterDiscoverRunner, self).__init__(**kwargs)
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super(MigrationLinterDiscoverRunner, cls).add_arguments(parser)
+        parser.add_argument(
+            "--migration-linter-cache-path",
+            type=str,
+            help="directory of the cache of the migration linter",
+        )
+
+    def setup_databases(self, **kwargs):
+        with MigrationSqlCapture() as capture:
+            old_config = super(MigrationLinterDiscoverRunner, self).setup_databases(
+                **kwargs
+            )
+        capture.store_lint_results(cache_path=self.migration_linter_cache_path)
+        return old_config
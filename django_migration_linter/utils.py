@@ -14,9 +14,13 @@
 
 from __future__ import print_function
 
+import logging
 import os
+import re
 from importlib import import_module
 
+logger = logging.getLogger(__name__)
+
 
 def split_path(path):
     decomposed_path = []
@@ -46,10 +50,27 @@ def split_migration_path(migration_path):
             return decomposed_path[i - 1], os.path.splitext(decomposed_path[i + 1])[0]
 
 
+def is_migration_file(filename):
+    from django.db.migrations.loader import MIGRATIONS_MODULE_NAME
+
+    return (
+        re.search(r"/{0}/.*\.py".format(MIGRATIONS_MODULE_NAME), filename)
+        and "__init__" not in filename
+    )
+
+
 def clean_bytes_to_str(byte_input):
     return byte_input.decode("utf-8").strip()
 
 
+def get_default_django_path():
+    """
+    Return the folder of the Django settings module,
+    which identifies the project in the cache file names.
+    """
+    return os.path.dirname(import_module(os.getenv("DJANGO_SETTINGS_MODULE")).__file__)
+
+
 def get_migration_abspath(app_label, migration_name):
     from django.db.migrations.loader import MigrationLoader
 
@@ -61,3 +82,40 @@ def get_migration_abspath(app_label, migration_name):
     if migration_file.endswith(".pyc"):
         migration_file = migration_file[:-1]
     return migration_file
+
+
+def parse_version(value):
+    """Parse a version such as 11.5 or 8.0.12 into a tuple of integers."""
+    return tuple(int(part) for part in value.split("."))
+
+
+def get_server_version(connection):
+    """
+    Return the version of the database server as a tuple of integers,
+    or None when it can't be read, e.g. when the server isn't reachable.
+    """
+    try:
+        if connection.vendor == "postgresql":
+            version = connection.pg_version
+            if version >= 100000:
+                return version // 10000, version % 10000
+            return version // 10000, version // 100 % 100, version % 100
+        if connection.vendor == "mysql":
+            return tuple(connection.mysql_version)
+        if connection.vendor == "sqlite":
+            from sqlite3 import sqlite_version_info
+
+            return sqlite_version_info
+    except Exception as e:
+        logger.debug("Could not read the version of the database server: {0}".format(e))
+    return None
+
+
+def has_lock_timeout_option(connection):
+    """Whether the options of the connection set a lock timeout."""
+    options = connection.settings_dict.get("OPTIONS", {})
+    if connection.vendor == "postgresql":
+        return "lock_timeout" in options.get("options", "")
+    if connection.vendor == "mysql":
+        return "lock_wait_timeout" in options.get("init_command", "")
+    return False
@@ -42,8 +42,11 @@ setup(
     author="3YOURMIND GmbH",
     author_email="david.wobrock@gmail.com",
     license="Apache License 2.0",
-    packages=find_packages(exclude=["tests/"]),
+    packages=find_packages(exclude=["tests/", "benchmarks", "benchmarks.*"]),
     install_requires=["django>=1.11", "appdirs==1.4.3"],
+    entry_points={
+        "console_scripts": ["django-migration-linter=django_migration_linter.cli:main"]
+    },
     extras_require={
         "test": [
             "tox==3.9.0",
@@ -0,0 +1,112 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from django.conf import settings
+
+from django_migration_linter import MigrationLinter
+from django_migration_linter.baseline import BASELINE_HEADER, Baseline
+
+if sys.version_info >= (3, 3):
+    import unittest.mock as mock
+else:
+    import mock
+
+
+class BaselineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_project_path = os.path.dirname(settings.BASE_DIR)
+        self.baseline_dir = tempfile.mkdtemp()
+        self.baseline_path = os.path.join(self.baseline_dir, "baseline.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.baseline_dir)
+
+    def _lint(self, **kwargs):
+        linter = MigrationLinter(
+            self.test_project_path,
+            include_apps=["app_add_not_null_column", "app_correct"],
+            no_cache=True,
+            baseline=self.baseline_path,
+            reporters=[],
+            **kwargs
+        )
+        linter.lint_all_migrations()
+        return linter
+
+    def test_write_baseline(self):
+        linter = self._lint(update_baseline=True)
+        self.assertEqual(linter.nb_baseline, 0)
+
+        with open(self.baseline_path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], BASELINE_HEADER)
+        self.assertEqual(lines[1:], sorted(lines[1:]))
+        self.assertEqual(len(lines) - 1, linter.nb_total - linter.nb_ignored)
+
+        baseline = Baseline(self.baseline_path)
+        baseline.load()
+        fingerprint, result = baseline[
+            ("app_add_not_null_column", "0002_add_new_not_null_field")
+        ]
+        self.assertEqual(
+            fingerprint,
+            linter.get_migration_fingerprint(
+                "app_add_not_null_column", "0002_add_new_not_null_field"
+            ),
+        )
+        self.assertEqual(result, "ERR")
+
+    def test_skip_baseline_migrations(self):
+        first_linter = self._lint(update_baseline=True)
+
+        with mock.patch.object(MigrationLinter, "get_sql") as get_sql:
+            linter = self._lint()
+        get_sql.assert_not_called()
+        self.assertEqual(linter.nb_valid + linter.nb_erroneous, 0)
+        self.assertEqual(
+            linter.nb_baseline, first_linter.nb_valid + first_linter.nb_erroneous
+        )
+        self.assertFalse(linter.has_errors)
+
+    def test_report_deviations(self):
+        self._lint(update_baseline=True)
+        baseline = Baseline(self.baseline_path)
+        baseline.load()
+        key = ("app_add_not_null_column", "0002_add_new_not_null_field")
+        baseline[key] = ("0" * 32, baseline[key][1])
+        baseline.save()
+
+        linter = self._lint()
+        self.assertEqual(linter.nb_erroneous, 1)
+        self.assertEqual(linter.nb_valid, 0)
+        self.assertEqual(
+            [(app_label, name) for app_label, name, _ in linter.erroneous_migrations],
+            [key],
+        )
+
+    def test_update_keeps_other_entries(self):
+        baseline = Baseline(self.baseline_path)
+        baseline[("removed_app", "0001_initial")] = ("1" * 32, "OK")
+        baseline.save()
+
+        self._lint(update_baseline=True)
+        baseline = Baseline(self.baseline_path)
+        baseline.load()
+        self.assertIn(("removed_app", "0001_initial"), baseline)
+        self.assertIn(("app_correct", "0001_initial"), baseline)
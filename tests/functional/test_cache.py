@@ -23,6 +23,7 @@ from django_migration_linter import (
     analyse_sql_statements,
     get_migration_abspath,
 )
+from django_migration_linter.results import LintError, LintResult
 
 if sys.version_info >= (3, 3):
     import unittest.mock as mock
@@ -56,18 +57,19 @@ class CacheTestCase(unittest.TestCase):
         cache = linter.new_cache
         cache.load()
 
-        self.assertEqual("OK", cache["4a3770a405738d457e2d23e17fb1f3aa"]["result"])
-        self.assertEqual("ERR", cache["19fd3ea688fc05e2cc2a6e67c0b7aa17"]["result"])
+        self.assertEqual(
+            "OK",
+            LintResult.from_cache(cache["4a3770a405738d457e2d23e17fb1f3aa"]).result,
+        )
+        self.assertEqual(
+            "ERR",
+            LintResult.from_cache(cache["0538570bae5ed1d328115321b108259e"]).result,
+        )
         self.assertListEqual(
-            cache["19fd3ea688fc05e2cc2a6e67c0b7aa17"]["errors"],
-            [
-                {
-                    "err_msg": "RENAMING tables",
-                    "code": "RENAME_TABLE",
-                    "table": None,
-                    "column": None,
-                }
-            ],
+            list(
+                LintResult.from_cache(cache["0538570bae5ed1d328115321b108259e"]).errors
+            ),
+            [LintError("RENAME_TABLE", "RENAMING tables", "app_add_not_null_column_a")],
         )
 
         # Start the Linter again -> should use cache now.
@@ -108,18 +110,19 @@ class CacheTestCase(unittest.TestCase):
         cache = linter.new_cache
         cache.load()
 
-        self.assertEqual("OK", cache["4a3770a405738d457e2d23e17fb1f3aa"]["result"])
-        self.assertEqual("ERR", cache["19fd3ea688fc05e2cc2a6e67c0b7aa17"]["result"])
+        self.assertEqual(
+            "OK",
+            LintResult.from_cache(cache["4a3770a405738d457e2d23e17fb1f3aa"]).result,
+        )
+        self.assertEqual(
+            "ERR",
+            LintResult.from_cache(cache["0538570bae5ed1d328115321b108259e"]).result,
+        )
         self.assertListEqual(
-            cache["19fd3ea688fc05e2cc2a6e67c0b7aa17"]["errors"],
-            [
-                {
-                    "err_msg": "RENAMING tables",
-                    "code": "RENAME_TABLE",
-                    "table": None,
-                    "column": None,
-                }
-            ],
+            list(
+                LintResult.from_cache(cache["0538570bae5ed1d328115321b108259e"]).errors
+            ),
+            [LintError("RENAME_TABLE", "RENAMING tables", "app_add_not_null_column_a")],
         )
 
         # Start the Linter again but with different database, should not be the same cache
@@ -135,22 +138,77 @@ class CacheTestCase(unittest.TestCase):
         cache = linter.new_cache
         cache.load()
 
-        self.assertEqual("OK", cache["4a3770a405738d457e2d23e17fb1f3aa"]["result"])
-        self.assertEqual("ERR", cache["19fd3ea688fc05e2cc2a6e67c0b7aa17"]["result"])
+        self.assertEqual(
+            "OK",
+            LintResult.from_cache(cache["4a3770a405738d457e2d23e17fb1f3aa"]).result,
+        )
+        self.assertEqual(
+            "ERR",
+            LintResult.from_cache(cache["0538570bae5ed1d328115321b108259e"]).result,
+        )
         self.assertListEqual(
-            cache["19fd3ea688fc05e2cc2a6e67c0b7aa17"]["errors"],
+            list(
+                LintResult.from_cache(cache["0538570bae5ed1d328115321b108259e"]).errors
+            ),
             [
-                {
-                    "err_msg": "NOT NULL constraint on columns",
-                    "code": "NOT_NULL",
-                    "table": "app_add_not_null_column_a",
-                    "column": "new_not_null_field",
-                }
+                LintError(
+                    "NOT_NULL",
+                    "NOT NULL constraint on columns",
+                    "app_add_not_null_column_a",
+                    "new_not_null_field",
+                )
             ],
         )
 
         self.assertTrue(linter.has_errors)
 
+    @mock.patch(
+        "django_migration_linter.MigrationLinter._gather_all_migrations",
+        return_value=[
+            Migration("0001_create_table", "app_add_not_null_column"),
+            Migration("0002_add_new_not_null_field", "app_add_not_null_column"),
+        ],
+    )
+    def test_cache_optional_checks(self, *args):
+        linter = MigrationLinter(self.test_project_path)
+        linter.old_cache.clear()
+        linter.old_cache.save()
+        linter.lint_all_migrations()
+
+        # The results of the optional checks are not read from the warm cache
+        for options in ({"require_lock_timeout": True}, {"blocking_checks": True}):
+            linter = MigrationLinter(self.test_project_path, **options)
+            self.assertNotEqual(
+                MigrationLinter(self.test_project_path).new_cache.filename,
+                linter.new_cache.filename,
+            )
+            linter.old_cache.clear()
+            linter.old_cache.save()
+            with mock.patch(
+                "django_migration_linter.migration_linter.analyse_sql_statements",
+                wraps=analyse_sql_statements,
+            ) as analyse_sql_statements_mock:
+                linter.lint_all_migrations()
+                self.assertEqual(2, analyse_sql_statements_mock.call_count)
+
+            # But from their own cache, on the next run
+            linter = MigrationLinter(self.test_project_path, **options)
+            with mock.patch(
+                "django_migration_linter.migration_linter.analyse_sql_statements",
+                wraps=analyse_sql_statements,
+            ) as analyse_sql_statements_mock:
+                linter.lint_all_migrations()
+                analyse_sql_statements_mock.assert_not_called()
+
+        # The cache without the optional checks is still warm
+        linter = MigrationLinter(self.test_project_path)
+        with mock.patch(
+            "django_migration_linter.migration_linter.analyse_sql_statements",
+            wraps=analyse_sql_statements,
+        ) as analyse_sql_statements_mock:
+            linter.lint_all_migrations()
+            analyse_sql_statements_mock.assert_not_called()
+
     @mock.patch(
         "django_migration_linter.MigrationLinter._gather_all_migrations",
         return_value=[
@@ -173,7 +231,10 @@ class CacheTestCase(unittest.TestCase):
         cache = linter.new_cache
         cache.load()
 
-        self.assertEqual("IGNORE", cache["0fab48322ba76570da1a3c193abb77b5"]["result"])
+        self.assertEqual(
+            "IGNORE",
+            LintResult.from_cache(cache["a2042e524b0bfa780a60972636fc19f7"]).result,
+        )
 
         # Start the Linter again -> should use cache now.
         linter = MigrationLinter(self.test_project_path)
@@ -206,7 +267,10 @@ class CacheTestCase(unittest.TestCase):
         cache = linter.new_cache
         cache.load()
 
-        self.assertEqual("ERR", cache["19fd3ea688fc05e2cc2a6e67c0b7aa17"]["result"])
+        self.assertEqual(
+            "ERR",
+            LintResult.from_cache(cache["0538570bae5ed1d328115321b108259e"]).result,
+        )
 
         # Get the content of the migration file and mock the open call to append
         # some content to change the hash
@@ -232,9 +296,51 @@ class CacheTestCase(unittest.TestCase):
         cache = linter.new_cache
         cache.load()
 
-        self.assertNotIn("19fd3ea688fc05e2cc2a6e67c0b7aa17", cache)
+        self.assertNotIn("0538570bae5ed1d328115321b108259e", cache)
         self.assertEqual(1, len(cache))
-        self.assertEqual("ERR", cache["a25768641a0ad526fad199f97c303784"]["result"])
+        self.assertEqual(
+            "ERR",
+            LintResult.from_cache(cache["2289d8656eeff027f759548aa3daf498"]).result,
+        )
+
+    @mock.patch(
+        "django_migration_linter.MigrationLinter._gather_all_migrations",
+        return_value=[
+            Migration("0001_create_table", "app_add_not_null_column"),
+            Migration("0002_add_new_not_null_field", "app_add_not_null_column"),
+        ],
+    )
+    def test_cache_ancestor_modified(self, *args):
+        linter = MigrationLinter(self.test_project_path)
+        linter.old_cache.clear()
+        linter.old_cache.save()
+        linter.lint_all_migrations()
+
+        # Only the file of the first migration changes
+        get_migration_hash = MigrationLinter.get_migration_hash
+
+        def modified_migration_hash(app_label, migration_name):
+            if migration_name == "0001_create_table":
+                return "0" * 32
+            return get_migration_hash(app_label, migration_name)
+
+        linter = MigrationLinter(self.test_project_path)
+        with mock.patch.object(
+            MigrationLinter, "get_migration_hash", side_effect=modified_migration_hash
+        ):
+            with mock.patch(
+                "django_migration_linter.migration_linter.analyse_sql_statements",
+                wraps=analyse_sql_statements,
+            ) as analyse_sql_statements_mock:
+                linter.lint_all_migrations()
+                # The SQL of the second migration depends on the first one
+                self.assertEqual(2, analyse_sql_statements_mock.call_count)
+
+        cache = linter.new_cache
+        cache.load()
+        self.assertEqual(2, len(cache))
+        self.assertNotIn("4a3770a405738d457e2d23e17fb1f3aa", cache)
+        self.assertNotIn("0538570bae5ed1d328115321b108259e", cache)
 
     @mock.patch(
         "django_migration_linter.MigrationLinter._gather_all_migrations",
@@ -258,18 +364,19 @@ class CacheTestCase(unittest.TestCase):
         cache = linter.new_cache
         cache.load()
 
-        self.assertEqual("OK", cache["4a3770a405738d457e2d23e17fb1f3aa"]["result"])
-        self.assertEqual("ERR", cache["19fd3ea688fc05e2cc2a6e67c0b7aa17"]["result"])
+        self.assertEqual(
+            "OK",
+            LintResult.from_cache(cache["4a3770a405738d457e2d23e17fb1f3aa"]).result,
+        )
+        self.assertEqual(
+            "ERR",
+            LintResult.from_cache(cache["0538570bae5ed1d328115321b108259e"]).result,
+        )
         self.assertListEqual(
-            cache["19fd3ea688fc05e2cc2a6e67c0b7aa17"]["errors"],
-            [
-                {
-                    "err_msg": "RENAMING tables",
-                    "code": "RENAME_TABLE",
-                    "table": None,
-                    "column": None,
-                }
-            ],
+            list(
+                LintResult.from_cache(cache["0538570bae5ed1d328115321b108259e"]).errors
+            ),
+            [LintError("RENAME_TABLE", "RENAMING tables", "app_add_not_null_column_a")],
         )
 
         # Start the Linter again -> should use cache now but ignore the erroneous
@@ -289,4 +396,7 @@ class CacheTestCase(unittest.TestCase):
         cache = linter.new_cache
         cache.load()
         self.assertEqual(1, len(cache))
-        self.assertEqual("OK", cache["4a3770a405738d457e2d23e17fb1f3aa"]["result"])
+        self.assertEqual(
+            "OK",
+            LintResult.from_cache(cache["4a3770a405738d457e2d23e17fb1f3aa"]).result,
+        )
@@ -0,0 +1,156 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import shutil
+import tempfile
+import unittest
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.db.migrations import Migration, RunPython, RunSQL
+from django.db.migrations.executor import MigrationExecutor
+
+from django_migration_linter import Cache, MigrationLinter
+from django_migration_linter.capture import MigrationSqlCapture
+from django_migration_linter.results import LintResult
+
+
+class MigrationSqlCaptureTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_project_path = os.path.dirname(settings.BASE_DIR)
+        self.cache_path = tempfile.mkdtemp()
+        self.unapply_migrations()
+
+    def tearDown(self):
+        self.unapply_migrations()
+        shutil.rmtree(self.cache_path)
+
+    @staticmethod
+    def unapply_migrations():
+        call_command(
+            "migrate", "app_add_not_null_column", "zero", database="sqlite", verbosity=0
+        )
+
+    def test_capture_migrate(self):
+        with MigrationSqlCapture() as capture:
+            call_command(
+                "migrate", "app_add_not_null_column", database="sqlite", verbosity=0
+            )
+
+        self.assertIn(
+            ("sqlite", "app_add_not_null_column", "0001_create_table"),
+            capture.sql_statements,
+        )
+        self.assertFalse(
+            any(
+                "django_migrations" in sql
+                for sql_statements in capture.sql_statements.values()
+                for sql in sql_statements
+            )
+        )
+
+        capture.store_lint_results(self.test_project_path, cache_path=self.cache_path)
+
+        cache = Cache(self.test_project_path, "sqlite", self.cache_path)
+        cache.load()
+        self.assertEqual(2, len(cache))
+        self.assertEqual(
+            "OK",
+            LintResult.from_cache(cache["4a3770a405738d457e2d23e17fb1f3aa"]).result,
+        )
+        self.assertEqual(
+            "ERR",
+            LintResult.from_cache(cache["0538570bae5ed1d328115321b108259e"]).result,
+        )
+
+    def test_capture_same_sql_as_linter(self):
+        with MigrationSqlCapture() as capture:
+            call_command(
+                "migrate", "app_add_not_null_column", database="sqlite", verbosity=0
+            )
+
+        linter = MigrationLinter(
+            self.test_project_path, database="sqlite", no_cache=True
+        )
+        loader = linter.get_migration_loader()
+        for migration_name in ("0001_create_table", "0002_add_new_not_null_field"):
+            migration = loader.get_migration("app_add_not_null_column", migration_name)
+            sql_statements = capture.sql_statements[
+                ("sqlite", "app_add_not_null_column", migration_name)
+            ]
+            self.assertFalse(any("%s" in sql for sql in sql_statements))
+            # The order of the columns of the rebuilt SQLite tables may differ
+            self.assertEqual(
+                linter.get_lint_result(
+                    linter.get_sql("app_add_not_null_column", migration_name),
+                    migration=migration,
+                ),
+                linter.get_lint_result(
+                    linter.format_sql(migration, sql_statements),
+                    migration=migration,
+                ),
+            )
+
+    def test_run_python_not_captured(self):
+        call_command(
+            "migrate",
+            "app_add_not_null_column",
+            "0001_create_table",
+            database="sqlite",
+            verbosity=0,
+        )
+
+        def update_rows(apps, schema_editor):
+            A = apps.get_model("app_add_not_null_column", "A")
+            A.objects.using(schema_editor.connection.alias).update(null_field=1)
+            schema_editor.execute('UPDATE "app_add_not_null_column_a" SET id = id;')
+
+        migration = Migration("0003_update_rows", "app_add_not_null_column")
+        migration.dependencies = [("app_add_not_null_column", "0001_create_table")]
+        migration.operations = [
+            RunPython(update_rows),
+            RunSQL(
+                'UPDATE "app_add_not_null_column_a" SET null_field = 2 WHERE id = 0;'
+            ),
+        ]
+        executor = MigrationExecutor(connections["sqlite"])
+        state = executor.loader.project_state(
+            ("app_add_not_null_column", "0001_create_table")
+        )
+        self.addCleanup(
+            executor.recorder.record_unapplied,
+            "app_add_not_null_column",
+            "0003_update_rows",
+        )
+        with MigrationSqlCapture() as capture:
+            executor.apply_migration(state, migration)
+
+        # Like the SQL generated by the linter, without the RunPython queries
+        sql_statements = capture.sql_statements[
+            ("sqlite", "app_add_not_null_column", "0003_update_rows")
+        ]
+        self.assertEqual(
+            sql_statements,
+            ['UPDATE "app_add_not_null_column_a" SET null_field = 2 WHERE id = 0;'],
+        )
+        linter = MigrationLinter(
+            self.test_project_path, database="sqlite", no_cache=True
+        )
+        self.assertEqual(
+            "OK",
+            linter.get_lint_result(
+                linter.format_sql(migration, sql_statements), migration=migration
+            ).result,
+        )
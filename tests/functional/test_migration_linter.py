@@ -35,7 +35,7 @@ class BaseBackwardCompatibilityDetection(object):
         self.assertFalse(linter.has_errors)
         self.assertNotEqual(linter.nb_valid + linter.nb_erroneous, 0)
 
-    def _launch_linter(self, app=None, commit_id=None):
+    def _launch_linter(self, app=None, commit_id=None, **kwargs):
         if app is not None:
             app = [app]
 
@@ -44,6 +44,7 @@ class BaseBackwardCompatibilityDetection(object):
             include_apps=app,
             database=next(iter(self.databases)),
             no_cache=True,
+            **kwargs
         )
         linter.lint_all_migrations(git_commit_id=commit_id)
         return linter
@@ -100,8 +101,24 @@ class MySqlBackwardCompatibilityDetectionTestCase(
 ):
     databases = ["mysql"]
 
+    def test_detect_table_rewrite_before_instant_add_column(self):
+        app = fixtures.ADD_NOT_NULL_COLUMN_FOLLOWED_BY_DEFAULT
+        linter = self._launch_linter(app, blocking_checks=True, database_version=(5, 7))
+        self.assertTrue(linter.has_errors)
+        linter = self._launch_linter(
+            app, blocking_checks=True, database_version=(8, 0, 12)
+        )
+        self.assertFalse(linter.has_errors)
+
 
 class PostgresqlBackwardCompatibilityDetectionTestCase(
     BaseBackwardCompatibilityDetection, unittest.TestCase
 ):
     databases = ["postgresql"]
+
+    def test_detect_table_rewrite_before_fast_default(self):
+        app = fixtures.ADD_NOT_NULL_COLUMN_FOLLOWED_BY_DEFAULT
+        linter = self._launch_linter(app, blocking_checks=True, database_version=(10,))
+        self.assertTrue(linter.has_errors)
+        linter = self._launch_linter(app, blocking_checks=True, database_version=(11,))
+        self.assertFalse(linter.has_errors)
@@ -0,0 +1,95 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+from django.conf import settings
+
+try:
+    import pytest_django
+except ImportError:
+    pytest_django = None
+
+TEST_MODULE = """
+import pytest
+
+
+@pytest.mark.django_db
+def test_db():
+    pass
+"""
+
+# Only the default database of the test project, the others need servers
+SETTINGS_MODULE = """
+from tests.test_project.settings import *  # noqa
+
+DATABASES = {"default": DATABASES["default"]}
+"""
+
+
+@unittest.skipIf(pytest_django is None, "requires pytest-django")
+class PytestPluginTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.test_dir, "cache")
+        for name, content in (
+            ("test_db.py", TEST_MODULE),
+            ("plugin_settings.py", SETTINGS_MODULE),
+        ):
+            with open(os.path.join(self.test_dir, name), "w") as f:
+                f.write(textwrap.dedent(content))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_plugin(self):
+        env = dict(os.environ)
+        env.pop("DJANGO_SETTINGS_MODULE", None)
+        env["PYTHONPATH"] = os.pathsep.join(
+            [self.test_dir, os.path.dirname(settings.BASE_DIR)]
+        )
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "pytest",
+                "-p",
+                "django_migration_linter.pytest_plugin",
+                "-p",
+                "no:cacheprovider",
+                "--ds",
+                "plugin_settings",
+                "--migration-linter-cache-path",
+                self.cache_path,
+                "test_db.py",
+            ],
+            cwd=self.test_dir,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        output, _ = process.communicate()
+        self.assertEqual(process.returncode, 0, output.decode("utf-8"))
+
+        # The migrations applied to the test database are cached
+        cache_files = os.listdir(self.cache_path)
+        self.assertEqual(len(cache_files), 1)
+        with open(os.path.join(self.cache_path, cache_files[0]), "rb") as f:
+            self.assertTrue(pickle.load(f))
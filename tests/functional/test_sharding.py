@@ -0,0 +1,117 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import shutil
+import tempfile
+import unittest
+
+from django.conf import settings
+
+from django_migration_linter import MigrationLinter
+from django_migration_linter.sharding import write_shard_result
+
+
+class ShardingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_project_path = os.path.dirname(settings.BASE_DIR)
+        self.cache_path = tempfile.mkdtemp()
+        self.shard_output = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_path)
+        shutil.rmtree(self.shard_output)
+
+    def test_merge_shards(self):
+        linter = MigrationLinter(self.test_project_path, cache_path=self.cache_path)
+        linter.lint_all_migrations()
+
+        for index in range(1, 4):
+            shard_linter = MigrationLinter(
+                self.test_project_path,
+                cache_path=os.path.join(self.cache_path, str(index)),
+                shard=(index, 3),
+            )
+            shard_linter.lint_all_migrations()
+            write_shard_result(shard_linter, self.shard_output)
+
+        merging_linter = MigrationLinter(
+            self.test_project_path, cache_path=os.path.join(self.cache_path, "merged")
+        )
+        merging_linter.merge_shard_results(self.shard_output)
+
+        self.assertEqual(merging_linter.nb_total, linter.nb_total)
+        self.assertEqual(merging_linter.nb_valid, linter.nb_valid)
+        self.assertEqual(merging_linter.nb_erroneous, linter.nb_erroneous)
+        self.assertEqual(merging_linter.nb_ignored, linter.nb_ignored)
+        self.assertEqual(
+            len(merging_linter.erroneous_migrations), len(linter.erroneous_migrations)
+        )
+
+        merging_linter.new_cache.load()
+        self.assertEqual(dict(merging_linter.new_cache), dict(linter.new_cache))
+
+    def test_merge_shards_optional_checks(self):
+        for index in range(1, 4):
+            shard_linter = MigrationLinter(
+                self.test_project_path,
+                cache_path=os.path.join(self.cache_path, str(index)),
+                shard=(index, 3),
+                blocking_checks=True,
+            )
+            shard_linter.lint_all_migrations()
+            write_shard_result(shard_linter, self.shard_output)
+
+        # Merged without the options, into the cache of the shards' checks
+        merging_linter = MigrationLinter(
+            self.test_project_path, cache_path=os.path.join(self.cache_path, "merged")
+        )
+        merging_linter.merge_shard_results(self.shard_output)
+
+        linter = MigrationLinter(
+            self.test_project_path,
+            cache_path=os.path.join(self.cache_path, "merged"),
+            blocking_checks=True,
+        )
+        self.assertEqual(linter.new_cache.filename, merging_linter.new_cache.filename)
+        self.assertEqual(len(linter.old_cache), merging_linter.nb_total)
+        linter = MigrationLinter(
+            self.test_project_path, cache_path=os.path.join(self.cache_path, "merged")
+        )
+        self.assertEqual(len(linter.old_cache), 0)
+
+    def test_merge_shards_different_checks(self):
+        for index in range(1, 3):
+            shard_linter = MigrationLinter(
+                self.test_project_path,
+                cache_path=self.cache_path,
+                shard=(index, 2),
+                blocking_checks=index == 1,
+            )
+            shard_linter.lint_all_migrations()
+            write_shard_result(shard_linter, self.shard_output)
+
+        merging_linter = MigrationLinter(self.test_project_path, no_cache=True)
+        with self.assertRaises(ValueError):
+            merging_linter.merge_shard_results(self.shard_output)
+
+    def test_merge_missing_shard(self):
+        shard_linter = MigrationLinter(
+            self.test_project_path, cache_path=self.cache_path, shard=(1, 2)
+        )
+        shard_linter.lint_all_migrations()
+        write_shard_result(shard_linter, self.shard_output)
+
+        merging_linter = MigrationLinter(self.test_project_path, no_cache=True)
+        with self.assertRaises(ValueError):
+            merging_linter.merge_shard_results(self.shard_output)
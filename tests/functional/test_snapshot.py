@@ -0,0 +1,111 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from django.conf import settings
+
+from django_migration_linter import MigrationLinter
+from django_migration_linter.snapshot import load_applied_migrations
+
+
+class AppliedMigrationsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_project_path = os.path.dirname(settings.BASE_DIR)
+        self.snapshot_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.snapshot_dir)
+
+    def _get_linter(self):
+        return MigrationLinter(self.test_project_path, no_cache=True, reporters=[])
+
+    def test_load_json_snapshot(self):
+        path = os.path.join(self.snapshot_dir, "django_migrations.json")
+        with open(path, "w") as f:
+            json.dump(
+                [
+                    {"id": 1, "app": "app_correct", "name": "0001_initial"},
+                    {"fields": {"app": "app_correct", "name": "0002_foo"}},
+                    ["app_drop_column", "0001_initial"],
+                ],
+                f,
+            )
+        self.assertEqual(
+            load_applied_migrations(path),
+            {
+                ("app_correct", "0001_initial"),
+                ("app_correct", "0002_foo"),
+                ("app_drop_column", "0001_initial"),
+            },
+        )
+
+    def test_load_sqlite_snapshot(self):
+        path = os.path.join(self.snapshot_dir, "db.sqlite3")
+        db = sqlite3.connect(path)
+        db.execute(
+            "CREATE TABLE django_migrations "
+            "(id integer PRIMARY KEY, app varchar, name varchar, applied datetime)"
+        )
+        db.execute(
+            "INSERT INTO django_migrations (app, name, applied) "
+            "VALUES ('app_correct', '0001_initial', '2019-01-01')"
+        )
+        db.commit()
+        db.close()
+
+        self.assertEqual(
+            load_applied_migrations(path), {("app_correct", "0001_initial")}
+        )
+
+    def test_lint_unapplied_migrations(self):
+        linter = self._get_linter()
+        unapplied = ("app_add_not_null_column", "0002_add_new_not_null_field")
+        applied_migrations = set(linter.get_migration_loader().graph.nodes) - {
+            unapplied
+        }
+
+        linter.lint_all_migrations(applied_migrations=applied_migrations)
+        self.assertEqual(linter.nb_total, 1)
+        self.assertEqual(
+            [(app_label, name) for app_label, name, _ in linter.erroneous_migrations],
+            [unapplied],
+        )
+
+    def test_plan_order(self):
+        linter = self._get_linter()
+        graph = linter.get_migration_loader().graph
+
+        linted = [
+            (result.app_label, result.migration_name)
+            for result in linter.lint_all_migrations(
+                applied_migrations=set(), lazy=True
+            )
+        ]
+        self.assertEqual(
+            sorted(linted),
+            sorted(
+                key
+                for key in graph.nodes
+                if key[0] not in ("admin", "auth", "contenttypes", "sessions")
+            ),
+        )
+        for index, key in enumerate(linted):
+            for parent in graph.node_map[key].parents:
+                if parent.key in linted:
+                    self.assertLess(linted.index(parent.key), index)
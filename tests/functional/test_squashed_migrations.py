@@ -0,0 +1,76 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import unittest
+
+from django.conf import settings
+
+from django_migration_linter import MigrationLinter
+
+APP = "app_squashed_migrations"
+
+
+class SquashedMigrationsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_project_path = os.path.dirname(settings.BASE_DIR)
+
+    def _lint(self, **kwargs):
+        linter = MigrationLinter(
+            self.test_project_path,
+            include_apps=[APP],
+            no_cache=True,
+            reporters=[],
+            lint_replaced=kwargs.pop("lint_replaced", False),
+        )
+        return linter, [
+            (result.app_label, result.migration_name)
+            for result in linter.lint_all_migrations(lazy=True, **kwargs)
+            if result.app_label == APP
+        ]
+
+    def test_lint_squashed(self):
+        linter, linted = self._lint()
+        self.assertEqual(
+            linted,
+            [
+                (APP, "0001_squashed_0002_remove_a_old_field"),
+                (APP, "0003_b"),
+            ],
+        )
+        self.assertEqual(linter.nb_redundant, 2)
+        self.assertFalse(linter.has_errors)
+
+    def test_lint_replaced(self):
+        linter, linted = self._lint(lint_replaced=True)
+        self.assertEqual(
+            linted,
+            [
+                (APP, "0001_initial"),
+                (APP, "0002_remove_a_old_field"),
+                (APP, "0003_b"),
+            ],
+        )
+        self.assertEqual(linter.nb_redundant, 1)
+        self.assertTrue(linter.has_errors)
+
+    def test_lint_partially_applied(self):
+        linter, linted = self._lint(applied_migrations={(APP, "0001_initial")})
+        self.assertEqual(linted, [(APP, "0002_remove_a_old_field"), (APP, "0003_b")])
+        self.assertTrue(linter.has_errors)
+
+    def test_lint_fully_applied(self):
+        linter, linted = self._lint(
+            applied_migrations={(APP, "0001_initial"), (APP, "0002_remove_a_old_field")}
+        )
+        self.assertEqual(linted, [(APP, "0003_b")])
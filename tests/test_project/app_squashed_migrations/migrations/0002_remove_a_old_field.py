@@ -0,0 +1,8 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("app_squashed_migrations", "0001_initial")]
+
+    operations = [migrations.RemoveField(model_name="a", name="old_field")]
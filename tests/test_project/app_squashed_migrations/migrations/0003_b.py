@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_squashed_migrations", "0001_squashed_0002_remove_a_old_field")
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="B",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("null_field", models.IntegerField(null=True)),
+            ],
+        )
+    ]
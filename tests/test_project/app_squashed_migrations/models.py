@@ -0,0 +1,9 @@
+from django.db import models
+
+
+class A(models.Model):
+    pass
+
+
+class B(models.Model):
+    null_field = models.IntegerField(null=True)
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
     "tests.test_project.app_ignore_migration",
     "tests.test_project.app_rename_column",
     "tests.test_project.app_rename_table",
+    "tests.test_project.app_squashed_migrations",
 ]
 
 MIDDLEWARE = [
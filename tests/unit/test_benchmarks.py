@@ -0,0 +1,56 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.generator import ProjectGenerator, parse_mix
+
+
+class ProjectGeneratorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("AddField=3,RunSQL"), {"AddField": 3, "RunSQL": 1})
+        with self.assertRaises(ValueError):
+            parse_mix("DeleteModel=1")
+
+    def test_generate(self):
+        ProjectGenerator(2, 5).generate(self.project_dir)
+        migrations_dir = os.path.join(self.project_dir, "bench_app_1", "migrations")
+        self.assertEqual(
+            sorted(os.listdir(migrations_dir)),
+            [
+                "0001_initial.py",
+                "0002_step.py",
+                "0003_step.py",
+                "0004_step.py",
+                "0005_step.py",
+                "__init__.py",
+            ],
+        )
+        for name in os.listdir(migrations_dir):
+            with open(os.path.join(migrations_dir, name)) as f:
+                compile(f.read(), name, "exec")
+
+    def test_first_migrations_dont_depend_on_their_number(self):
+        short = list(ProjectGenerator(1, 3).generate_migrations("app", 3))
+        full = list(ProjectGenerator(1, 10).generate_migrations("app", 10))
+        self.assertEqual(short, full[:3])
@@ -0,0 +1,156 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from django.db.migrations import Migration
+
+from django_migration_linter import MigrationLinter
+from django_migration_linter.budget import Budget, BudgetOverrun
+from django_migration_linter.results import LintError, LintResult, TableLock
+from django_migration_linter.table_stats import ImpactEstimate, TableCost
+
+if sys.version_info >= (3, 3):
+    import unittest.mock as mock
+else:
+    import mock
+
+
+def rewrite_result(*tables):
+    return LintResult(
+        "ERR",
+        [LintError("TABLE_REWRITE", "Rewriting the table", table) for table in tables],
+        [TableLock(table, "ACCESS EXCLUSIVE", 1, 3) for table in tables],
+    )
+
+
+class BudgetTestCase(unittest.TestCase):
+    def test_table_limits(self):
+        budget = Budget(
+            table_limits={"a": {"rewrites": 1}, "*": {"blocking_locks": 1}},
+            vendor="postgresql",
+        )
+        budget.add("app", "0001", rewrite_result("a", "b"))
+        budget.add("app", "0002", rewrite_result("a"))
+        budget.add("app", "0003", rewrite_result("b"))
+        budget.add(
+            "app",
+            "0004",
+            LintResult("OK", locks=[TableLock("b", "SHARE UPDATE EXCLUSIVE", 1, 1)]),
+        )
+        self.assertEqual(
+            budget.get_overruns(),
+            [
+                BudgetOverrun(
+                    "a", "rewrites", 2, 1, (("app", "0001"), ("app", "0002"))
+                ),
+                BudgetOverrun(
+                    "b", "blocking_locks", 2, 1, (("app", "0001"), ("app", "0003"))
+                ),
+            ],
+        )
+
+    def test_release_limits(self):
+        budget = Budget(
+            release_limits={"rewrites": 2, "seconds": 10}, vendor="postgresql"
+        )
+        budget.add("app", "0001", rewrite_result("a"))
+        budget.add(
+            "app",
+            "0002",
+            rewrite_result("b", "c"),
+            ImpactEstimate(
+                8.0, 0, (TableCost("b", 5.0, 0), TableCost("c", 3.0, 0)), ()
+            ),
+        )
+        self.assertEqual(
+            budget.get_overruns(),
+            [BudgetOverrun(None, "rewrites", 3, 2, (("app", "0001"), ("app", "0002")))],
+        )
+
+    def test_load(self):
+        budget_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(budget_dir, "budget.json")
+            with open(path, "w") as f:
+                json.dump(
+                    {"release": {"rewrites": 2}, "tables": {"a": {"seconds": 5}}}, f
+                )
+            budget = Budget.load(path)
+            self.assertEqual(budget.release_limits, {"rewrites": 2})
+            self.assertEqual(budget.get_table_limits("a"), {"seconds": 5})
+            self.assertEqual(budget.get_table_limits("b"), {})
+
+            with open(path, "w") as f:
+                json.dump({"tables": {"a": {"alter_tables": 5}}}, f)
+            with self.assertRaises(ValueError):
+                Budget.load(path)
+        finally:
+            shutil.rmtree(budget_dir)
+
+
+class LinterBudgetTestCase(unittest.TestCase):
+    def setUp(self):
+        self.budget_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.budget_dir)
+
+    def _lint(self, limits):
+        budget_path = os.path.join(self.budget_dir, "budget.json")
+        with open(budget_path, "w") as f:
+            json.dump(limits, f)
+        linter = MigrationLinter(no_cache=True, reporters=[], budget=budget_path)
+        with mock.patch.object(
+            linter, "get_lint_result", return_value=rewrite_result("a")
+        ):
+            linter.lint_all_migrations(
+                migration_paths=[
+                    "tests/test_project/app_add_not_null_column/migrations/{0}.py".format(
+                        name
+                    )
+                    for name in ("0001_create_table", "0002_add_new_not_null_field")
+                ]
+            )
+        return linter
+
+    def test_within_budget(self):
+        linter = self._lint({"tables": {"a": {"rewrites": 2}}})
+        self.assertEqual(linter.budget_overruns, [])
+        # The migrations are erroneous, but the budget is not exceeded
+        self.assertEqual(linter.nb_erroneous, 2)
+
+    def test_budget_exceeded(self):
+        linter = self._lint({"tables": {"a": {"rewrites": 1}}})
+        self.assertEqual(
+            linter.budget_overruns,
+            [
+                BudgetOverrun(
+                    "a",
+                    "rewrites",
+                    2,
+                    1,
+                    (
+                        ("app_add_not_null_column", "0001_create_table"),
+                        ("app_add_not_null_column", "0002_add_new_not_null_field"),
+                    ),
+                )
+            ],
+        )
+        self.assertTrue(linter.has_errors)
@@ -0,0 +1,124 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+import unittest
+
+from django_migration_linter.cli import main
+
+if sys.version_info >= (3, 3):
+    import unittest.mock as mock
+else:
+    import mock
+
+# Modules that must not be imported before the linter actually runs
+HEAVY_MODULES = ("django.core.management", "django.db.migrations")
+
+# Generous upper bound of the cumulative import time of the package
+IMPORT_TIME_BUDGET_US = 200000
+
+
+def get_import_times(statement):
+    """
+    Run the statement in a fresh interpreter with -X importtime
+    and return the cumulative import time (in us) of each imported module.
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    _, stderr = process.communicate()
+    import_times = {}
+    for line in stderr.decode("utf-8").splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        import_times[module.strip()] = int(cumulative)
+    return import_times
+
+
+@unittest.skipIf(sys.version_info < (3, 7), "-X importtime requires Python 3.7")
+class ImportTimeTestCase(unittest.TestCase):
+    def test_import_package(self):
+        import_times = get_import_times("import django_migration_linter")
+        self.assertNotIn("django", import_times)
+        self.assertNotIn("subprocess", import_times)
+        self.assertLess(import_times["django_migration_linter"], IMPORT_TIME_BUDGET_US)
+
+    def test_import_cli(self):
+        import_times = get_import_times("import django_migration_linter.cli")
+        self.assertNotIn("django", import_times)
+        self.assertNotIn("subprocess", import_times)
+        self.assertLess(
+            import_times["django_migration_linter.cli"], IMPORT_TIME_BUDGET_US
+        )
+
+    def test_import_migration_linter(self):
+        import_times = get_import_times(
+            "import django_migration_linter.migration_linter"
+        )
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, import_times)
+
+
+class PackageTestCase(unittest.TestCase):
+    def test_public_api(self):
+        import django_migration_linter
+
+        for name in django_migration_linter.__all__:
+            self.assertTrue(hasattr(django_migration_linter, name), name)
+        self.assertFalse(hasattr(django_migration_linter, "Popen"))
+
+    def test_run_module(self):
+        process = subprocess.Popen(
+            [sys.executable, "-m", "django_migration_linter.cli", "--help"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        stdout, _ = process.communicate()
+        self.assertEqual(process.returncode, 0)
+        self.assertIn(b"usage:", stdout)
+
+
+class CommandLineTestCase(unittest.TestCase):
+    def test_lint_valid_app(self):
+        with self.assertRaises(SystemExit) as exit_context:
+            main(
+                [
+                    "--no-cache",
+                    "--include-apps",
+                    "app_create_table_with_not_null_column",
+                ]
+            )
+        self.assertEqual(exit_context.exception.code, 0)
+
+    def test_report_files_closed_on_error(self):
+        report_file = mock.mock_open()
+        with mock.patch(
+            "django_migration_linter.cli.open", report_file, create=True
+        ), mock.patch(
+            "django_migration_linter.MigrationLinter.lint_all_migrations",
+            side_effect=RuntimeError,
+        ):
+            with self.assertRaises(RuntimeError):
+                main(["--no-cache", "--report", "sarif:lint.sarif"])
+        report_file.assert_called_once_with("lint.sarif", "w")
+        report_file().close.assert_called_once_with()
+
+    def test_lint_erroneous_app(self):
+        with self.assertRaises(SystemExit) as exit_context:
+            main(["--no-cache", "--include-apps", "app_drop_column"])
+        self.assertEqual(exit_context.exception.code, 1)
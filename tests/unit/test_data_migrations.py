@@ -0,0 +1,92 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from django.db import migrations
+
+from django_migration_linter.data_migrations import (
+    analyse_data_migration,
+    analyse_python_function,
+)
+
+
+def save_all_rows(apps, schema_editor):
+    Book = apps.get_model("app", "Book")
+    for book in Book.objects.all():
+        book.title = book.title.strip()
+        book.save()
+
+
+def save_all_rows_with_iterator(apps, schema_editor):
+    Book = apps.get_model("app", "Book")
+    for book in Book.objects.order_by("pk").iterator():
+        book.title = book.title.strip()
+        book.save(update_fields=["title"])
+
+
+def update_in_batches(apps, schema_editor):
+    Book = apps.get_model("app", "Book")
+    books = Book.objects.filter(title="")
+    while True:
+        pks = list(books.values_list("pk", flat=True)[:1000])
+        if not pks:
+            break
+        Book.objects.filter(pk__in=pks).update(title="Untitled")
+    for start in range(0, 10000, 1000):
+        for book in Book.objects.all()[start : start + 1000]:
+            book.title.strip()
+
+
+def save_in_batches(apps, schema_editor):
+    Book = apps.get_model("app", "Book")
+    for start in range(0, 10000, 1000):
+        for book in Book.objects.order_by("pk")[start : start + 1000]:
+            book.title = book.title.strip()
+            book.save(update_fields=["title"])
+    for _ in range(3):
+        Book.objects.first().save()
+
+
+def get_error_codes(function):
+    return [err.code for err in analyse_python_function(function)]
+
+
+class DataMigrationTestCase(unittest.TestCase):
+    def test_full_table_iteration(self):
+        self.assertEqual(
+            get_error_codes(save_all_rows), ["FULL_TABLE_ITERATION", "SAVE_IN_LOOP"]
+        )
+
+    def test_iterator(self):
+        self.assertEqual(get_error_codes(save_all_rows_with_iterator), [])
+
+    def test_batches(self):
+        self.assertEqual(get_error_codes(update_in_batches), [])
+        self.assertEqual(get_error_codes(save_in_batches), [])
+
+    def test_migration(self):
+        migration = migrations.Migration("0002_data", "app")
+        migration.operations = [
+            migrations.RunPython(save_all_rows, migrations.RunPython.noop),
+            migrations.RunPython(migrations.RunPython.noop),
+            migrations.RunSQL("UPDATE app_book SET title = '';"),
+        ]
+        self.assertEqual(
+            [err.code for err in analyse_data_migration(migration)],
+            ["FULL_TABLE_ITERATION", "SAVE_IN_LOOP"],
+        )
+
+    def test_source_not_available(self):
+        self.assertEqual(analyse_python_function(len), [])
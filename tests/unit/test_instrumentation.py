@@ -0,0 +1,159 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from django_migration_linter import MigrationLinter
+from django_migration_linter.instrumentation import (
+    NULL_SPAN,
+    ChromeTraceExporter,
+    Instrumentation,
+    OpenMetricsExporter,
+    Profiler,
+    Span,
+)
+
+if sys.version_info >= (3, 3):
+    import unittest.mock as mock
+else:
+    import mock
+
+MIGRATION_PATHS = [
+    "tests/test_project/app_add_not_null_column/migrations/{0}.py".format(name)
+    for name in ("0001_create_table", "0002_add_new_not_null_field")
+]
+
+
+class RecordingInstrumentation(Instrumentation):
+    def __init__(self):
+        self.spans = []
+        self.counters = {}
+        self.finished_runs = 0
+
+    def span_finished(self, span):
+        self.spans.append(span)
+
+    def count(self, name, value):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def run_finished(self, linter):
+        self.finished_runs += 1
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    def test_disabled_instrumentation(self):
+        linter = MigrationLinter(no_cache=True)
+        self.assertIs(linter._span("hash", migration="app.0001"), NULL_SPAN)
+
+    def test_spans_and_counters(self):
+        instrumentation = RecordingInstrumentation()
+        linter = MigrationLinter(no_cache=True, instrumentation=[instrumentation])
+        linter.lint_all_migrations(migration_paths=MIGRATION_PATHS)
+
+        span_names = [span.name for span in instrumentation.spans]
+        self.assertEqual(span_names.count("run"), 1)
+        self.assertEqual(span_names.count("discover"), 1)
+        for name in ("hash", "sql", "analyse", "report"):
+            self.assertEqual(span_names.count(name), 2)
+        for span in instrumentation.spans:
+            self.assertGreaterEqual(span.duration, 0)
+            self.assertIsNotNone(span.thread_id)
+
+        self.assertGreater(instrumentation.counters["bytes_hashed"], 0)
+        self.assertGreater(instrumentation.counters["sql_statements"], 0)
+        self.assertNotIn("cache_hits", instrumentation.counters)
+        self.assertEqual(instrumentation.finished_runs, 1)
+
+    def test_chrome_trace(self):
+        trace_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, trace_dir)
+        trace_path = os.path.join(trace_dir, "trace.json")
+
+        linter = MigrationLinter(
+            no_cache=True, instrumentation=[ChromeTraceExporter(trace_path)]
+        )
+        linter.lint_all_migrations(migration_paths=MIGRATION_PATHS)
+
+        with open(trace_path) as f:
+            events = json.load(f)["traceEvents"]
+        spans = [event for event in events if event["ph"] == "X"]
+        thread_names = [event for event in events if event["ph"] == "M"]
+        self.assertEqual(len(spans), 10)
+        for span in spans:
+            self.assertEqual(span["pid"], os.getpid())
+            self.assertGreaterEqual(span["dur"], 0)
+        self.assertEqual(
+            set((span["pid"], span["tid"]) for span in spans),
+            set((event["pid"], event["tid"]) for event in thread_names),
+        )
+        self.assertIn(
+            {"migration": "app_add_not_null_column.0001_create_table"},
+            [span["args"] for span in spans if span["name"] == "sql"],
+        )
+
+    def test_openmetrics(self):
+        metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, metrics_dir)
+        metrics_path = os.path.join(metrics_dir, "linter.prom")
+
+        linter = MigrationLinter(
+            no_cache=True, instrumentation=[OpenMetricsExporter(metrics_path)]
+        )
+        linter.lint_all_migrations(migration_paths=MIGRATION_PATHS)
+
+        with open(metrics_path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[-1], "# EOF")
+        self.assertEqual(os.listdir(metrics_dir), ["linter.prom"])
+        for line in (
+            "django_migration_linter_run_duration_seconds_count 1",
+            "django_migration_linter_phase_duration_seconds_bucket"
+            + '{phase="sql",le="+Inf"} 2',
+            "django_migration_linter_migrations_linted 2",
+            "django_migration_linter_migrations_erroneous 1",
+            "django_migration_linter_migrations_cached 0",
+        ):
+            self.assertIn(line, lines)
+        # Without cache, there is no hit ratio nor cache size
+        self.assertFalse(
+            [line for line in lines if "cache_hit_ratio" in line or "size" in line]
+        )
+
+
+class ProfilerTestCase(unittest.TestCase):
+    def test_report(self):
+        profiler = Profiler()
+        for name, migration, duration in (
+            ("sql", "app.0001", 1.0),
+            ("sql", "app.0002", 3.0),
+            ("analyse", "app.0002", 0.5),
+        ):
+            span = Span(name, {"migration": migration})
+            span.start, span.end = 0, duration
+            profiler.span_finished(span)
+        profiler.count("cache_hits", 2)
+
+        with mock.patch("sys.stdout") as stdout:
+            profiler.print_report()
+        output = "".join(call[0][0] for call in stdout.write.call_args_list)
+
+        self.assertLess(output.index("sql"), output.index("analyse"))
+        self.assertLess(output.index("app.0002"), output.index("app.0001"))
+        self.assertIn("3.500s app.0002", output)
+        self.assertIn("2 cache_hits", output)
@@ -12,11 +12,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import sys
 import unittest
 
+from django.db import models
+from django.test import override_settings
 from django.db.migrations import Migration
 
 from django_migration_linter import MigrationLinter
+from django_migration_linter.loader import PartialMigrationLoader
+
+if sys.version_info >= (3, 3):
+    import unittest.mock as mock
+else:
+    import mock
+
+
+def remove_model_field(model, field):
+    """Undo Field.contribute_to_class on the model of a test."""
+    model._meta.local_fields.remove(field)
+    model._meta._expire_cache()
+    if hasattr(model, field.attname):
+        delattr(model, field.attname)
 
 
 class LinterFunctionsTestCase(unittest.TestCase):
@@ -43,6 +60,47 @@ class LinterFunctionsTestCase(unittest.TestCase):
         linter.lint_migration(m)
         self.assertTrue(linter.has_errors)
 
+    def test_lazy_results(self):
+        linter = MigrationLinter(no_cache=True)
+        results = linter.lint_all_migrations(
+            migration_paths=[
+                "tests/test_project/app_add_not_null_column/migrations/{0}.py".format(
+                    name
+                )
+                for name in ("0001_create_table", "0002_add_new_not_null_field")
+            ],
+            lazy=True,
+        )
+        self.assertEqual(linter.nb_total, 0)
+
+        results = list(results)
+        self.assertEqual(
+            [(r.app_label, r.migration_name) for r in results],
+            [
+                ("app_add_not_null_column", "0001_create_table"),
+                ("app_add_not_null_column", "0002_add_new_not_null_field"),
+            ],
+        )
+        self.assertEqual(results[0].result, "OK")
+        self.assertEqual(results[1].result, "ERR")
+        self.assertTrue(results[1].errors)
+        self.assertEqual(linter.nb_total, 2)
+
+    def test_fail_fast(self):
+        linter = MigrationLinter(fail_fast=True, no_cache=True)
+        linter.lint_all_migrations(
+            migration_paths=[
+                "tests/test_project/{0}/migrations/{1}.py".format(app_label, name)
+                for app_label, name in (
+                    ("app_add_not_null_column", "0001_create_table"),
+                    ("app_add_not_null_column", "0002_add_new_not_null_field"),
+                    ("app_drop_column", "0001_initial"),
+                )
+            ]
+        )
+        self.assertEqual(linter.nb_total, 2)
+        self.assertEqual(linter.nb_erroneous, 1)
+
     def test_ignore_migration_include_apps(self):
         linter = MigrationLinter(include_apps=("app_add_not_null_column",))
         self.assertTrue(linter.should_ignore_migration("app_correct", "0001"))
@@ -73,3 +131,123 @@ class LinterFunctionsTestCase(unittest.TestCase):
         linter = MigrationLinter()
         migrations = linter._gather_all_migrations()
         self.assertGreater(len(list(migrations)), 1)
+
+    def test_gather_migrations_from_paths(self):
+        linter = MigrationLinter()
+        migrations = linter._gather_migrations_from_paths(
+            [
+                "tests/test_project/app_correct/migrations/0002_foo.py",
+                "tests/test_project/app_correct/migrations/__init__.py",
+                "tests/test_project/app_correct/models.py",
+            ]
+        )
+        self.assertEqual(
+            [(m.app_label, m.name) for m in migrations], [("app_correct", "0002_foo")]
+        )
+        self.assertIsInstance(linter.migration_loader, PartialMigrationLoader)
+        self.assertEqual(linter.migration_loader.migrated_apps, {"app_correct"})
+
+    def test_lint_migration_paths(self):
+        linter = MigrationLinter()
+        linter.lint_all_migrations(
+            migration_paths=[
+                "tests/test_project/app_drop_column/migrations/0001_initial.py",
+                "tests/test_project/app_drop_column/migrations/0002_remove_a_field_b.py",
+            ]
+        )
+        self.assertEqual(linter.nb_total, 2)
+        self.assertTrue(linter.has_errors)
+
+    def test_lint_model_changes_without_changes(self):
+        linter = MigrationLinter()
+        linter.lint_model_changes()
+        self.assertEqual(linter.nb_total, 0)
+
+    def test_lint_model_changes(self):
+        from tests.test_project.app_correct.models import A
+
+        # Add a field to the model and alter another one, without migrations
+        field = models.IntegerField(default=1)
+        field.contribute_to_class(A, "new_not_null_field")
+        self.addCleanup(remove_model_field, A, field)
+        altered_field = A._meta.get_field("new_null_field")
+        self.addCleanup(setattr, altered_field, "null", True)
+        altered_field.null = False
+
+        reporter = mock.Mock()
+        linter = MigrationLinter(reporters=[reporter])
+        migrations = linter._gather_model_changes()
+        linter.lint_model_changes()
+
+        self.assertEqual(len(migrations), 1)
+        self.assertEqual(migrations[0].app_label, "app_correct")
+        self.assertTrue(migrations[0].name.startswith("0003_"))
+        self.assertEqual(linter.nb_total, 1)
+        self.assertTrue(linter.has_errors)
+        lint_result = reporter.report_migration.call_args[0][2]
+        # SQLite rebuilds the table for each operation
+        self.assertEqual(
+            [(err.code, err.table) for err in lint_result.errors],
+            [("RENAME_TABLE", "app_correct_a")] * 2,
+        )
+
+    def test_require_lock_timeout(self):
+        connection = mock.Mock(vendor="postgresql", settings_dict={"OPTIONS": {}})
+        with override_settings(MIGRATION_LINTER_REQUIRE_LOCK_TIMEOUT=["default"]):
+            self.assertTrue(MigrationLinter().should_require_lock_timeout(connection))
+            self.assertFalse(
+                MigrationLinter(database="mysql").should_require_lock_timeout(
+                    connection
+                )
+            )
+            self.assertFalse(
+                MigrationLinter(require_lock_timeout=False).should_require_lock_timeout(
+                    connection
+                )
+            )
+        self.assertFalse(MigrationLinter().should_require_lock_timeout(connection))
+        self.assertTrue(
+            MigrationLinter(require_lock_timeout=True).should_require_lock_timeout(
+                connection
+            )
+        )
+
+        connection.settings_dict["OPTIONS"]["options"] = "-c lock_timeout=5000"
+        self.assertFalse(
+            MigrationLinter(require_lock_timeout=True).should_require_lock_timeout(
+                connection
+            )
+        )
+
+    def test_blocking_checks(self):
+        self.assertFalse(MigrationLinter().should_run_blocking_checks())
+        self.assertTrue(
+            MigrationLinter(blocking_checks=True).should_run_blocking_checks()
+        )
+        with override_settings(MIGRATION_LINTER_BLOCKING_CHECKS=["default"]):
+            self.assertTrue(MigrationLinter().should_run_blocking_checks())
+            self.assertFalse(
+                MigrationLinter(database="mysql").should_run_blocking_checks()
+            )
+
+    def test_column_types(self):
+        linter = MigrationLinter(blocking_checks=True)
+        migration = linter.get_migration_loader().get_migration(
+            "app_alter_column", "0002_auto_20190414_1456"
+        )
+        self.assertEqual(linter.get_column_types(migration), {})
+
+        # The previous types are only needed on PostgreSQL
+        linter.get_analysis_context()["vendor"] = "postgresql"
+        self.assertEqual(
+            linter.get_column_types(migration),
+            {("app_alter_column_a", "field"): "integer"},
+        )
+        lint_result = linter.get_lint_result(
+            [
+                'ALTER TABLE "app_alter_column_a" ALTER COLUMN "field" '
+                'TYPE varchar(10) USING "field"::varchar(10);'
+            ],
+            column_types=linter.get_column_types(migration),
+        )
+        self.assertIn("TABLE_REWRITE", [err.code for err in lint_result.errors])
@@ -0,0 +1,81 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from django_migration_linter.loader import (
+    PartialMigrationLoader,
+    SquashAwareMigrationLoader,
+)
+
+APP = "app_squashed_migrations"
+SQUASHED = (APP, "0001_squashed_0002_remove_a_old_field")
+REPLACED = [(APP, "0001_initial"), (APP, "0002_remove_a_old_field")]
+
+
+class PartialMigrationLoaderTestCase(unittest.TestCase):
+    def test_load_only_given_apps(self):
+        loader = PartialMigrationLoader(["app_correct"], connection=None)
+        self.assertEqual(loader.migrated_apps, {"app_correct"})
+        self.assertIn(("app_correct", "0002_foo"), loader.graph.nodes)
+        self.assertNotIn("app_drop_column", loader.unmigrated_apps)
+
+    def test_load_dependent_apps(self):
+        loader = PartialMigrationLoader(["admin"], connection=None)
+        self.assertEqual(loader.migrated_apps, {"admin", "auth", "contenttypes"})
+        self.assertNotIn("sessions", loader.migrated_apps)
+
+
+class SquashAwareMigrationLoaderTestCase(unittest.TestCase):
+    def assertUsesSquashed(self, loader):
+        self.assertIn(SQUASHED, loader.graph.nodes)
+        self.assertEqual(loader.get_redundant_migration_keys(), set(REPLACED))
+        self.assertEqual(
+            loader.graph.node_map[(APP, "0003_b")].parents,
+            {loader.graph.node_map[SQUASHED]},
+        )
+
+    def assertUsesReplaced(self, loader):
+        for key in REPLACED:
+            self.assertIn(key, loader.graph.nodes)
+        self.assertEqual(loader.get_redundant_migration_keys(), {SQUASHED})
+        self.assertEqual(
+            loader.graph.node_map[(APP, "0003_b")].parents,
+            {loader.graph.node_map[REPLACED[-1]]},
+        )
+
+    def test_use_squashed(self):
+        self.assertUsesSquashed(SquashAwareMigrationLoader(connection=None))
+
+    def test_use_replaced(self):
+        self.assertUsesReplaced(
+            SquashAwareMigrationLoader(connection=None, use_replaced=True)
+        )
+
+    def test_partially_applied(self):
+        self.assertUsesReplaced(
+            SquashAwareMigrationLoader(
+                connection=None, applied_migrations={REPLACED[0]}
+            )
+        )
+
+    def test_applied_snapshot_overrides_policy(self):
+        for applied_migrations in (set(), set(REPLACED)):
+            self.assertUsesSquashed(
+                SquashAwareMigrationLoader(
+                    connection=None,
+                    use_replaced=True,
+                    applied_migrations=applied_migrations,
+                )
+            )
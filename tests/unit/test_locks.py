@@ -0,0 +1,123 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from django_migration_linter.locks import (
+    get_migration_locks,
+    get_statement_locks,
+    is_blocking_lock,
+)
+from django_migration_linter.results import TableLock
+
+
+class StatementLocksTestCase(unittest.TestCase):
+    def test_postgresql(self):
+        for sql, locks in (
+            (
+                'ALTER TABLE "app_a" ADD COLUMN "field" integer NULL;',
+                [("app_a", "ACCESS EXCLUSIVE")],
+            ),
+            (
+                'ALTER TABLE "app_a" ADD CONSTRAINT "app_a_b_id_fk" FOREIGN KEY '
+                '("b_id") REFERENCES "app_b" ("id") DEFERRABLE INITIALLY DEFERRED;',
+                [("app_a", "SHARE ROW EXCLUSIVE"), ("app_b", "SHARE ROW EXCLUSIVE")],
+            ),
+            (
+                'ALTER TABLE "app_a" VALIDATE CONSTRAINT "positive";',
+                [("app_a", "SHARE UPDATE EXCLUSIVE")],
+            ),
+            ('CREATE INDEX "idx" ON "app_a" ("field");', [("app_a", "SHARE")]),
+            (
+                'CREATE INDEX CONCURRENTLY "idx" ON "app_a" ("field");',
+                [("app_a", "SHARE UPDATE EXCLUSIVE")],
+            ),
+            ('DROP INDEX IF EXISTS "idx";', [(None, "ACCESS EXCLUSIVE")]),
+            ('UPDATE "app_a" SET "field" = 0;', [("app_a", "ROW EXCLUSIVE")]),
+            ('LOCK TABLE "app_a" IN SHARE MODE;', [("app_a", "SHARE")]),
+            ("SET lock_timeout = '5s';", []),
+        ):
+            self.assertEqual(get_statement_locks(sql, "postgresql"), locks, sql)
+
+    def test_mysql(self):
+        for sql, locks in (
+            (
+                "ALTER TABLE `app_a` ADD COLUMN `field` integer NULL;",
+                [("app_a", "NONE")],
+            ),
+            (
+                "ALTER TABLE `app_a` MODIFY `field` bigint NOT NULL;",
+                [("app_a", "SHARED")],
+            ),
+            (
+                "ALTER TABLE `app_a` ADD COLUMN `field` integer NULL, LOCK=EXCLUSIVE;",
+                [("app_a", "EXCLUSIVE")],
+            ),
+            ("CREATE INDEX `idx` ON `app_a` (`field`);", [("app_a", "NONE")]),
+            ("RENAME TABLE `app_a` TO `app_b`;", [("app_a", "EXCLUSIVE")]),
+            ("DROP TABLE `app_a` CASCADE;", [("app_a", "EXCLUSIVE")]),
+        ):
+            self.assertEqual(get_statement_locks(sql, "mysql"), locks, sql)
+
+    def test_other_vendors(self):
+        self.assertEqual(get_statement_locks('DROP TABLE "app_a";', "sqlite"), [])
+
+    def test_blocking_lock(self):
+        self.assertTrue(is_blocking_lock("SHARE", "postgresql"))
+        self.assertTrue(is_blocking_lock("EXCLUSIVE", "postgresql"))
+        self.assertFalse(is_blocking_lock("SHARE UPDATE EXCLUSIVE", "postgresql"))
+        self.assertTrue(is_blocking_lock("SHARED", "mysql"))
+        self.assertFalse(is_blocking_lock("NONE", "mysql"))
+        self.assertFalse(is_blocking_lock("EXCLUSIVE", "sqlite"))
+
+
+class MigrationLocksTestCase(unittest.TestCase):
+    SQL_STATEMENTS = [
+        'CREATE INDEX "idx" ON "app_a" ("field");',
+        'ALTER TABLE "app_a" ADD COLUMN "field" integer NULL;',
+        'UPDATE "app_b" SET "field" = 0;',
+        'ALTER TABLE "app_a" ADD COLUMN "other" integer NULL;',
+        'UPDATE "app_a" SET "field" = 0;',
+    ]
+
+    def test_atomic(self):
+        self.assertEqual(
+            get_migration_locks(self.SQL_STATEMENTS, "postgresql", atomic=True),
+            [
+                TableLock("app_a", "ACCESS EXCLUSIVE", 2, 5),
+                TableLock("app_b", "ROW EXCLUSIVE", 3, 5),
+            ],
+        )
+
+    def test_non_atomic(self):
+        self.assertEqual(
+            get_migration_locks(self.SQL_STATEMENTS, "postgresql", atomic=False),
+            [
+                TableLock("app_a", "ACCESS EXCLUSIVE", 2, 4),
+                TableLock("app_b", "ROW EXCLUSIVE", 3, 3),
+            ],
+        )
+
+    def test_mysql_ddl_is_not_transactional(self):
+        self.assertEqual(
+            get_migration_locks(
+                [
+                    "ALTER TABLE `app_a` MODIFY `field` bigint NOT NULL;",
+                    "ALTER TABLE `app_a` ADD COLUMN `other` integer NULL;",
+                ],
+                "mysql",
+                atomic=True,
+            ),
+            [TableLock("app_a", "SHARED", 1, 1)],
+        )
@@ -0,0 +1,66 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import unittest
+
+from django_migration_linter.pipeline import Pipeline
+
+
+class PipelineTestCase(unittest.TestCase):
+    def test_items_keep_their_order(self):
+        results = []
+        pipeline = Pipeline(
+            [lambda x: x * 2, lambda x: x + 1, results.append],
+            main_stage=1,
+            queue_size=2,
+        )
+        pipeline.run(range(100))
+        self.assertEqual(results, [x * 2 + 1 for x in range(100)])
+
+    def test_main_stage_runs_in_calling_thread(self):
+        threads = []
+        pipeline = Pipeline(
+            [
+                lambda x: threads.append(("first", threading.current_thread())),
+                lambda x: threads.append(("main", threading.current_thread())),
+            ],
+            main_stage=1,
+        )
+        pipeline.run([1])
+        self.assertEqual(dict(threads)["main"], threading.current_thread())
+        self.assertNotEqual(dict(threads)["first"], threading.current_thread())
+
+    def test_stage_exception_is_raised(self):
+        def fail(x):
+            if x == 5:
+                raise ZeroDivisionError()
+            return x
+
+        pipeline = Pipeline([fail, lambda x: x], main_stage=1, queue_size=1)
+        with self.assertRaises(ZeroDivisionError):
+            pipeline.run(range(1000))
+        self.assertTrue(pipeline.stopped)
+
+    def test_stop_cancels_outstanding_items(self):
+        results = []
+
+        def report(x):
+            results.append(x)
+            if x == 3:
+                pipeline.stop()
+
+        pipeline = Pipeline([lambda x: x, report], main_stage=0, queue_size=1)
+        pipeline.run(range(1000))
+        self.assertEqual(results, [0, 1, 2, 3])
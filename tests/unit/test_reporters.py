@@ -0,0 +1,326 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import sys
+import unittest
+import warnings
+from xml.dom import minidom
+
+from django_migration_linter import MigrationLinter
+from django_migration_linter.budget import BudgetOverrun
+from django_migration_linter.reporters import (
+    BufferedWriter,
+    SARIF_SCHEMA,
+    JsonLinesReporter,
+    JUnitReporter,
+    SarifReporter,
+    TextReporter,
+    format_size,
+)
+from django_migration_linter.results import (
+    IGNORE_RESULT,
+    OK_RESULT,
+    LintError,
+    LintResult,
+    TableLock,
+)
+from django_migration_linter.rewrites import RepeatedRewrite
+from django_migration_linter.table_stats import ImpactEstimate, TableCost
+
+if sys.version_info >= (3, 3):
+    import unittest.mock as mock
+    from io import StringIO
+else:
+    import mock
+    from StringIO import StringIO
+
+ERR_RESULT = LintResult(
+    "ERR",
+    [LintError("NOT_NULL", "NOT NULL constraint on columns", "foo", "bar")],
+    [TableLock("foo", "ACCESS EXCLUSIVE", 1, 2)],
+)
+
+
+class FakeStream(object):
+    def __init__(self):
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        return "".join(self.writes)
+
+
+# The structure required by the SARIF 2.1.0 schema, for the parts written
+SARIF_LOG_PROPERTIES = {"version", "$schema", "runs"}
+SARIF_RESULT_PROPERTIES = {"ruleId", "level", "message", "locations"}
+SARIF_LEVELS = ("none", "note", "warning", "error")
+
+
+class ReportersTestCase(unittest.TestCase):
+    def report(self, reporter_class, **kwargs):
+        stream = FakeStream()
+        linter = MigrationLinter(
+            no_cache=True, reporters=[reporter_class(stream, **kwargs)]
+        )
+        linter.report_lint_result("app", "0001_initial", OK_RESULT, cached=True)
+        linter.report_lint_result("app", "0002_foo", ERR_RESULT)
+        linter.report_lint_result("app", "0003_bar", IGNORE_RESULT)
+        linter.report_summary()
+        return stream.getvalue()
+
+    def test_buffered_writes(self):
+        stream = FakeStream()
+        writer = BufferedWriter(stream, buffer_size=100, flush_interval=60)
+        for _ in range(100):
+            writer.write("0123456789")
+        writer.flush()
+        self.assertEqual(len(stream.writes), 10)
+        self.assertEqual(stream.getvalue(), "0123456789" * 100)
+
+    def test_text(self):
+        self.assertEqual(
+            self.report(TextReporter),
+            "(app, 0001_initial)... OK (cached)\n"
+            "(app, 0002_foo)... ERR\n"
+            "\tNOT NULL constraint on columns (table: foo, column: bar)\n"
+            "(app, 0003_bar)... IGNORE\n"
+            "*** Summary:\n"
+            "Valid migrations: 1/3 - erroneous migrations: 1/3 - "
+            "ignored migrations: 1/3\n",
+        )
+
+    def test_text_lock_report(self):
+        self.assertIn(
+            "\tNOT NULL constraint on columns (table: foo, column: bar)\n"
+            "\tLOCK ACCESS EXCLUSIVE on foo (statements 1-2)\n",
+            self.report(TextReporter, lock_report=True),
+        )
+
+    def test_json_lines_lock_report(self):
+        lines = [
+            json.loads(line)
+            for line in self.report(JsonLinesReporter, lock_report=True).splitlines()
+        ]
+        self.assertEqual(lines[0]["locks"], [])
+        self.assertEqual(
+            lines[1]["locks"],
+            [
+                {
+                    "table": "foo",
+                    "mode": "ACCESS EXCLUSIVE",
+                    "first_statement": 1,
+                    "last_statement": 2,
+                }
+            ],
+        )
+
+    def test_text_estimate(self):
+        stream = FakeStream()
+        linter = MigrationLinter(no_cache=True, reporters=[TextReporter(stream)])
+        estimate = ImpactEstimate(
+            12.34, 3 * 1024**3, (TableCost("foo", 12.34, 3 * 1024**3),), ("bar",)
+        )
+        linter.impact_estimates.append(("app", "0002_foo", estimate))
+        linter.report_lint_result("app", "0002_foo", ERR_RESULT, estimate=estimate)
+        linter.report_summary()
+        self.assertIn(
+            "\tESTIMATE 12.3s holding the locks, 3.0 GB read and written "
+            "(no statistics for bar)\n",
+            stream.getvalue(),
+        )
+        self.assertIn(
+            "*** Highest estimated impact:\n(app, 0002_foo) ESTIMATE 12.3s",
+            stream.getvalue(),
+        )
+
+    def test_text_budget(self):
+        stream = FakeStream()
+        linter = MigrationLinter(no_cache=True, reporters=[TextReporter(stream)])
+        linter.budget_overruns = [
+            BudgetOverrun("foo", "rewrites", 2, 1, (("app", "0002_foo"),)),
+            BudgetOverrun(None, "seconds", 12.34, 10, (("app", "0002_foo"),)),
+        ]
+        linter.report_summary()
+        self.assertIn(
+            "*** Budget exceeded:\n"
+            "foo: 2 table rewrites, above the limit of 1, by (app, 0002_foo)\n"
+            "release: 12.3 seconds of estimated locks, above the limit of 10.0, "
+            "by (app, 0002_foo)\n",
+            stream.getvalue(),
+        )
+
+    def test_text_repeated_rewrites(self):
+        stream = FakeStream()
+        linter = MigrationLinter(no_cache=True, reporters=[TextReporter(stream)])
+        linter.repeated_rewrites = [
+            RepeatedRewrite("foo", (("app", "0002_foo"), ("app", "0003_bar")), 3)
+        ]
+        linter.report_summary()
+        self.assertIn(
+            "*** Mergeable table rewrites, 2 rebuilds could be saved:\n"
+            "foo: rewritten 3 times by (app, 0002_foo), (app, 0003_bar)\n",
+            stream.getvalue(),
+        )
+
+    def test_format_size(self):
+        self.assertEqual(format_size(512), "512 B")
+        self.assertEqual(format_size(1536), "1.5 kB")
+        self.assertEqual(format_size(5 * 1024**5), "5120.0 TB")
+
+    def test_json_lines(self):
+        lines = [
+            json.loads(line) for line in self.report(JsonLinesReporter).splitlines()
+        ]
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[0]["result"], "OK")
+        self.assertTrue(lines[0]["cached"])
+        self.assertEqual(
+            lines[1]["errors"],
+            [
+                {
+                    "code": "NOT_NULL",
+                    "err_msg": "NOT NULL constraint on columns",
+                    "table": "foo",
+                    "column": "bar",
+                }
+            ],
+        )
+        self.assertEqual(
+            lines[3],
+            {
+                "summary": {
+                    "total": 3,
+                    "valid": 1,
+                    "erroneous": 1,
+                    "ignored": 1,
+                    "redundant": 0,
+                    "baseline": 0,
+                }
+            },
+        )
+
+    def test_json_lines_skipped_counts(self):
+        stream = FakeStream()
+        linter = MigrationLinter(no_cache=True, reporters=[JsonLinesReporter(stream)])
+        linter.nb_redundant = 2
+        linter.nb_baseline = 3
+        linter.report_summary()
+        summary = json.loads(stream.getvalue())["summary"]
+        self.assertEqual((summary["redundant"], summary["baseline"]), (2, 3))
+
+    def test_junit(self):
+        document = minidom.parseString(self.report(JUnitReporter))
+        testcases = document.getElementsByTagName("testcase")
+        self.assertEqual(len(testcases), 3)
+        failures = document.getElementsByTagName("failure")
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(failures[0].getAttribute("type"), "NOT_NULL")
+        self.assertEqual(len(document.getElementsByTagName("skipped")), 1)
+
+    def test_sarif(self):
+        log = json.loads(self.report(SarifReporter))
+        self.assertEqual(log["version"], "2.1.0")
+        self.assertEqual(log["$schema"], SARIF_SCHEMA)
+        run = log["runs"][0]
+        self.assertEqual(len(run["results"]), 1)
+        self.assertEqual(run["results"][0]["ruleId"], "NOT_NULL")
+        self.assertEqual(
+            [rule["id"] for rule in run["tool"]["driver"]["rules"]], ["NOT_NULL"]
+        )
+
+    def assertValidSarif(self, log):
+        self.assertLessEqual(set(log), SARIF_LOG_PROPERTIES)
+        self.assertEqual(log["version"], "2.1.0")
+        self.assertIsInstance(log["runs"], list)
+        for run in log["runs"]:
+            driver = run["tool"]["driver"]
+            self.assertTrue(driver["name"])
+            self.assertTrue(driver["informationUri"].startswith("https://"))
+            rule_ids = [rule["id"] for rule in driver["rules"]]
+            self.assertEqual(len(rule_ids), len(set(rule_ids)))
+            for rule in driver["rules"]:
+                self.assertTrue(rule["shortDescription"]["text"])
+            for result in run["results"]:
+                self.assertLessEqual(set(result), SARIF_RESULT_PROPERTIES)
+                self.assertIn(result["ruleId"], rule_ids)
+                self.assertIn(result["level"], SARIF_LEVELS)
+                self.assertTrue(result["message"]["text"])
+                for location in result.get("locations", []):
+                    uri = location["physicalLocation"]["artifactLocation"]["uri"]
+                    self.assertNotIn("\\", uri)
+                    self.assertFalse(uri.startswith("/"))
+
+    def test_sarif_structure(self):
+        stream = FakeStream()
+        linter = MigrationLinter(no_cache=True, reporters=[SarifReporter(stream)])
+        linter.report_lint_result(
+            "app_add_not_null_column", "0002_add_new_not_null_field", ERR_RESULT
+        )
+        linter.report_lint_result(
+            "app",
+            "0003_foo",
+            LintResult(
+                "ERR",
+                [
+                    LintError("NOT_NULL", "NOT NULL constraint on columns", "foo"),
+                    LintError("RENAME_TABLE", "RENAMING tables", "foo"),
+                ],
+            ),
+        )
+        linter.report_summary()
+        log = json.loads(stream.getvalue())
+        self.assertValidSarif(log)
+
+        results = log["runs"][0]["results"]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(
+            results[0]["locations"][0]["physicalLocation"]["artifactLocation"]["uri"],
+            "tests/test_project/app_add_not_null_column/migrations/"
+            "0002_add_new_not_null_field.py",
+        )
+        self.assertNotIn("locations", results[1])
+
+
+class DeprecatedPrintTestCase(unittest.TestCase):
+    def test_print_summary(self):
+        stream = FakeStream()
+        linter = MigrationLinter(no_cache=True, reporters=[TextReporter(stream)])
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            linter.print_summary()
+        self.assertEqual(caught[0].category, DeprecationWarning)
+        self.assertTrue(stream.getvalue().startswith("*** Summary:\n"))
+
+    def test_print_errors(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            with mock.patch("sys.stdout", new_callable=StringIO) as stdout:
+                MigrationLinter.print_errors(
+                    [
+                        ERR_RESULT.errors[0],
+                        {"code": "RENAME_TABLE", "err_msg": "RENAMING tables"},
+                    ]
+                )
+        self.assertEqual(caught[0].category, DeprecationWarning)
+        self.assertEqual(
+            stdout.getvalue(),
+            "\tNOT NULL constraint on columns (table: foo, column: bar)\n"
+            "\tRENAMING tables\n",
+        )
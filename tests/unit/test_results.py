@@ -0,0 +1,85 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pickle
+import unittest
+
+from django_migration_linter.results import (
+    OK_RESULT,
+    LintError,
+    LintResult,
+    MigrationLintResult,
+    TableLock,
+)
+
+
+class ResultsTestCase(unittest.TestCase):
+    def test_immutable(self):
+        err = LintError("NOT_NULL", "NOT NULL constraint on columns", "foo", "bar")
+        with self.assertRaises(AttributeError):
+            err.code = "DROP_COLUMN"
+        with self.assertRaises(AttributeError):
+            err.extra = 1
+        self.assertFalse(hasattr(err, "__dict__"))
+
+    def test_interned_strings(self):
+        code = "".join(["NOT", "_NULL"])
+        err_msg = "".join(["NOT NULL ", "constraint on columns"])
+        err1 = LintError(code, err_msg)
+        err2 = LintError("NOT_NULL", "NOT NULL constraint on columns")
+        self.assertIs(err1.code, err2.code)
+        self.assertIs(err1.err_msg, err2.err_msg)
+
+    def test_cache_form(self):
+        lint_result = LintResult("ERR", [LintError("DROP_COLUMN", "DROPPING columns")])
+        entry = lint_result.to_cache()
+        self.assertEqual(
+            entry, ("ERR", (("DROP_COLUMN", "DROPPING columns", None, None),))
+        )
+        self.assertIs(type(entry[1][0]), tuple)
+        self.assertEqual(
+            LintResult.from_cache(pickle.loads(pickle.dumps(entry))), lint_result
+        )
+        self.assertEqual(LintResult.from_cache(OK_RESULT.to_cache()), OK_RESULT)
+
+    def test_cache_form_with_locks(self):
+        lint_result = LintResult(
+            "OK", locks=[TableLock("foo", "ACCESS EXCLUSIVE", 1, 2)]
+        )
+        entry = lint_result.to_cache()
+        self.assertEqual(entry, ("OK", (), (("foo", "ACCESS EXCLUSIVE", 1, 2),)))
+        self.assertEqual(LintResult.from_cache(entry), lint_result)
+
+    def test_legacy_cache_form(self):
+        entry = {
+            "result": "ERR",
+            "errors": [
+                {
+                    "err_msg": "DROPPING columns",
+                    "code": "DROP_COLUMN",
+                    "table": "foo",
+                    "column": None,
+                }
+            ],
+        }
+        self.assertEqual(
+            LintResult.from_cache(entry),
+            LintResult("ERR", [LintError("DROP_COLUMN", "DROPPING columns", "foo")]),
+        )
+        self.assertEqual(LintResult.from_cache({"result": "OK"}), OK_RESULT)
+
+    def test_migration_lint_result(self):
+        result = MigrationLintResult("app", "0001_initial", OK_RESULT, False)
+        self.assertEqual(result.result, "OK")
+        self.assertEqual(result.errors, ())
@@ -0,0 +1,51 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from django_migration_linter.results import OK_RESULT, LintError, LintResult
+from django_migration_linter.rewrites import RepeatedRewrite, RewriteTracker
+
+
+def rewrite_result(*tables):
+    return LintResult(
+        "ERR",
+        [LintError("TABLE_REWRITE", "Rewriting the table", table) for table in tables],
+    )
+
+
+class RewriteTrackerTestCase(unittest.TestCase):
+    def test_within_migration(self):
+        tracker = RewriteTracker()
+        tracker.add("app", "0001", rewrite_result("a", "a", "a", "b"))
+        repeated_rewrites = tracker.finish()
+        self.assertEqual(
+            repeated_rewrites, [RepeatedRewrite("a", (("app", "0001"),), 3)]
+        )
+        self.assertEqual(repeated_rewrites[0].rebuilds_saved, 2)
+
+    def test_consecutive_migrations(self):
+        tracker = RewriteTracker()
+        tracker.add("app", "0001", rewrite_result("a", "b"))
+        tracker.add("app", "0002", rewrite_result("a"))
+        tracker.add("app", "0003", OK_RESULT)
+        tracker.add("app", "0004", rewrite_result("a", "b"))
+        tracker.add("app", "0005", rewrite_result("b"))
+        self.assertEqual(
+            tracker.finish(),
+            [
+                RepeatedRewrite("a", (("app", "0001"), ("app", "0002")), 2),
+                RepeatedRewrite("b", (("app", "0004"), ("app", "0005")), 2),
+            ],
+        )
@@ -0,0 +1,34 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from django_migration_linter.sharding import is_in_shard, parse_shard
+
+
+class ShardingTestCase(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+
+    def test_parse_invalid_shard(self):
+        for value in ("2", "a/4", "0/4", "5/4"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_migration_in_exactly_one_shard(self):
+        for name in ("0001_initial", "0002_foo", "0003_bar"):
+            shards = [
+                index for index in range(1, 4) if is_in_shard("app", name, index, 3)
+            ]
+            self.assertEqual(len(shards), 1)
@@ -0,0 +1,498 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from django_migration_linter.sql_analyser import analyse_sql_statements
+
+
+def get_error_codes(sql_statements, **context):
+    return [
+        err.code for err in analyse_sql_statements(sql_statements, **context)["errors"]
+    ]
+
+
+class TableRewriteTestCase(unittest.TestCase):
+    def assertRewrites(self, sql, **context):
+        context.setdefault("blocking_checks", True)
+        self.assertIn("TABLE_REWRITE", get_error_codes([sql], **context))
+
+    def assertDoesNotRewrite(self, sql, **context):
+        context.setdefault("blocking_checks", True)
+        self.assertNotIn("TABLE_REWRITE", get_error_codes([sql], **context))
+
+    def test_opt_in(self):
+        self.assertDoesNotRewrite(
+            'ALTER TABLE "app_a" ALTER COLUMN "field" TYPE bigint '
+            'USING "field"::bigint;',
+            vendor="postgresql",
+            blocking_checks=False,
+        )
+
+    def test_postgresql_type_change(self):
+        self.assertRewrites(
+            'ALTER TABLE "app_a" ALTER COLUMN "field" TYPE bigint '
+            'USING "field"::bigint;',
+            vendor="postgresql",
+        )
+
+    def test_postgresql_varchar_widening(self):
+        sql = (
+            'ALTER TABLE "app_a" ALTER COLUMN "field" TYPE varchar(255) '
+            'USING "field"::varchar(255);'
+        )
+        self.assertDoesNotRewrite(
+            sql,
+            vendor="postgresql",
+            column_types={("app_a", "field"): "varchar(100)"},
+        )
+        self.assertRewrites(
+            sql,
+            vendor="postgresql",
+            column_types={("app_a", "field"): "varchar(300)"},
+        )
+        # Without the previous type, the type change is taken as a rewrite
+        self.assertRewrites(sql, vendor="postgresql")
+        self.assertDoesNotRewrite(
+            'ALTER TABLE "app_a" ALTER COLUMN "field" TYPE text USING "field"::text;',
+            vendor="postgresql",
+            column_types={("app_a", "field"): "varchar(100)"},
+        )
+
+    def test_postgresql_integer_to_varchar(self):
+        self.assertRewrites(
+            'ALTER TABLE "app_a" ALTER COLUMN "field" TYPE varchar(10) '
+            'USING "field"::varchar(10);',
+            vendor="postgresql",
+            column_types={("app_a", "field"): "integer"},
+        )
+
+    def test_postgresql_numeric_widening(self):
+        sql = 'ALTER TABLE "app_a" ALTER COLUMN "field" TYPE numeric(12, 2);'
+        self.assertDoesNotRewrite(
+            sql,
+            vendor="postgresql",
+            column_types={("app_a", "field"): "numeric(10, 2)"},
+        )
+        self.assertRewrites(
+            sql,
+            vendor="postgresql",
+            column_types={("app_a", "field"): "numeric(10, 3)"},
+        )
+
+    def test_postgresql_add_column_default(self):
+        sql = 'ALTER TABLE "app_a" ADD COLUMN "field" integer DEFAULT 0 NOT NULL;'
+        self.assertRewrites(sql, vendor="postgresql", server_version=(10, 7))
+        self.assertDoesNotRewrite(sql, vendor="postgresql", server_version=(11, 2))
+        # Only reported when the version is known
+        self.assertDoesNotRewrite(sql, vendor="postgresql")
+
+    def test_postgresql_add_nullable_column(self):
+        self.assertDoesNotRewrite(
+            'ALTER TABLE "app_a" ADD COLUMN "field" integer NULL;', vendor="postgresql"
+        )
+
+    def test_mysql_modify(self):
+        self.assertRewrites(
+            "ALTER TABLE `app_a` MODIFY `field` bigint NOT NULL;",
+            vendor="mysql",
+            server_version=(8, 0, 16),
+        )
+
+    def test_mysql_add_column(self):
+        sql = "ALTER TABLE `app_a` ADD COLUMN `field` integer NULL;"
+        self.assertRewrites(sql, vendor="mysql", server_version=(5, 7, 25))
+        self.assertDoesNotRewrite(sql, vendor="mysql", server_version=(8, 0, 16))
+        self.assertDoesNotRewrite(sql, vendor="mysql")
+
+    def test_mysql_explicit_algorithm(self):
+        self.assertDoesNotRewrite(
+            "ALTER TABLE `app_a` DROP COLUMN `field`, ALGORITHM=INPLACE;",
+            vendor="mysql",
+            server_version=(5, 7, 25),
+        )
+
+    def test_affected_table(self):
+        errors = analyse_sql_statements(
+            [
+                'ALTER TABLE "app_a" ALTER COLUMN "field" TYPE bigint '
+                'USING "field"::bigint;'
+            ],
+            vendor="postgresql",
+            blocking_checks=True,
+        )["errors"]
+        err = next(err for err in errors if err.code == "TABLE_REWRITE")
+        self.assertEqual(err.table, "app_a")
+        self.assertEqual(err.column, "field")
+
+    def test_other_vendors(self):
+        self.assertDoesNotRewrite(
+            'ALTER TABLE "app_a" ALTER COLUMN "field" TYPE bigint;', vendor="sqlite"
+        )
+
+
+class MergeableAlterTestCase(unittest.TestCase):
+    def test_repeated_rewrites(self):
+        sql_statements = [
+            "ALTER TABLE `app_a` ADD COLUMN `a` integer NULL;",
+            "ALTER TABLE `app_a` ADD COLUMN `b` integer NULL;",
+            "ALTER TABLE `app_b` ADD COLUMN `c` integer NULL;",
+            "ALTER TABLE `app_a` MODIFY `a` bigint NULL;",
+        ]
+        self.assertEqual(
+            get_error_codes(
+                sql_statements,
+                vendor="mysql",
+                server_version=(5, 7, 25),
+                blocking_checks=True,
+            ).count("MERGEABLE_ALTER"),
+            2,
+        )
+        # Instant on recent servers, nothing is rewritten
+        self.assertEqual(
+            get_error_codes(
+                sql_statements[:3],
+                vendor="mysql",
+                server_version=(8, 0, 30),
+                blocking_checks=True,
+            ).count("MERGEABLE_ALTER"),
+            0,
+        )
+
+    def test_other_tables(self):
+        self.assertNotIn(
+            "MERGEABLE_ALTER",
+            get_error_codes(
+                [
+                    'ALTER TABLE "app_a" ALTER COLUMN "a" TYPE bigint;',
+                    'ALTER TABLE "app_a" ALTER COLUMN "a" DROP DEFAULT;',
+                    'ALTER TABLE "app_b" ALTER COLUMN "a" TYPE bigint;',
+                ],
+                vendor="postgresql",
+                blocking_checks=True,
+            ),
+        )
+
+
+class UnboundedUpdateTestCase(unittest.TestCase):
+    def test_unbounded(self):
+        for sql_statements in (
+            ["UPDATE big_table SET flag = true;"],
+            ['DELETE FROM "big_table";'],
+            [
+                "UPDATE `big_table`",
+                "SET `flag` = 1;",
+                "UPDATE other SET a = 1 WHERE b;",
+            ],
+        ):
+            result = analyse_sql_statements(sql_statements)
+            self.assertEqual(
+                [(err.code, err.table) for err in result["errors"]],
+                [("UNBOUNDED_UPDATE", "big_table")],
+            )
+
+    def test_where_of_subquery(self):
+        self.assertIn(
+            "UNBOUNDED_UPDATE",
+            get_error_codes(
+                [
+                    "UPDATE big_table SET total = "
+                    "(SELECT SUM(amount) FROM lines WHERE lines.big_id = big_table.id);"
+                ]
+            ),
+        )
+        self.assertIn(
+            "UNBOUNDED_UPDATE",
+            get_error_codes(["UPDATE big_table SET comment = 'where';"]),
+        )
+
+    def test_bounded(self):
+        for sql_statements in (
+            ["UPDATE big_table SET flag = true WHERE id < 1000;"],
+            ["DELETE FROM `big_table`", "LIMIT 1000;"],
+            [
+                "UPDATE big_table SET total = (SELECT SUM(amount) FROM lines) "
+                "WHERE id IN (SELECT big_id FROM lines);"
+            ],
+            [
+                'CREATE TABLE "big_table" ("id" integer NOT NULL PRIMARY KEY);',
+                'UPDATE "big_table" SET "id" = 1;',
+            ],
+        ):
+            self.assertNotIn("UNBOUNDED_UPDATE", get_error_codes(sql_statements))
+
+
+class BlockingIndexTestCase(unittest.TestCase):
+    def assertBlocks(self, sql_statements, **context):
+        context.setdefault("blocking_checks", True)
+        self.assertIn("BLOCKING_INDEX", get_error_codes(sql_statements, **context))
+
+    def assertDoesNotBlock(self, sql_statements, **context):
+        context.setdefault("blocking_checks", True)
+        self.assertNotIn("BLOCKING_INDEX", get_error_codes(sql_statements, **context))
+
+    def test_opt_in(self):
+        self.assertDoesNotBlock(
+            ['CREATE INDEX "app_a_field_idx" ON "app_a" ("field");'],
+            vendor="postgresql",
+            blocking_checks=False,
+        )
+
+    def test_postgresql_create_index(self):
+        self.assertBlocks(
+            ['CREATE INDEX "app_a_field_idx" ON "app_a" ("field");'],
+            vendor="postgresql",
+        )
+        self.assertBlocks(
+            ['ALTER TABLE "app_a" ADD CONSTRAINT "app_a_field_uniq" UNIQUE ("field");'],
+            vendor="postgresql",
+        )
+
+    def test_postgresql_concurrent_index(self):
+        sql_statements = [
+            'CREATE UNIQUE INDEX CONCURRENTLY "app_a_field_uniq" ON "app_a" ("field");',
+            'ALTER TABLE "app_a" ADD CONSTRAINT "app_a_field_uniq" '
+            'UNIQUE USING INDEX "app_a_field_uniq";',
+        ]
+        self.assertEqual(
+            get_error_codes(sql_statements, vendor="postgresql", atomic=False), []
+        )
+        self.assertEqual(
+            get_error_codes(sql_statements, vendor="postgresql", atomic=True),
+            ["CONCURRENTLY_IN_ATOMIC"],
+        )
+
+    def test_index_of_created_table(self):
+        self.assertDoesNotBlock(
+            [
+                'CREATE TABLE "app_b" ("id" serial NOT NULL PRIMARY KEY, '
+                '"a_id" integer NOT NULL);',
+                'CREATE INDEX "app_b_a_id_idx" ON "app_b" ("a_id");',
+            ],
+            vendor="postgresql",
+        )
+
+    def test_mysql_index(self):
+        # InnoDB builds the indexes online by default
+        self.assertDoesNotBlock(
+            ["CREATE INDEX `app_a_field_idx` ON `app_a` (`field`);"], vendor="mysql"
+        )
+        self.assertDoesNotBlock(
+            [
+                "ALTER TABLE `app_a` ADD INDEX `app_a_field_idx` (`field`), "
+                "ALGORITHM=INPLACE, LOCK=NONE;"
+            ],
+            vendor="mysql",
+        )
+        self.assertBlocks(
+            [
+                "ALTER TABLE `app_a` ADD INDEX `app_a_field_idx` (`field`), "
+                "ALGORITHM=COPY;"
+            ],
+            vendor="mysql",
+        )
+        self.assertBlocks(
+            ["CREATE INDEX `app_a_field_idx` ON `app_a` (`field`) LOCK=SHARED;"],
+            vendor="mysql",
+        )
+        self.assertBlocks(
+            ["CREATE FULLTEXT INDEX `app_a_text_idx` ON `app_a` (`text`);"],
+            vendor="mysql",
+        )
+
+    def test_index_table(self):
+        errors = analyse_sql_statements(
+            ['CREATE INDEX "app_a_field_idx" ON "app_a" ("field");'],
+            vendor="postgresql",
+            blocking_checks=True,
+        )["errors"]
+        self.assertEqual([err.table for err in errors], ["app_a"])
+
+
+class ValidatingConstraintTestCase(unittest.TestCase):
+    def get_codes(self, sql_statements, **context):
+        context.setdefault("vendor", "postgresql")
+        context.setdefault("blocking_checks", True)
+        return [
+            code
+            for code in get_error_codes(sql_statements, **context)
+            if code == "VALIDATING_CONSTRAINT"
+        ]
+
+    def test_opt_in(self):
+        self.assertEqual(
+            self.get_codes(
+                ['ALTER TABLE "app_a" ADD CONSTRAINT "positive" CHECK ("field" >= 0);'],
+                blocking_checks=False,
+            ),
+            [],
+        )
+
+    def test_foreign_key_of_added_column(self):
+        # The SQL of an AddField of a ForeignKey
+        self.assertEqual(
+            self.get_codes(
+                [
+                    'ALTER TABLE "app_a" ADD COLUMN "b_id" integer NULL;',
+                    'CREATE INDEX "app_a_b_id_idx" ON "app_a" ("b_id");',
+                    'ALTER TABLE "app_a" ADD CONSTRAINT "app_a_b_id_fk" '
+                    'FOREIGN KEY ("b_id") REFERENCES "app_b" ("id") '
+                    "DEFERRABLE INITIALLY DEFERRED;",
+                ]
+            ),
+            [],
+        )
+
+    def test_foreign_key_of_added_column_with_default(self):
+        # Every row is filled with the default, and checked
+        for column_definition in ("integer DEFAULT 1 NULL", "integer NOT NULL"):
+            self.assertEqual(
+                self.get_codes(
+                    [
+                        'ALTER TABLE "app_a" ADD COLUMN "b_id" {0};'.format(
+                            column_definition
+                        ),
+                        'ALTER TABLE "app_a" ADD CONSTRAINT "app_a_b_id_fk" '
+                        'FOREIGN KEY ("b_id") REFERENCES "app_b" ("id") '
+                        "DEFERRABLE INITIALLY DEFERRED;",
+                    ]
+                ),
+                ["VALIDATING_CONSTRAINT"],
+            )
+
+    def test_foreign_key(self):
+        self.assertEqual(
+            self.get_codes(
+                [
+                    'ALTER TABLE "app_a" ADD CONSTRAINT "app_a_b_id_fk" '
+                    'FOREIGN KEY ("b_id") REFERENCES "app_b" ("id") '
+                    "DEFERRABLE INITIALLY DEFERRED;"
+                ]
+            ),
+            ["VALIDATING_CONSTRAINT"],
+        )
+
+    def test_check(self):
+        self.assertEqual(
+            self.get_codes(
+                ['ALTER TABLE "app_a" ADD CONSTRAINT "positive" CHECK ("field" >= 0);']
+            ),
+            ["VALIDATING_CONSTRAINT"],
+        )
+
+    def test_set_not_null(self):
+        sql_statements = [
+            'ALTER TABLE "app_a" VALIDATE CONSTRAINT "field_not_null";',
+            'ALTER TABLE "app_a" ALTER COLUMN "field" SET NOT NULL;',
+        ]
+        self.assertEqual(
+            self.get_codes(sql_statements[1:], server_version=(12, 1)),
+            ["VALIDATING_CONSTRAINT"],
+        )
+        self.assertEqual(self.get_codes(sql_statements, server_version=(12, 1)), [])
+        self.assertEqual(
+            self.get_codes(sql_statements, server_version=(11, 6)),
+            ["VALIDATING_CONSTRAINT"],
+        )
+
+    def test_not_valid_then_validate(self):
+        sql_statements = [
+            'ALTER TABLE "app_a" ADD CONSTRAINT "positive" '
+            'CHECK ("field" >= 0) NOT VALID;',
+            'ALTER TABLE "app_a" VALIDATE CONSTRAINT "positive";',
+        ]
+        self.assertEqual(self.get_codes(sql_statements[:1]), [])
+        self.assertEqual(self.get_codes(sql_statements[1:]), [])
+        self.assertEqual(self.get_codes(sql_statements, atomic=False), [])
+        # In the same transaction, the lock is held during the validation
+        self.assertEqual(
+            self.get_codes(sql_statements, atomic=True), ["VALIDATING_CONSTRAINT"]
+        )
+
+    def test_created_table(self):
+        self.assertEqual(
+            self.get_codes(
+                [
+                    'CREATE TABLE "app_b" ("id" serial NOT NULL PRIMARY KEY, '
+                    '"a_id" integer NOT NULL);',
+                    'ALTER TABLE "app_b" ADD CONSTRAINT "app_b_a_id_fk" '
+                    'FOREIGN KEY ("a_id") REFERENCES "app_a" ("id");',
+                ]
+            ),
+            [],
+        )
+
+    def test_other_vendors(self):
+        self.assertEqual(
+            self.get_codes(
+                ["ALTER TABLE `app_a` ADD CONSTRAINT `positive` CHECK (`field` >= 0);"],
+                vendor="mysql",
+            ),
+            [],
+        )
+
+
+class LockTimeoutTestCase(unittest.TestCase):
+    ALTER = 'ALTER TABLE "app_a" ADD COLUMN "field" integer NULL;'
+
+    def get_codes(self, sql_statements, **context):
+        context.setdefault("vendor", "postgresql")
+        context.setdefault("require_lock_timeout", True)
+        return [
+            code
+            for code in get_error_codes(sql_statements, **context)
+            if code == "LOCK_TIMEOUT"
+        ]
+
+    def test_optional(self):
+        self.assertEqual(self.get_codes([self.ALTER], require_lock_timeout=False), [])
+
+    def test_missing_lock_timeout(self):
+        self.assertEqual(
+            self.get_codes([self.ALTER, self.ALTER.replace("field", "other")]),
+            ["LOCK_TIMEOUT"],
+        )
+
+    def test_lock_timeout_set(self):
+        self.assertEqual(self.get_codes(["SET lock_timeout = '5s';", self.ALTER]), [])
+        self.assertEqual(
+            self.get_codes(
+                [
+                    "SET SESSION lock_wait_timeout = 5;",
+                    "ALTER TABLE `app_a` ADD COLUMN `field` integer NULL;",
+                ],
+                vendor="mysql",
+            ),
+            [],
+        )
+
+    def test_lock_timeout_set_too_late(self):
+        self.assertEqual(
+            self.get_codes([self.ALTER, "SET lock_timeout = '5s';"]), ["LOCK_TIMEOUT"]
+        )
+
+    def test_weaker_locks(self):
+        self.assertEqual(
+            self.get_codes(['ALTER TABLE "app_a" VALIDATE CONSTRAINT "positive";']),
+            [],
+        )
+        self.assertEqual(
+            self.get_codes(
+                [
+                    'CREATE TABLE "app_b" ("id" serial NOT NULL PRIMARY KEY);',
+                    'ALTER TABLE "app_b" ADD COLUMN "field" integer NULL;',
+                ]
+            ),
+            [],
+        )
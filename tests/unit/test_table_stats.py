@@ -0,0 +1,189 @@
+# Copyright 2019 3YOURMIND GmbH
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from django.db.migrations import Migration
+
+from django_migration_linter import MigrationLinter
+from django_migration_linter.results import LintError, LintResult
+from django_migration_linter.table_stats import (
+    IO_THROUGHPUT,
+    ROW_THROUGHPUT,
+    TableStats,
+    apply_threshold,
+    estimate_impact,
+    load_table_stats,
+)
+
+if sys.version_info >= (3, 3):
+    import unittest.mock as mock
+else:
+    import mock
+
+MB = 1024 * 1024
+
+REWRITE_RESULT = LintResult(
+    "ERR",
+    [
+        LintError("TABLE_REWRITE", "Rewriting the table", "big"),
+        LintError("BLOCKING_INDEX", "Building an index", "big"),
+        LintError("VALIDATING_CONSTRAINT", "Validating a constraint", "small"),
+        LintError("NOT_NULL", "NOT NULL constraint on columns", "small", "a"),
+    ],
+)
+
+
+class LoadTableStatsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.stats_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.stats_dir)
+
+    def _write(self, content):
+        path = os.path.join(self.stats_dir, "table_stats")
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_json_object(self):
+        path = self._write(json.dumps({"big": {"rows": 1000, "size": 81920}}))
+        self.assertEqual(load_table_stats(path), {"big": TableStats(1000, 81920)})
+
+    def test_json_list(self):
+        path = self._write(
+            json.dumps([{"table": "big", "rows": 1e6, "size": 8192}, {"table": "new"}])
+        )
+        self.assertEqual(
+            load_table_stats(path),
+            {"big": TableStats(1000000, 8192), "new": TableStats(0, 0)},
+        )
+
+    def test_csv(self):
+        path = self._write("table,rows,size\nbig,1000,81920\nunanalysed,-1,8192\n")
+        self.assertEqual(
+            load_table_stats(path),
+            {"big": TableStats(1000, 81920), "unanalysed": TableStats(0, 8192)},
+        )
+
+    def test_tab_separated(self):
+        path = self._write("TABLE\tROWS\tSIZE\nbig\t1000\t81920\n")
+        self.assertEqual(load_table_stats(path), {"big": TableStats(1000, 81920)})
+
+    def test_invalid(self):
+        path = self._write("table,rows,size\nbig,many,81920\n")
+        with self.assertRaises(ValueError):
+            load_table_stats(path)
+
+
+class EstimateImpactTestCase(unittest.TestCase):
+    TABLE_STATS = {
+        "big": TableStats(ROW_THROUGHPUT, 10 * IO_THROUGHPUT),
+        "small": TableStats(10, MB),
+    }
+
+    def test_estimate(self):
+        estimate = estimate_impact(REWRITE_RESULT, self.TABLE_STATS)
+        big, small = estimate.tables
+        self.assertEqual(big.table, "big")
+        # Rewritten (2 passes) and indexed (1 pass), sorting the rows twice
+        self.assertAlmostEqual(big.seconds, 32.0)
+        self.assertEqual(big.io_bytes, 30 * IO_THROUGHPUT)
+        self.assertEqual(small.io_bytes, MB)
+        self.assertAlmostEqual(estimate.seconds, big.seconds + small.seconds)
+        self.assertEqual(estimate.unknown_tables, ())
+
+    def test_unknown_tables(self):
+        estimate = estimate_impact(REWRITE_RESULT, {"small": TableStats(10, MB)})
+        self.assertEqual([cost.table for cost in estimate.tables], ["small"])
+        self.assertEqual(estimate.unknown_tables, ("big",))
+
+    def test_under_threshold(self):
+        estimate = estimate_impact(REWRITE_RESULT, {"small": TableStats(10, MB)})
+        lint_result = apply_threshold(REWRITE_RESULT, estimate, 60)
+        # Only the size-dependent errors on the known tables are dropped
+        self.assertEqual(
+            [err.code for err in lint_result.errors],
+            ["TABLE_REWRITE", "BLOCKING_INDEX", "NOT_NULL"],
+        )
+
+        only_sized = LintResult("ERR", REWRITE_RESULT.errors[:3])
+        estimate = estimate_impact(only_sized, self.TABLE_STATS)
+        self.assertEqual(apply_threshold(only_sized, estimate, 60).result, "OK")
+
+    def test_above_threshold(self):
+        estimate = estimate_impact(REWRITE_RESULT, self.TABLE_STATS)
+        self.assertIs(apply_threshold(REWRITE_RESULT, estimate, 10), REWRITE_RESULT)
+        self.assertIs(apply_threshold(REWRITE_RESULT, estimate, None), REWRITE_RESULT)
+
+
+class LinterImpactTestCase(unittest.TestCase):
+    def setUp(self):
+        self.stats_dir = tempfile.mkdtemp()
+        self.stats_path = os.path.join(self.stats_dir, "table_stats.json")
+        with open(self.stats_path, "w") as f:
+            json.dump(
+                {
+                    "big": {"rows": ROW_THROUGHPUT, "size": 10 * IO_THROUGHPUT},
+                    "small": {"rows": 10, "size": MB},
+                },
+                f,
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.stats_dir)
+
+    def _lint(self, max_lock_duration):
+        linter = MigrationLinter(
+            no_cache=True,
+            reporters=[],
+            table_stats=self.stats_path,
+            max_lock_duration=max_lock_duration,
+        )
+        lint_results = {
+            "0001_create_table": LintResult(
+                "ERR", [LintError("BLOCKING_INDEX", "Building an index", "small")]
+            ),
+            "0002_add_new_not_null_field": LintResult(
+                "ERR", [LintError("TABLE_REWRITE", "Rewriting the table", "big")]
+            ),
+        }
+        for name in sorted(lint_results):
+            with mock.patch.object(
+                linter, "get_lint_result", return_value=lint_results[name]
+            ):
+                linter.lint_migration(Migration(name, "app_add_not_null_column"))
+        return linter
+
+    def test_ranking(self):
+        linter = self._lint(max_lock_duration=None)
+        self.assertEqual(linter.nb_erroneous, 2)
+        self.assertEqual(
+            [entry[1] for entry in linter.get_impact_ranking()],
+            ["0002_add_new_not_null_field", "0001_create_table"],
+        )
+
+    def test_max_lock_duration(self):
+        linter = self._lint(max_lock_duration=5)
+        self.assertEqual(linter.nb_valid, 1)
+        self.assertEqual(
+            [m[1] for m in linter.erroneous_migrations],
+            ["0002_add_new_not_null_field"],
+        )
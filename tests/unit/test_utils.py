@@ -14,7 +14,12 @@
 
 import unittest
 
-from django_migration_linter.utils import split_path, split_migration_path
+from django_migration_linter.utils import (
+    is_migration_file,
+    parse_version,
+    split_path,
+    split_migration_path,
+)
 
 
 class SplitPathTestCase(unittest.TestCase):
@@ -55,3 +60,24 @@ class SplitPathTestCase(unittest.TestCase):
         app, mig = split_migration_path(input_path)
         self.assertEqual(app, "the_app")
         self.assertEqual(mig, "0001_stuff")
+
+
+class IsMigrationFileTestCase(unittest.TestCase):
+    def test_migration_file(self):
+        self.assertTrue(is_migration_file("the_app/migrations/0001_stuff.py"))
+
+    def test_migration_init_file(self):
+        self.assertFalse(is_migration_file("the_app/migrations/__init__.py"))
+
+    def test_not_migration_file(self):
+        self.assertFalse(is_migration_file("the_app/models.py"))
+
+
+class ParseVersionTestCase(unittest.TestCase):
+    def test_parse_version(self):
+        self.assertEqual(parse_version("11"), (11,))
+        self.assertEqual(parse_version("8.0.12"), (8, 0, 12))
+
+    def test_parse_invalid_version(self):
+        with self.assertRaises(ValueError):
+            parse_version("eleven")